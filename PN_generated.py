@@ -0,0 +1,121 @@
+# generated by codegen_tools.write_coefficient_module from the LaTeX of PN_tools.orbit_tex_NLOSO, do not edit
+
+# hash of the LaTeX source, see PN_tools.orbit_tex_hash
+source_hash = '789885ac87bba25b'
+
+# number of values of every entry of the tables, 2 for the (S1 coeff, S2 coeff) pairs of the spin terms
+coefficient_shapes = {'E': (1, 1), 'L': (1, 1, 1, 1, 1, 2, 2, 2), 'n': (1, 1, 1), 'et2': (1, 1, 1, 1, 1, 2, 2, 2, 2), 'er2': (1, 1, 1, 1, 1, 2, 2, 2, 2), 'ephi2': (1, 1, 1, 1, 1, 2, 2, 2, 2), 'ar': (1, 1, 1, 2, 2, 2), 't': (1, 2, 1, 2), 'd': (1, 1, 1, 1, 2, 2, 1, 2, 1, 2), 'f_L': (1, 1, 1, 1), 'g_L': (1, 1, 1, 1)}
+
+import numpy
+
+
+def coefficient_kernel(eta, s, S1, S2, PN2, PN3, PN4, PN5) :
+
+    _x0 = eta - 15
+    _x1 = PN2*_x0
+    _x2 = 15*eta
+    _x3 = eta**2
+    _x4 = (1/6)*PN2
+    _x5 = (1/24)*PN4
+    _x6 = 5*_x3
+    _x7 = (1/2)*eta
+    _x8 = s + 1
+    _x9 = -_x7 + _x8
+    _x10 = PN3*S1
+    _x11 = -_x10*_x9
+    _x12 = _x7 + s - 1
+    _x13 = PN3*S2
+    _x14 = _x12*_x13
+    _x15 = 312*s
+    _x16 = eta*s
+    _x17 = 173*_x16
+    _x18 = 94*_x3 - 443*eta + 312
+    _x19 = PN5*S1
+    _x20 = (1/48)*_x19
+    _x21 = PN5*S2
+    _x22 = (1/48)*_x21
+    _x23 = 168*s
+    _x24 = 31*eta
+    _x25 = _x24*s
+    _x26 = 2*_x3
+    _x27 = _x26 - 169*eta + 168
+    _x28 = numpy.sqrt(2)
+    _x29 = PN4*_x28
+    _x30 = eta - 1
+    _x31 = _x6 + 2
+    _x32 = 2*PN4
+    _x33 = 11*eta
+    _x34 = _x33 - 17
+    _x35 = PN4*_x34
+    _x36 = -eta
+    _x37 = 2*s
+    _x38 = _x37 + 2
+    _x39 = _x10*(_x36 + _x38)
+    _x40 = eta - 2
+    _x41 = _x13*(-_x37 - _x40)
+    _x42 = 9*_x16
+    _x43 = 32*s
+    _x44 = _x43 + 32
+    _x45 = 4*_x3
+    _x46 = _x45 - 39*eta
+    _x47 = 2*_x19
+    _x48 = _x47*(-_x42 + _x44 + _x46)
+    _x49 = 32 - _x43
+    _x50 = 2*_x21
+    _x51 = _x50*(_x42 + _x46 + _x49)
+    _x52 = 124*s
+    _x53 = 59*_x16
+    _x54 = 32*_x3 - 159*eta + 124
+    _x55 = 252*s
+    _x56 = 95*_x16
+    _x57 = 48*_x3 - 315*eta + 252
+    _x58 = 2*PN2
+    _x59 = 80*s
+    _x60 = 19*_x16
+    _x61 = 6*_x3 - 49*eta + 80
+    _x62 = -_x59
+    _x63 = 8*_x16
+    _x64 = _x31 - 35*eta
+    _x65 = -_x37
+    _x66 = 4*_x39
+    _x67 = 4*_x41
+    _x68 = (3/2)*_x3
+    _x69 = _x16 + _x62
+    _x70 = 34*s
+    _x71 = _x2*s
+    _x72 = _x26 - 72*eta + 34
+    _x73 = (11/2)*_x16
+    _x74 = (1/2)*_x3 - 71/2*eta
+    _x75 = 8*s
+    _x76 = (9/4)*_x16
+    _x77 = _x3 - 39/4*eta + 8
+    _x78 = (5/8)*_x16
+    _x79 = (3/4)*_x3 - 19/8*eta
+    _x80 = 1 - s
+    _x81 = 12*s
+    _x82 = (35/4)*_x16
+    _x83 = (7/2)*_x3 - 73/4*eta + 12
+    _x84 = PN4*eta
+    _x85 = (9/2)*_x16
+    _x86 = _x68 - 11/2*eta
+    _x87 = -_x33
+    _x88 = PN3*_x9
+    _x89 = -PN3*_x12
+    _x90 = 18*eta
+    _x91 = 31*s
+    _x92 = -_x90 + _x91 + 21
+    _x93 = (1/8)*eta
+    _x94 = -_x90 - _x91 + 21
+    _x95 = 3*s
+    _x96 = (23/8)*_x16
+    _x97 = (9/4)*_x3
+    _x98 = _x97 - 21/8*eta + 3
+    _x99 = PN5*(-_x95 + _x96 - _x98)
+    _x100 = PN5*(_x95 - _x96 - _x98)
+    _x101 = (15/4)*_x16
+    _x102 = _x97 - 17/4*eta
+    _x103 = PN5*eta
+    _x104 = (3/4)*_x103
+    _x105 = (1/8)*_x103
+
+    return ((1/24)*_x1, (1/48)*PN4*(-_x2 - _x3 + 15), _x4*(eta + 3), _x4*(5*eta - 9), _x5*(_x3 - 21*eta + 69), (1/12)*PN4*(-9*_x3 + 26*eta - 6), _x5*(_x6 - 73*eta + 33), _x11, _x14, _x20*(-_x15 + _x17 - _x18), _x22*(_x15 - _x17 - _x18), _x20*(-_x23 + _x25 - _x27), _x22*(_x23 - _x25 - _x27), 2*_x28, -1/2*PN2*_x0*_x28, (1/16)*_x29*(11*_x3 + 30*eta + 555), -4*PN2*_x30, _x32*(_x31 + eta), _x35, PN2*(17 - 7*eta), PN4*(16*_x3 - 47*eta + 112), 2*_x39, 2*_x41, _x48, _x51, _x47*(_x52 - _x53 + _x54), _x50*(-_x52 + _x53 + _x54), _x19*(_x55 - _x56 + _x57), _x21*(-_x55 + _x56 + _x57), _x58*(eta - 6), PN4*(_x3 + eta + 26), 2*_x35, 5*PN2*(eta - 3), PN4*(_x45 - 55*eta + 80), _x19*(-_x59 + _x60 - _x61), _x21*(-_x60 - _x61 - _x62), _x47*(_x37 - _x63 + _x64), _x50*(_x63 + _x64 + _x65), _x66, _x67, _x48, _x51, -12*PN2, PN4*((9/2)*_x3 + 44*eta - 8), PN4*((15/8)*_x3 + 29*eta - 51), _x1, PN4*(-_x2 + _x68 + 80), _x19*(_x24 + _x69 - 80), _x21*(-_x69 + 31*eta - 80), _x47*(_x70 - _x71 + _x72), _x50*(-_x70 + _x71 + _x72), _x66, _x67, 3*_x19*(_x44 - _x73 + _x74), 3*_x21*(_x49 + _x73 + _x74), (1/4)*PN2*(7 - eta), (1/8)*PN4*(_x3 + 10*eta + 1), -1/4*PN4*_x34, _x11, _x14, _x19*(-_x75 + _x76 - _x77), _x21*(_x75 - _x76 - _x77), _x19*(_x78 - _x79 - _x8), _x21*(-_x78 - _x79 - _x80), 3*_x29*(5 - 2*eta), _x19*_x28*(-_x81 + _x82 - _x83), _x21*_x28*(_x81 - _x82 - _x83), -_x84*((1/4)*eta + 1), _x19*(-_x38 + _x85 - _x86), _x21*(-_x65 - _x85 - _x86 - 2), PN2*(3*eta - 1), PN4*(3*_x3 - 9/2*eta + 1), _x40*_x58, _x32*(_x45 + _x87 + 2), S1*_x88, S2*_x89, _x19*_x92*_x93, _x21*_x93*_x94, PN4*(_x6 + _x87 + 17/2), S1*_x99, S2*_x100, _x84*(1/2 - eta), _x19*(-_x101 + _x102 + _x8), _x21*(_x101 + _x102 + _x80), _x88, _x104*(-_x36 - _x8), _x105*_x92, _x99, _x89, _x104*(_x30 + s), _x105*_x94, _x100,)
@@ -1,16 +1,24 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import astropy.units as u
-import astropy.constants as cst
-import sympy as sy
-
-from latex2sympy2 import latex2sympy
+import sys
+import warnings
+import hashlib
+import tracemalloc
+
+try :
+    import resource
+except ImportError : # not available on Windows
+    resource = None
+
+from time import perf_counter
+from contextlib import contextmanager
 from scipy.special import cbrt
-from scipy.integrate import odeint
-from scipy.optimize import least_squares
-from scipy.interpolate import interp1d
+from scipy.integrate import odeint, cumulative_trapezoid, RK23, RK45, DOP853, Radau, BDF, LSODA
+from scipy.interpolate import interp1d, CubicSpline
 
-from plot_tools import *
+# the numerics only need numpy and scipy, the LaTeX parsing (latex2sympy2, sympy), the plots of num_checks (matplotlib)
+# and the compiled backend (numba) import their dependencies on first use, see benchmark_tools.bench_import
+from vector_tools import dot, cross, norm, normalize
+import PN_generated
 
 
 # Utilities =================================================
@@ -22,234 +30,275 @@ def derivative(f,x,dx=1e-3): # erivative estimation
 
     return ((f_plus_dx-f_minus_dx)/(2*dx))
 
-def dot(a, b) : # dot product in time, a and b shape (3, len(t)), return a.b shape (len(t))
-
-    adb = np.zeros(len(a[0]))
-
-    for i in range(len(a[0])) :
-        adb[i] = np.dot(a[:,i],b[:,i])
-
-    return adb
-
-
-def cross(a, b) : # cross product in time, a and b shape (3, len(t)), return a.b shape (len(t))
-
-    acb = np.zeros((3,len(a[0])))
+ivp_solvers = {'RK23' : RK23, 'RK45' : RK45, 'DOP853' : DOP853, 'Radau' : Radau, 'BDF' : BDF, 'LSODA' : LSODA}
+implicit_solvers = ('Radau', 'BDF', 'LSODA')
 
-    for i in range(len(a[0])) :
-        acb[:,i] = np.cross(a[:,i],b[:,i])
+def integrate_dense(fun, t, y0, method='DOP853', rtol=1.49012e-8, atol=1.49012e-8, stats=None, jac=None) : # solve dy/dt = fun(t, y) on the grid t, return shape (len(t), len(y0)) like odeint
 
-    return acb
+    # every accepted step is interpolated onto the grid points it covers with the solver's dense output,
+    # which is then dropped so that memory is bounded by the output size and not by the number of steps
+    # stats, when given, is a dict that receives the solver statistics (steps, step sizes, evaluations, LU decompositions)
+    # jac(t, y) is the Jacobian of fun, used by the implicit methods only
 
-# Conversion of PN accurate parameters in terms of E, L, L.S1 and L.S2 computed in Mathematica from LaTeX to Python ========================================
-
-def orbit_tex2py(param = 'all') :
-    
-    if param == 'all' or param == 'coord' :
-        print('Radial and angular coordinates:')
-
-        r_N_sy = latex2sympy(r'\frac{1}{\xi^{2 / 3}}(a_t \cosh u-1)')
-        print('r_N = ', r_N_sy)
+    sol = np.zeros((len(t), len(y0)))
+    sol[0] = y0
 
-        r_1PN_sy = latex2sympy(r'\frac{\xi^{2 / 3}}{6(a_t \cosh u-1)}((7 \eta-6) a_t \cosh u+2(\eta-9))')
-        print('r_1PN = ', r_1PN_sy)
+    direction = np.sign(t[-1] - t[0])
+    options = {'jac' : jac} if jac is not None and method in implicit_solvers else {}
+    integrator = ivp_solvers[method](fun, t[0], y0, t[-1], rtol=rtol, atol=atol, **options)
 
-        r_2PN_sy = latex2sympy(r'\frac{\xi^{4 / 3}}{72(a_t^2-1)(a_t \cosh u-1)}((a_t^2-1) a_t(35 \eta^2-231 \eta+72) \cosh u-2 a_t^2(4 \eta^2+15 \eta+36)+8 \eta^2+534 \eta   -216)')
-        print('r_2PN = ', r_2PN_sy)
+    i = 1
+    steps, step_min, step_max = 0, np.inf, 0.
+    while i < len(t) :
 
-        r_3PN_sy = latex2sympy(r'\frac{\xi^2}{181440(a_t^2-1)^2(a_t \cosh u-1)}(280 a_t^4(16 \eta^3+90 \eta^2-81 \eta+432)+140(a_t^2-1)^2 a_t(49 \eta^3-3933 \eta^2   +7047 \eta-864) \cosh u-a_t^2(8960 \eta^3+3437280 \eta^2+81(1435 \pi^2-134336) \eta+3144960)+4480 \eta^3-761040 \eta^2   -348705 \pi^2 \eta+12143736 \eta-4233600)')
-        print('r_3PN = ', r_3PN_sy)
+        message = integrator.step()
+        if integrator.status == 'failed' :
+            raise RuntimeError(method + ' failed at t = ' + str(integrator.t) + ': ' + str(message))
 
-        phi_1PN_sy = latex2sympy(r'\frac{\xi^{2 / 3}}{(a_t^2-1)(a_t \cosh u-1)}(a_t \sqrt{a_t^2-1}(4-\eta) \sinh u+3 \eta(a_t \cosh u-1))')
-        print('phi_1PN = ', phi_1PN_sy)
+        steps += 1
+        step_min, step_max = min(step_min, integrator.step_size), max(step_max, integrator.step_size)
 
-        phi_2PN_sy = latex2sympy(r'\frac{\xi^{4 / 3}}{192(a_t^2-1)^{5 / 2}(a_t \cosh u-1)^2}(a_t(a_t^2-1)(2(a_t^2(384-\eta(7 \eta+275))+4(\eta(\eta+137)-792)) \sinh u   +a_t(a_t^2(\eta(55 \eta-109)+384)-4(\eta(13 \eta+41)-600)) \sinh 2 u)+6 \sqrt{a_t^2-1}(a_t \cosh u-1)^2   \times(a_t^3(1-3 \eta) \eta \sin 3 \nu-8 \nu(a_t^2(26 \eta-51)+28 \eta-78)+4 a_t^2((19-3 \eta) \eta+1) \sin 2 \nu))')
-        print('phi_2PN = ', phi_2PN_sy)
+        j = np.searchsorted(direction*t, direction*integrator.t, side='right')
+        if j > i :
+            sol[i:j] = integrator.dense_output()(t[i:j]).T
+            i = j
 
-        phi_3PN_sy = latex2sympy(r'\frac{\xi^2}{53760(a_t^2-1)^{7 / 2}(a_t \cosh(u)-1)^3}(\sqrt{a_t^2-1}(a_t \cosh(u)-1)^3(2 a_t^2((280 a_t^2(\eta(\eta(93 \eta-781)+886)+24)+\eta(32(35 \eta(9 \eta-395)+36877)-30135 \pi^2)+84000) \sin(2\nu) + a_t\eta ((35 a_t^2(\eta(129 \eta-137)+33)+4(35\eta(51 \eta-727)+28302)-4305 \pi^2) \sin(3\nu) + 35 a_t(3 a_t(5(\eta-1) \eta+1) \sin(5\nu)+4(3 \eta(5 \eta-19)+82) \sin(4\nu)))) + 420 \nu (16(65 a_t^4+320 a_t^2+56) \eta^2 + (123 \pi^2(a_t^2+4)-32(55 a_t^4+870 a_t^2+793))\eta + 96(26 a_t^4+293 a_t^2+190))) + a_t(a_t^2-1)\sinh(u)(-70 a_t^6 \eta(\eta(71 \eta+61)-639)+1680 a_t^4(\eta-4) \cosh^2(u)(3 a_t \eta(3 \eta-1) \cos(3 \nu) + 8(\eta(3 \eta-19)-1) \cos(2\nu)) + a_t^4(\eta(4(70 \eta(125 \eta-507)-462853)-4305 \pi^2)+3933440)+1680 a_t^2(\eta-4)(3 a_t \eta(3 \eta-1) \cos(3\nu) +8(\eta(3 \eta-19)-1) \cos(2\nu))+a_t^2(6 \eta(140 \eta(25 \eta-397)+1435\pi^2-917424)+7947520) + 4 a_t \cosh(u)(-70 a_t^4(\eta(\eta(39 \eta-719)+2279)-3072)+840 a_t^2(\eta-4)(3 a_t(1-3 \eta) \eta \cos(3\nu) + 8((19-3 \eta) \eta+1) \cos(2\nu)) + a_t^2(\eta(8(35(232-53 \eta) \eta+186959)+4305 \pi^2)-2983680)-20(323904-\eta(4(7 \eta(\eta+45)+56013)-861 \pi^2))) + a_t^2(-70 a_t^4 \eta(\eta(71 \eta+61)-639)+a_t^2(\eta(4(35 \eta(229 \eta-1173)-384978)-4305 \pi^2)+3646720)+20(\eta(861 \pi^2-4(14 \eta(9 \eta-25)+54025))+280000)) \cosh(2u) + 40(\eta(1456 \eta+861 \pi^2-253508)+396480)))')
-        print('phi_3PN = ', phi_3PN_sy)
+    if stats is not None :
+        stats.update({'steps' : steps, 'step_min' : float(step_min), 'step_max' : float(step_max), 'rhs_evaluations' : integrator.nfev, 'jacobian_evaluations' : integrator.njev, 'lu_decompositions' : integrator.nlu})
 
-    if param == 'all' or param == 'b' :
-        print('\nCoefficients of b = c0*xi**(-2/3) + c1 + c2*xi**(2/3) + c3*xi**(4/3):')
+    return sol
 
-        c0 = latex2sympy(r'\sqrt{a_t^2-1}')
-        print('c0 = ', c0)
-
-        c1 = c0*latex2sympy(r'(\frac{\eta-1}{a_t^2-1}+\frac{7 \eta-6}{6})')
-        print('c1 = ', c1)
-
-        c2 = c0*latex2sympy(r'(1-\frac{7}{24} \eta+\frac{35}{72} \eta^2+\frac{3-16 \eta}{2(a_t^2-1)}+\frac{7-12 \eta-\eta^2}{2(a_t^2-1)^2})')
-        print('c2 = ', c2)
+# Conversion of PN accurate parameters in terms of E, L, L.S1 and L.S2 computed in Mathematica from LaTeX to Python ========================================
 
-        c3 = c0*latex2sympy(r'(-\frac{2}{3}+\frac{87}{16} \eta-\frac{437}{144} \eta^2+\frac{49}{1296} \eta^3+\frac{36-378 \eta+140 \eta^2+3 \eta^3}{24(a_t^2-1)}+\frac{1}{6720(a_t^2-1)^2}(248640 +(-880496+12915 \pi^2) \eta+40880 \eta^2+3920 \eta^3) +\frac{1}{1680(a_t^2-1)^3}(73080+(-228944+4305 \pi^2) \eta+47880 \eta^2+840 \eta^3)))')
-        print('c3 = ', c3)
+orbit_tex = {
+    'coord' : {
+        'r_N' : r'\frac{1}{\xi^{2 / 3}}(a_t \cosh u-1)',
+        'r_1PN' : r'\frac{\xi^{2 / 3}}{6(a_t \cosh u-1)}((7 \eta-6) a_t \cosh u+2(\eta-9))',
+        'r_2PN' : r'\frac{\xi^{4 / 3}}{72(a_t^2-1)(a_t \cosh u-1)}((a_t^2-1) a_t(35 \eta^2-231 \eta+72) \cosh u-2 a_t^2(4 \eta^2+15 \eta+36)+8 \eta^2+534 \eta   -216)',
+        'r_3PN' : r'\frac{\xi^2}{181440(a_t^2-1)^2(a_t \cosh u-1)}(280 a_t^4(16 \eta^3+90 \eta^2-81 \eta+432)+140(a_t^2-1)^2 a_t(49 \eta^3-3933 \eta^2   +7047 \eta-864) \cosh u-a_t^2(8960 \eta^3+3437280 \eta^2+81(1435 \pi^2-134336) \eta+3144960)+4480 \eta^3-761040 \eta^2   -348705 \pi^2 \eta+12143736 \eta-4233600)',
+        'phi_1PN' : r'\frac{\xi^{2 / 3}}{(a_t^2-1)(a_t \cosh u-1)}(a_t \sqrt{a_t^2-1}(4-\eta) \sinh u+3 \eta(a_t \cosh u-1))',
+        'phi_2PN' : r'\frac{\xi^{4 / 3}}{192(a_t^2-1)^{5 / 2}(a_t \cosh u-1)^2}(a_t(a_t^2-1)(2(a_t^2(384-\eta(7 \eta+275))+4(\eta(\eta+137)-792)) \sinh u   +a_t(a_t^2(\eta(55 \eta-109)+384)-4(\eta(13 \eta+41)-600)) \sinh 2 u)+6 \sqrt{a_t^2-1}(a_t \cosh u-1)^2   \times(a_t^3(1-3 \eta) \eta \sin 3 \nu-8 \nu(a_t^2(26 \eta-51)+28 \eta-78)+4 a_t^2((19-3 \eta) \eta+1) \sin 2 \nu))',
+        'phi_3PN' : r'\frac{\xi^2}{53760(a_t^2-1)^{7 / 2}(a_t \cosh(u)-1)^3}(\sqrt{a_t^2-1}(a_t \cosh(u)-1)^3(2 a_t^2((280 a_t^2(\eta(\eta(93 \eta-781)+886)+24)+\eta(32(35 \eta(9 \eta-395)+36877)-30135 \pi^2)+84000) \sin(2\nu) + a_t\eta ((35 a_t^2(\eta(129 \eta-137)+33)+4(35\eta(51 \eta-727)+28302)-4305 \pi^2) \sin(3\nu) + 35 a_t(3 a_t(5(\eta-1) \eta+1) \sin(5\nu)+4(3 \eta(5 \eta-19)+82) \sin(4\nu)))) + 420 \nu (16(65 a_t^4+320 a_t^2+56) \eta^2 + (123 \pi^2(a_t^2+4)-32(55 a_t^4+870 a_t^2+793))\eta + 96(26 a_t^4+293 a_t^2+190))) + a_t(a_t^2-1)\sinh(u)(-70 a_t^6 \eta(\eta(71 \eta+61)-639)+1680 a_t^4(\eta-4) \cosh^2(u)(3 a_t \eta(3 \eta-1) \cos(3 \nu) + 8(\eta(3 \eta-19)-1) \cos(2\nu)) + a_t^4(\eta(4(70 \eta(125 \eta-507)-462853)-4305 \pi^2)+3933440)+1680 a_t^2(\eta-4)(3 a_t \eta(3 \eta-1) \cos(3\nu) +8(\eta(3 \eta-19)-1) \cos(2\nu))+a_t^2(6 \eta(140 \eta(25 \eta-397)+1435\pi^2-917424)+7947520) + 4 a_t \cosh(u)(-70 a_t^4(\eta(\eta(39 \eta-719)+2279)-3072)+840 a_t^2(\eta-4)(3 a_t(1-3 \eta) \eta \cos(3\nu) + 8((19-3 \eta) \eta+1) \cos(2\nu)) + a_t^2(\eta(8(35(232-53 \eta) \eta+186959)+4305 \pi^2)-2983680)-20(323904-\eta(4(7 \eta(\eta+45)+56013)-861 \pi^2))) + a_t^2(-70 a_t^4 \eta(\eta(71 \eta+61)-639)+a_t^2(\eta(4(35 \eta(229 \eta-1173)-384978)-4305 \pi^2)+3646720)+20(\eta(861 \pi^2-4(14 \eta(9 \eta-25)+54025))+280000)) \cosh(2u) + 40(\eta(1456 \eta+861 \pi^2-253508)+396480)))',
+    },
+    'b' : {
+        'c0' : r'\sqrt{a_t^2-1}',
+        'c1' : r'\sqrt{a_t^2-1}(\frac{\eta-1}{a_t^2-1}+\frac{7 \eta-6}{6})',
+        'c2' : r'\sqrt{a_t^2-1}(1-\frac{7}{24} \eta+\frac{35}{72} \eta^2+\frac{3-16 \eta}{2(a_t^2-1)}+\frac{7-12 \eta-\eta^2}{2(a_t^2-1)^2})',
+        'c3' : r'\sqrt{a_t^2-1}(-\frac{2}{3}+\frac{87}{16} \eta-\frac{437}{144} \eta^2+\frac{49}{1296} \eta^3+\frac{36-378 \eta+140 \eta^2+3 \eta^3}{24(a_t^2-1)}+\frac{1}{6720(a_t^2-1)^2}(248640 +(-880496+12915 \pi^2) \eta+40880 \eta^2+3920 \eta^3) +\frac{1}{1680(a_t^2-1)^3}(73080+(-228944+4305 \pi^2) \eta+47880 \eta^2+840 \eta^3)))',
+    },
+    'orbital' : {
+        'n' : r'(2\epsilon )^{3/2}(1-\frac{(2\epsilon )}{8c^2}(-15+\eta)+\frac{(2\epsilon )^2}{128c^4}(555+30\eta+11\eta^2)+\frac{(2\epsilon )^3}{1024c^6}(653+111\eta+7\eta^2+3\eta^3))',
+        'et2' : r'1+2 \epsilon h^2+\frac{(2 \epsilon)}{4 c^2}(8-8 \eta+(17-7 \eta)(2 \epsilon h^2)) +\frac{(2 \epsilon)^2}{8 c^4}(4(3+18 \eta+5 \eta^2)+(2 \epsilon h^2)(112-47 \eta+16 \eta^2) +\frac{16}{(2 \epsilon h^2)}(-4+7 \eta))+\frac{(2 \epsilon)^3}{840 c^6}(-70(42-830 \eta+321 \eta^2+30 \eta^3) -\frac{525}{8}(2 \epsilon h^2)(-528+200 \eta-77 \eta^2+24 \eta^3) -\frac{3}{4(2 \epsilon h^2)}(73920+(-260272+4305 \pi^2) \eta+61040 \eta^2) -\frac{1}{(2 \epsilon h^2)^2}(53760+(-176024+4305 \pi^2) \eta+15120 \eta^2))',
+        'ephi2' : r'1+2\epsilon h^2+\frac{2\epsilon}{4c^{2}}(-24+(-15+\eta)(2\epsilon h^{2}))  +\frac{(2\epsilon)^{2}}{16c^{4}(2\epsilon h^{2})}(-416+91\eta+15\eta^{2}+2(2 \epsilon h^{2})(-20+17\eta+9\eta^{2})+(2\epsilon h^{2})^{2}(160-31\eta+3\eta^{2})) -\frac{(2\epsilon)^{3}}{13440c^{6}(2\epsilon h^{2})^{2}}(2956800+(-5627206+81795\pi^{2})\eta-14490\eta^{2}-7350\eta^{3}  -(2\epsilon h^{2})^{2}(584640+(17482+4305\pi^{2})\eta+7350\eta^{2}-8190\eta^{3}) +420(2\epsilon h^{2})^{3}(744-248\eta+31\eta^{2}+3\eta^{3}) +14(2\epsilon h^{2})(36960+7(-48716+615\pi^{2})\eta-225\eta^{2}+150\eta^{3})))',
+        'er2' : r'1+2\epsilon h^{2}+\frac{(2\epsilon )}{4c^{2}}(-24+4\eta+5(-3+\eta)(2\epsilon h^{2}))  +\frac{(2\epsilon )^{2}}{8c^{4}}(60+148\eta+2\eta^{2}+(80-45\eta+4\eta^{2})(2\epsilon h^{2})  +\frac{8}{(2\epsilon h^{2})}(-16+28\eta))+\frac{(2\epsilon )^{3}}{6720c^{6}}(2(1680-(90632+4305\pi^{2})\eta+33600\eta^{2})  +4\eta^{3})-\frac{80}{(2\epsilon h^{2})}(1008+(-21130+861\pi^{2})\eta+2268\eta^{2}) -\frac{16}{(2\epsilon h^{2})^{2}}((53760+(-176024+4305\pi^{2})\eta+15120\eta^{2})))',
+        'et_to_er' : r'(1+\frac{(2\epsilon )}{2c^2}(8-3\eta)+\frac{(2\epsilon )^2}{c^4}\frac{1}{(2\epsilon h^2)}(8-14\eta+(36-19\eta+6\eta^2)(\epsilon h^2))+\frac{(2\epsilon )^3}{3360c^6}\frac{1}{(2\epsilon h^2)^2}(-420(2\epsilon h^2)^2(10\eta^3-34\eta^2+65\eta-160)+\epsilon h^2(105840\eta^2+(4305\pi^2-354848)\eta+87360)+30240\eta^2+(8610\pi^2-352048)\eta+107520))',
+        'ephi_to_er' : r'(1-\frac{(2\epsilon )}{2c^{2}}\eta-\frac{(2\epsilon )^{2}}{32c^{4}}\frac{1}{(2\epsilon h^{2})}(160+357\eta-15\eta^{2}-\eta(-1+11\eta)(2\epsilon h^{2}))   +\frac{(2\epsilon )^{3}}{8960c^{6}}\frac{1}{(2\epsilon h^{2})^{2}}(-70(2\epsilon h^{2})^{2}\eta(31\eta^{2}-\eta-1)+5(2\epsilon h^{2})(-1050\eta^{3})  -1854)\eta-412160)',
+        'ephi_to_et' : r'-412159+\frac{2 \epsilon (1648636-618239 \eta)}{c^2}+\frac{\epsilon (\eta^2 (19783606 \epsilon h^2+15)+\eta (65945566 \epsilon h^2-184647589)+32 (1648636 \epsilon h^2+3297267))}{16 c^4 h^2}+\frac{\epsilon (-420 \eta^2 (1121072501 \epsilon^2 h^4+692428759 \epsilon h^2-118701792)+\eta (1105113744000 \epsilon^2 h^4+4 (230426832808+1774344495 \pi ^2) \epsilon h^2+7 (2027822280 \pi ^2-82914144187))-26880 (49459080 \epsilon^2 h^4+21020089 \epsilon h^2-6594544)-210 \epsilon \eta^4 h^2 (62 \epsilon h^2+75)+6300 \epsilon \eta^3 h^2 (15387277 \epsilon h^2+3))}{6720 c^6 h^4}',
+    },
+    'energy' : {
+        'E_2PN' : r'(\frac{5v^{6}}{16}-\frac{35\eta v^{6}}{16}+\frac{65\eta^{2}v^{6}}{16}+\frac{m}{r}(-\frac{3r_d^{4}\eta}{8}+\frac{9r_d^{4}\eta^{2}}{8}+\frac{r_d^{2}\eta v^{2}}{4}-\frac{15r_d^{2}\eta^{2}v^{2}}{4}+\frac{21v^{4}}{8}-\frac{23\eta v^{4}}{8}-\frac{27\eta^{2}v^{4}}{8})+\frac{m^{2}}{r^{2}}(\frac{r_d^{2}}{2}+\frac{69r_d^{2}\eta}{8}+\frac{3r_d^{2}\eta^{2}}{2}+\frac{7v^{2}}{4}-\frac{55\eta v^{2}}{8}+\frac{\eta^{2}v^{2}}{2})+\frac{m^{3}}{r^{3}}(-\frac{1}{2}-\frac{15\eta}{4}))',
+        'E_3PN' : r'(\frac{35v^{8}}{128}-\frac{413\eta v^{8}}{128}+\frac{833\eta^{2}v^{8}}{64}-\frac{2261\eta^{3}v^{8}}{128}+\frac{m}{r}(\frac{5r_d^{6}\eta}{16}-\frac{25r_d^{6}\eta^{2}}{16}+\frac{25r_d^{6}\eta^{3}}{16}-\frac{9r_d^{4}\eta v^{2}}{16}+\frac{21r_d^{4}\eta^{2}v^{2}}{4}-\frac{165r_d^{4}\eta^{3}v^{2}}{16}-\frac{21r_d^{2}\eta v^{4}}{16}-\frac{75r_d^{2}\eta^{2}v^{4}}{16}+\frac{375r_d^{2}\eta^{3}v^{4}}{16}+\frac{55v^{6}}{16}-\frac{215\eta v^{6}}{16}+\frac{29\eta^{2}v^{6}}{4}+\frac{325\eta^{3}v^{6}}{16})+\frac{m^{2}}{r^{2}}(-\frac{731r_d^{4}\eta}{48}+\frac{41r_d^{4}\eta^{2}}{4}+6r_d^{4}\eta^{3}+\frac{3r_d^{2}v^{2}}{4}+\frac{31r_d^{2}\eta v^{2}}{2}-\frac{815r_d^{2}\eta^{2}v^{2}}{16}-\frac{81r_d^{2}\eta^{3}v^{2}}{4}+\frac{135v^{4}}{16}-\frac{97\eta v^{4}}{8}+\frac{203\eta^{2}v^{4}}{8}-\frac{27\eta^{3}v^{4}}{4})+\frac{m^{3}}{r^{3}}(\frac{3r_d^{2}}{2}+\frac{803r_d^{2}\eta}{840}+\frac{51r_d^{2}\eta^{2}}{4}+\frac{7r_d^{2}\eta^{3}}{2}-\frac{123r_d^{2}\eta\pi^{2}}{64}+\frac{5v^{2}}{4}-\frac{6747\eta v^{2}}{280}-\frac{21\eta^{2}v^{2}}{4}+\frac{\eta^{3}v^{2}}{2}+\frac{41\eta\pi^{2}v^{2}}{64}+22r_d^{2}\eta\ln(\frac{r}{r_{0}})-\frac{22\eta v^{2}}{3}\ln(\frac{r}{r_{0}}))+\frac{m^{4}}{r^{4}}(\frac{3}{8}+\frac{2747\eta}{140}-\frac{11\lambda\eta}{3}-\frac{22\eta}{3}\ln(\frac{r}{r_{0}})))',
+    },
+    'GW' : {
+        'h_plus_LO' : r'-dr^2 (\cos (\Theta ) (\cos (\alpha ) \cos (\phi )-\sin (\alpha ) \cos (\iota ) \sin (\phi ))-\sin (\Theta ) \sin (\iota ) \sin (\phi ))^2+dr^2 (\cos (\alpha ) \cos (\iota ) \sin (\phi )+\sin (\alpha ) \cos (\phi ))^2+r (2 dr d\phi (\cos (\Theta ) (\sin (\alpha ) \cos (\iota ) \cos (\phi )+\cos (\alpha ) \sin (\phi ))+\sin (\Theta ) \sin (\iota ) \cos (\phi )) (\cos (\Theta ) (\cos (\alpha ) \cos (\phi )-\sin (\alpha ) \cos (\iota ) \sin (\phi ))-\sin (\Theta ) \sin (\iota ) \sin (\phi ))-2 dr d\phi (\cos (\alpha ) \cos (\iota ) \sin (\phi )+\sin (\alpha ) \cos (\phi )) (\sin (\alpha ) \sin (\phi )-\cos (\alpha ) \cos (\iota ) \cos (\phi )))+r^2 (d\phi^2 (\sin (\alpha ) \sin (\phi )-\cos (\alpha ) \cos (\iota ) \cos (\phi ))^2-d\phi^2 (\cos (\Theta ) (\sin (\alpha ) \cos (\iota ) \cos (\phi )+\cos (\alpha ) \sin (\phi ))+\sin (\Theta ) \sin (\iota ) \cos (\phi ))^2)+z ((\cos (\Theta ) (\cos (\alpha ) \cos (\phi )-\sin (\alpha ) \cos (\iota ) \sin (\phi ))-\sin (\Theta ) \sin (\iota ) \sin (\phi ))^2-(\sin (\alpha ) (-\cos (\phi ))-\cos (\alpha ) \cos (\iota ) \sin (\phi ))^2)',
+    },
+}
+
+orbit_tex_titles = {'coord' : 'Radial and angular coordinates:', 'b' : '\nCoefficients of b = c0*xi**(-2/3) + c1 + c2*xi**(2/3) + c3*xi**(4/3):', 'orbital' : '\nOrbital parameters:', 'energy' : '\nEnergy:', 'GW' : '\nGravitational waveforms:'}
+
+orbit_tex_NLOSO = {
+    'orbital' : {
+        'et2' : r'\left(1 + 2\epsilon L^2\right)+\frac{1}{c^2}\left(-7 \epsilon^2 \eta  L^2+17 \epsilon^2 L^2-4 \epsilon \eta +4 \epsilon\right)+\frac{1}{c^3 L^2}\left(\left(4 \epsilon \sqrt{1-4 \eta }-2 \epsilon \eta+4 \epsilon\right)L\cdot S_1+\left(-2 \epsilon \eta-4 \epsilon \sqrt{1-4 \eta }+4 \epsilon\right)L\cdot S_2\right)+\frac{1}{c^4 L^2}\left(16 \epsilon^3 \eta ^2 L^4-47 \epsilon^3 \eta  L^4+112 \epsilon^3 L^4+10 \epsilon^2 \eta ^2 L^2+2 \epsilon^2 \eta  L^2+4 \epsilon^2 L^2+11 \epsilon \eta -17 \epsilon\right)+\frac{1}{c^5}\frac{1}{2 \left(2 \epsilon L^6+L^4\right)}\left(\left(-90 \epsilon^{5/2} (\eta -2) L^4 \sqrt{\epsilon-4 \epsilon \eta }+\epsilon^{3/2} (236-79 \eta ) L^2 \sqrt{\epsilon-4 \epsilon \eta }+2 \epsilon^3 \left(32 \eta ^2-14 \sqrt{1-4 \eta } \eta -159 \eta +34 \sqrt{1-4 \eta }+124\right) L^4+\epsilon^2 \left(48 \eta ^2-16 \sqrt{1-4 \eta } \eta -315 \eta +16 \sqrt{1-4 \eta }+252\right) L^2+\epsilon \left(8 \eta ^2-78 \eta +64\right)+2 \sqrt{\epsilon} (32-9 \eta ) \sqrt{\epsilon-4 \epsilon \eta }\right) L\cdot S_1+\left(90 \epsilon^{5/2} (\eta -2) L^4 \sqrt{\epsilon-4 \epsilon \eta }+\epsilon^{3/2} (79 \eta -236) L^2 \sqrt{\epsilon-4 \epsilon \eta }+2 \epsilon^3 \left(32 \eta ^2+\left(14 \sqrt{1-4 \eta }-159\right) \eta -34 \sqrt{1-4 \eta }+124\right) L^4+\epsilon^2 \left(48 \eta ^2+\left(16 \sqrt{1-4 \eta }-315\right) \eta -16 \sqrt{1-4 \eta }+252\right) L^2+\epsilon \left(8 \eta ^2-78 \eta +64\right)+2 \sqrt{\epsilon} (9 \eta -32) \sqrt{\epsilon-4 \epsilon \eta }\right) L\cdot S_2\right)',
+        'er2' : r'\left(1 + 2\epsilon L^2\right)+ \frac{1}{c^2}\left(5 \epsilon^2 \eta  L^2-15 \epsilon^2 L^2+2 \epsilon \eta -12 \epsilon\right)+ \frac{1}{c^3}\left(\left(-4 \epsilon^2 \eta +8 \epsilon^2 \sqrt{1-4 \eta }+8 \epsilon^2+\frac{8 \epsilon \sqrt{1-4 \eta }}{L^2}-\frac{4 \epsilon \eta }{L^2}+\frac{8 \epsilon}{L^2}\right)L\cdot S_1 + \left(-4 \epsilon^2 \eta -8 \epsilon^2 \sqrt{1-4 \eta }+8 \epsilon^2-\frac{4 \epsilon \eta }{L^2}-\frac{8 \epsilon \sqrt{1-4 \eta }}{L^2}+\frac{8 \epsilon}{L^2}\right)L\cdot S_2\right)+ \frac{1}{c^4}\left(4 \epsilon^3 \eta ^2 L^2-55 \epsilon^3 \eta  L^2+80 \epsilon^3 L^2+\epsilon^2 \eta ^2+\epsilon^2 \eta +26 \epsilon^2+\frac{22 \epsilon \eta }{L^2}-\frac{34 \epsilon}{L^2}\right)+ \frac{1}{c^5}\left(\frac{\epsilon}{L^4}\left(\epsilon^2 \left(-6 \eta ^2+\left(19 \sqrt{1-4 \eta }+49\right) \eta -80 \left(\sqrt{1-4 \eta }+1\right)\right) L^4+2 \epsilon \left(5 \eta ^2-8 \sqrt{1-4 \eta } \eta -35 \eta +2 \sqrt{1-4 \eta }+2\right) L^2+8 \eta ^2-6 \left(3 \sqrt{1-4 \eta }+13\right) \eta +64 \left(\sqrt{1-4 \eta }+1\right)\right)L\cdot S_1 + \frac{\epsilon}{L^4} \left(\epsilon^2 \left(-6 \eta ^2+\left(49-19 \sqrt{1-4 \eta }\right) \eta +80 \left(\sqrt{1-4 \eta }-1\right)\right) L^4+2 \epsilon \left(5 \eta ^2+\left(8 \sqrt{1-4 \eta }-35\right) \eta -2 \sqrt{1-4 \eta }+2\right) L^2+8 \eta ^2-78 \eta +18 \eta  \sqrt{1-4 \eta }-64 \sqrt{1-4 \eta }+64\right)L\cdot S_2\right)',
+        'ar' : r'\frac{1}{2 \epsilon}+\frac{7-\eta }{4 c^2}+\frac{1}{2 c^3 L^2}\left(\left(\eta - 2 \sqrt{1-4 \eta } - 2\right) L\cdot S_1+\left(\eta +2 \sqrt{1-4 \eta }-2\right) L\cdot S_2\right)+\frac{1}{8 c^4 L^2}\left(\epsilon \left(\eta ^2+10 \eta +1\right) L^2-22 \eta +34\right)+\frac{1}{8 c^5 L^4}\left(L\cdot S_1 \left(\epsilon \left(-6 \eta ^2+\left(5 \sqrt{1-4 \eta }+19\right) \eta -8 \left(\sqrt{1-4 \eta }+1\right)\right) L^2-8 \eta ^2-64 \left(\sqrt{1-4 \eta }+1\right)+6 \left(3 \sqrt{1-4 \eta }+13\right) \eta \right)-L\cdot S_2 \left(\epsilon \left(6 \eta ^2+\left(5 \sqrt{1-4 \eta }-19\right) \eta -8 \sqrt{1-4 \eta }+8\right) L^2+8 \eta ^2+18 \sqrt{1-4 \eta } \eta -78 \eta -64 \sqrt{1-4 \eta }+64\right)\right)',
+        'n' : r'2 \left(\sqrt{2} \epsilon^{3/2}\right)-\frac{\epsilon^{5/2}}{\sqrt{2} c^2} (\eta -15)+\frac{\epsilon^{7/2}}{8 \sqrt{2} c^4} \left(11 \eta ^2+30 \eta +555\right)',
+        'ephi2' : r'(1+2\epsilon L^2) + \frac{1}{c^2}\left(\epsilon^2 \eta  L^2-15 \epsilon^2 L^2-12 \epsilon\right) + \frac{1}{c^3}\left(\left(-4 \epsilon^2 \eta +8 \epsilon^2 \sqrt{1-4 \eta }+8 \epsilon^2+\frac{8 \epsilon \sqrt{1-4 \eta }}{L^2}-\frac{4 \epsilon \eta }{L^2}+\frac{8 \epsilon}{L^2}\right)L\cdot S_1 + \left(-4 \epsilon^2 \eta -8 \epsilon^2 \sqrt{1-4 \eta }+8 \epsilon^2-\frac{4 \epsilon \eta }{L^2}-\frac{8 \epsilon \sqrt{1-4 \eta }}{L^2}+\frac{8 \epsilon}{L^2}\right)L\cdot S_2\right) + \frac{1}{c^4}\left(\frac{3}{2} \epsilon^3 \eta ^2 L^2-15 \epsilon^3 \eta  L^2+80 \epsilon^3 L^2+\frac{9 \epsilon^2 \eta ^2}{2}+44 \epsilon^2 \eta -8 \epsilon^2+\frac{15 \epsilon \eta ^2}{8 L^2}+\frac{29 \epsilon \eta }{L^2}-\frac{51 \epsilon}{L^2}\right) + \frac{1}{c^5}\left(\left(31 \epsilon^3 \eta +\epsilon^3 \eta  \sqrt{1-4 \eta }-80 \epsilon^3 \sqrt{1-4 \eta }-80 \epsilon^3+\frac{4 \epsilon^2 \eta ^2}{L^2}+\frac{68 \epsilon^2 \sqrt{1-4 \eta }}{L^2}-\frac{30 \epsilon^2 \sqrt{1-4 \eta } \eta }{L^2}-\frac{144 \epsilon^2 \eta }{L^2}+\frac{68 \epsilon^2}{L^2}+\frac{3 \epsilon \eta ^2}{2 L^4}+\frac{96 \epsilon \sqrt{1-4 \eta }}{L^4}-\frac{33 \epsilon \sqrt{1-4 \eta } \eta }{2 L^4}-\frac{213 \epsilon \eta }{2 L^4}+\frac{96 \epsilon}{L^4}\right)L\cdot S_1 + \left(\epsilon^3 \left(-\sqrt{1-4 \eta }\right) \eta +31 \epsilon^3 \eta +80 \epsilon^3 \sqrt{1-4 \eta }-80 \epsilon^3+\frac{4 \epsilon^2 \eta ^2}{L^2}+\frac{30 \epsilon^2 \eta  \sqrt{1-4 \eta }}{L^2}-\frac{144 \epsilon^2 \eta }{L^2}-\frac{68 \epsilon^2 \sqrt{1-4 \eta }}{L^2}+\frac{68 \epsilon^2}{L^2}+\frac{3 \epsilon \eta ^2}{2 L^4}+\frac{33 \epsilon \eta  \sqrt{1-4 \eta }}{2 L^4}-\frac{96 \epsilon \sqrt{1-4 \eta }}{L^4}-\frac{213 \epsilon \eta }{2 L^4}+\frac{96 \epsilon}{L^4}\right)L\cdot S_2\right)',
+    },
+    'Kepler' : {
+        'f_4t' : r'\frac{3 \sqrt{2} \epsilon^{3/2} (5-2 \eta )}{L}',
+        'f_5t' : r'\frac{\epsilon^{3/2}}{2 \sqrt{2} L^3} \left(\left(-14 \eta ^2+\left(35 \sqrt{1-4 \eta }+73\right) \eta -48 \left(\sqrt{1-4 \eta }+1\right)\right) L\cdot S_1+\left(-14 \eta ^2+\left(73-35 \sqrt{1-4 \eta }\right) \eta +48 \left(\sqrt{1-4 \eta }-1\right)\right) L\cdot S_2\right)',
+        'g_4t' : r'-\frac{\epsilon^{3/2} \eta  (\eta +4) \sqrt{4 \epsilon L^2+2}}{4 L}',
+        'g_5t' : r'\frac{\epsilon^{3/2}}{2 L^3} \sqrt{4 \epsilon L^2+2} \left(\left(-3 \eta ^2+\left(9 \sqrt{1-4 \eta }+11\right) \eta -4 \left(\sqrt{1-4 \eta }+1\right)\right) L\cdot S_1+\left(-3 \eta ^2-9 \sqrt{1-4 \eta } \eta +11 \eta +4 \sqrt{1-4 \eta }-4\right) L\cdot S_2\right)',
+    },
+    'angular' : {
+        'd2' : r'L+\frac{1}{c^2}\left(3 \epsilon \eta  L-\epsilon L\right) + \frac{1}{c^4}\left(3 \epsilon^2 \eta ^2 L-\frac{9}{2} \epsilon^2 \eta  L+\epsilon^2 L\right)',
+        'd3' : r'\frac{1}{c^2}\left(2 \eta  L-4 L\right) + \frac{1}{2 L c^3}\left(\left(-\eta +2 \sqrt{1-4 \eta }+2\right)L\cdot S_1 + \left(-\eta -2 \sqrt{1-4 \eta }+2\right)L\cdot S_2\right) + \frac{1}{c^4}\left(8 \epsilon \eta ^2 L-22 \epsilon \eta  L+4 \epsilon L\right) + \frac{\eta \epsilon}{8 L c^5}\left(\left(-18 \eta +31 \sqrt{1-4 \eta }+21\right)L\cdot S_1 + \left(-18 \eta -31 \sqrt{1-4 \eta }+21\right)L\cdot S_2\right)',
+        'd4' : r'\frac{1}{c^4}\left(5 \eta ^2 L-11 \eta  L+\frac{17 L}{2}\right) + \frac{1}{8 L c^5}\left(\left(-18 \eta ^2+23 \sqrt{1-4 \eta } \eta +21 \eta -24 \sqrt{1-4 \eta }-24\right)L\cdot S_1 + \left(-18 \eta ^2-23 \sqrt{1-4 \eta } \eta +21 \eta +24 \sqrt{1-4 \eta }-24\right)L\cdot S_2\right)',
+        'd5' : r'\frac{1}{c^4}\left(\frac{\eta  L^3}{2}-\eta ^2 L^3\right) + \frac{1}{c^5}\left(\left(\frac{9 \eta ^2 L}{4}-\frac{15}{4} \sqrt{1-4 \eta } \eta  L-\frac{17 \eta  L}{4}+\sqrt{1-4 \eta } L+L\right)L\cdot S_1 + \left(\frac{9 \eta ^2 L}{4}+\frac{15}{4} \sqrt{1-4 \eta } \eta  L-\frac{17 \eta  L}{4}-\sqrt{1-4 \eta } L+L\right)L\cdot S_2\right)',
+    },
+    'precession' : {
+        'f_3L' : r'\left(1 + \sqrt{1 - 4\eta} -\frac{\eta}{2}\right)\frac{1}{r^3}',
+        'f_5L' : r'\left(\epsilon \eta  \left(-18 \eta +31 \sqrt{1-4 \eta }+21\right) r^2+6 \eta  \left(\eta -\sqrt{1-4 \eta }-1\right) L^2+\left(-18 \eta ^2+23\eta\sqrt{1-4 \eta }+21\eta -24\sqrt{1-4 \eta }-24\right) r\right)\frac{1}{8 r^5}',
+        'g_3L' : r'\left(1 - \sqrt{1 - 4\eta} -\frac{\eta}{2}\right)\frac{1}{r^3}',
+        'g_5L' : r'\left(\epsilon \eta  \left(-18 \eta -31 \sqrt{1-4 \eta }+21\right) r^2+6 \eta  \left(\eta +\sqrt{1-4 \eta }-1\right) L^2+\left(-18 \eta ^2-23\eta\sqrt{1-4 \eta } +21 \eta +24 \sqrt{1-4 \eta }-24\right) r\right)\frac{1}{8 r^5}',
+    },
+    'iterative' : {
+        'E' : r'-\frac{\left(\eta ^2+15 \eta -15\right) n^2}{48 c^4}+\frac{(\eta -15) n^{4/3}}{24 c^2}+\frac{n^{2/3}}{2}',
+        'L' : r'\frac{n s_1\text{kds1} \left(\text{et}^2^2 \left(135 (\eta -2) \sqrt{(1-4 \eta ) n^{2/3}}+\left(-94 \eta ^2+38 \sqrt{1-4 \eta } \eta +443 \eta -42 \sqrt{1-4 \eta }-312\right) \sqrt[3]{n}\right)-\text{et}^2 \left(3 (11 \eta +56) \sqrt{(1-4 \eta ) n^{2/3}}+\left(2 \eta ^2-64 \sqrt{1-4 \eta } \eta -169 \eta +168\right) \sqrt[3]{n}\right)+6 (\eta +9) \left(\sqrt{(1-4 \eta ) n^{2/3}}-\sqrt{1-4 \eta } \sqrt[3]{n}\right)\right)-n s_2\text{kds2} \left(\text{et}^2^2 \left(135 (\eta -2) \sqrt{(1-4 \eta ) n^{2/3}}+\left(94 \eta ^2+38 \sqrt{1-4 \eta } \eta -443 \eta -42 \sqrt{1-4 \eta }+312\right) \sqrt[3]{n}\right)-3 \text{et}^2 (11 \eta +56) \sqrt{(1-4 \eta ) n^{2/3}}+\text{et}^2 \left(2 \eta ^2+\left(64 \sqrt{1-4 \eta }-169\right) \eta +168\right) \sqrt[3]{n}+6 (\eta +9) \left(\sqrt{(1-4 \eta ) n^{2/3}}-\sqrt{1-4 \eta } \sqrt[3]{n}\right)\right)}{48 c^5 (\text{et}^2-1)^2 \text{et}^2}+\frac{n \left(\text{et}^2^2 \left(5 \eta ^2-73 \eta +33\right)-2 \text{et}^2 \left(9 \eta ^2-26 \eta +6\right)+\eta ^2-21 \eta +69\right)}{24 c^4 (\text{et}^2-1)^{3/2}}+\frac{n^{2/3} \left(\left(\eta -2 \left(\sqrt{1-4 \eta }+1\right)\right) s_1\text{kds1}+\left(\eta +2 \sqrt{1-4 \eta }-2\right) s_2\text{kds2}\right)}{2 c^3 (\text{et}^2-1)}+\frac{\sqrt[3]{n} (\text{et}^2 (5 \eta -9)+\eta +3)}{6 c^2 \sqrt{\text{et}^2-1}}+\frac{\sqrt{\text{et}^2-1}}{\sqrt[3]{n}}',
+    },
+}
+
+orbit_tex_NLOSO_titles = {'orbital' : '\nOrbital parameters:', 'Kepler' : '\nKepler\'s equation:', 'angular' : '\nAngular equation:', 'precession' : '\nPrecession equations:', 'iterative' : 'E and L in terms of et and n:'}
+
+
+def orbit_tex2py(param = 'all', tex = orbit_tex, titles = orbit_tex_titles) :
+
+    from latex2sympy2 import latex2sympy
+
+    for section, expressions in tex.items() :
+
+        if param == 'all' or param == section :
+            print(titles[section])
+
+            for name, expression in expressions.items() :
+                print(name + ' = ', latex2sympy(expression))
 
-    if param == 'all' or param == 'orbital' :
-        print('\nOrbital parameters:')
 
-        n = latex2sympy(r'(2\epsilon )^{3/2}(1-\frac{(2\epsilon )}{8c^2}(-15+\eta)+\frac{(2\epsilon )^2}{128c^4}(555+30\eta+11\eta^2)+\frac{(2\epsilon )^3}{1024c^6}(653+111\eta+7\eta^2+3\eta^3))')
-        print('n = ', n)
+def orbit_tex2py_NLOSO(param = 'all') :
 
-        et2 = latex2sympy(r'1+2 \epsilon h^2+\frac{(2 \epsilon)}{4 c^2}(8-8 \eta+(17-7 \eta)(2 \epsilon h^2)) +\frac{(2 \epsilon)^2}{8 c^4}(4(3+18 \eta+5 \eta^2)+(2 \epsilon h^2)(112-47 \eta+16 \eta^2) +\frac{16}{(2 \epsilon h^2)}(-4+7 \eta))+\frac{(2 \epsilon)^3}{840 c^6}(-70(42-830 \eta+321 \eta^2+30 \eta^3) -\frac{525}{8}(2 \epsilon h^2)(-528+200 \eta-77 \eta^2+24 \eta^3) -\frac{3}{4(2 \epsilon h^2)}(73920+(-260272+4305 \pi^2) \eta+61040 \eta^2) -\frac{1}{(2 \epsilon h^2)^2}(53760+(-176024+4305 \pi^2) \eta+15120 \eta^2))')
-        print('et2 = ', et2)
+    orbit_tex2py(param, orbit_tex_NLOSO, orbit_tex_NLOSO_titles)
 
-        ephi2 = latex2sympy(r'1+2\epsilon h^2+\frac{2\epsilon}{4c^{2}}(-24+(-15+\eta)(2\epsilon h^{2}))  +\frac{(2\epsilon)^{2}}{16c^{4}(2\epsilon h^{2})}(-416+91\eta+15\eta^{2}+2(2 \epsilon h^{2})(-20+17\eta+9\eta^{2})+(2\epsilon h^{2})^{2}(160-31\eta+3\eta^{2})) -\frac{(2\epsilon)^{3}}{13440c^{6}(2\epsilon h^{2})^{2}}(2956800+(-5627206+81795\pi^{2})\eta-14490\eta^{2}-7350\eta^{3}  -(2\epsilon h^{2})^{2}(584640+(17482+4305\pi^{2})\eta+7350\eta^{2}-8190\eta^{3}) +420(2\epsilon h^{2})^{3}(744-248\eta+31\eta^{2}+3\eta^{3}) +14(2\epsilon h^{2})(36960+7(-48716+615\pi^{2})\eta-225\eta^{2}+150\eta^{3})))')
-        print('ephi2 = ', ephi2)
 
-        er2 = latex2sympy(r'1+2\epsilon h^{2}+\frac{(2\epsilon )}{4c^{2}}(-24+4\eta+5(-3+\eta)(2\epsilon h^{2}))  +\frac{(2\epsilon )^{2}}{8c^{4}}(60+148\eta+2\eta^{2}+(80-45\eta+4\eta^{2})(2\epsilon h^{2})  +\frac{8}{(2\epsilon h^{2})}(-16+28\eta))+\frac{(2\epsilon )^{3}}{6720c^{6}}(2(1680-(90632+4305\pi^{2})\eta+33600\eta^{2})  +4\eta^{3})-\frac{80}{(2\epsilon h^{2})}(1008+(-21130+861\pi^{2})\eta+2268\eta^{2}) -\frac{16}{(2\epsilon h^{2})^{2}}((53760+(-176024+4305\pi^{2})\eta+15120\eta^{2})))')
-        print('er2 = ', er2)
 
-        et_to_er = latex2sympy(r'(1+\frac{(2\epsilon )}{2c^2}(8-3\eta)+\frac{(2\epsilon )^2}{c^4}\frac{1}{(2\epsilon h^2)}(8-14\eta+(36-19\eta+6\eta^2)(\epsilon h^2))+\frac{(2\epsilon )^3}{3360c^6}\frac{1}{(2\epsilon h^2)^2}(-420(2\epsilon h^2)^2(10\eta^3-34\eta^2+65\eta-160)+\epsilon h^2(105840\eta^2+(4305\pi^2-354848)\eta+87360)+30240\eta^2+(8610\pi^2-352048)\eta+107520))')
-        print('et_to_er = ', et_to_er)
+# Hyperbolic Kepler equation e*sinh(u) - u = l ==========================================================================
 
-        ephi_to_er = latex2sympy(r'(1-\frac{(2\epsilon )}{2c^{2}}\eta-\frac{(2\epsilon )^{2}}{32c^{4}}\frac{1}{(2\epsilon h^{2})}(160+357\eta-15\eta^{2}-\eta(-1+11\eta)(2\epsilon h^{2}))   +\frac{(2\epsilon )^{3}}{8960c^{6}}\frac{1}{(2\epsilon h^{2})^{2}}(-70(2\epsilon h^{2})^{2}\eta(31\eta^{2}-\eta-1)+5(2\epsilon h^{2})(-1050\eta^{3})  -1854)\eta-412160)')
-        print('ephi_to_er = ', ephi_to_er)
+# accuracy tiers of kepler_solve : Mikkola's starter alone (~1e-3 relative), plus one Halley step, plus the fifth order Danby-Burkardt step (machine precision)
+kepler_tiers = ('starter', 'halley', 'DB5')
 
-        ephi_to_et = latex2sympy(r'-412159+\frac{2 \epsilon (1648636-618239 \eta)}{c^2}+\frac{\epsilon (\eta^2 (19783606 \epsilon h^2+15)+\eta (65945566 \epsilon h^2-184647589)+32 (1648636 \epsilon h^2+3297267))}{16 c^4 h^2}+\frac{\epsilon (-420 \eta^2 (1121072501 \epsilon^2 h^4+692428759 \epsilon h^2-118701792)+\eta (1105113744000 \epsilon^2 h^4+4 (230426832808+1774344495 \pi ^2) \epsilon h^2+7 (2027822280 \pi ^2-82914144187))-26880 (49459080 \epsilon^2 h^4+21020089 \epsilon h^2-6594544)-210 \epsilon \eta^4 h^2 (62 \epsilon h^2+75)+6300 \epsilon \eta^3 h^2 (15387277 \epsilon h^2+3))}{6720 c^6 h^4}')
-        print('ephi_to_et = ', ephi_to_et)
+# counters of kepler_solve while an orbit is profiled (see orbit_profile), None otherwise
+kepler_counts = None
 
-    if param == 'all' or param == 'energy' :
-        print('\nEnergy:')
 
-        E_2PN = latex2sympy(r'(\frac{5v^{6}}{16}-\frac{35\eta v^{6}}{16}+\frac{65\eta^{2}v^{6}}{16}+\frac{m}{r}(-\frac{3r_d^{4}\eta}{8}+\frac{9r_d^{4}\eta^{2}}{8}+\frac{r_d^{2}\eta v^{2}}{4}-\frac{15r_d^{2}\eta^{2}v^{2}}{4}+\frac{21v^{4}}{8}-\frac{23\eta v^{4}}{8}-\frac{27\eta^{2}v^{4}}{8})+\frac{m^{2}}{r^{2}}(\frac{r_d^{2}}{2}+\frac{69r_d^{2}\eta}{8}+\frac{3r_d^{2}\eta^{2}}{2}+\frac{7v^{2}}{4}-\frac{55\eta v^{2}}{8}+\frac{\eta^{2}v^{2}}{2})+\frac{m^{3}}{r^{3}}(-\frac{1}{2}-\frac{15\eta}{4}))')
-        print('E_2PN = ', E_2PN)
+def cubic(e, l) : # returns the root of the depressed cubic equation (4e+1/2)s^3 + 3(e-1)s == l
 
-        E_3PN = latex2sympy(r'(\frac{35v^{8}}{128}-\frac{413\eta v^{8}}{128}+\frac{833\eta^{2}v^{8}}{64}-\frac{2261\eta^{3}v^{8}}{128}+\frac{m}{r}(\frac{5r_d^{6}\eta}{16}-\frac{25r_d^{6}\eta^{2}}{16}+\frac{25r_d^{6}\eta^{3}}{16}-\frac{9r_d^{4}\eta v^{2}}{16}+\frac{21r_d^{4}\eta^{2}v^{2}}{4}-\frac{165r_d^{4}\eta^{3}v^{2}}{16}-\frac{21r_d^{2}\eta v^{4}}{16}-\frac{75r_d^{2}\eta^{2}v^{4}}{16}+\frac{375r_d^{2}\eta^{3}v^{4}}{16}+\frac{55v^{6}}{16}-\frac{215\eta v^{6}}{16}+\frac{29\eta^{2}v^{6}}{4}+\frac{325\eta^{3}v^{6}}{16})+\frac{m^{2}}{r^{2}}(-\frac{731r_d^{4}\eta}{48}+\frac{41r_d^{4}\eta^{2}}{4}+6r_d^{4}\eta^{3}+\frac{3r_d^{2}v^{2}}{4}+\frac{31r_d^{2}\eta v^{2}}{2}-\frac{815r_d^{2}\eta^{2}v^{2}}{16}-\frac{81r_d^{2}\eta^{3}v^{2}}{4}+\frac{135v^{4}}{16}-\frac{97\eta v^{4}}{8}+\frac{203\eta^{2}v^{4}}{8}-\frac{27\eta^{3}v^{4}}{4})+\frac{m^{3}}{r^{3}}(\frac{3r_d^{2}}{2}+\frac{803r_d^{2}\eta}{840}+\frac{51r_d^{2}\eta^{2}}{4}+\frac{7r_d^{2}\eta^{3}}{2}-\frac{123r_d^{2}\eta\pi^{2}}{64}+\frac{5v^{2}}{4}-\frac{6747\eta v^{2}}{280}-\frac{21\eta^{2}v^{2}}{4}+\frac{\eta^{3}v^{2}}{2}+\frac{41\eta\pi^{2}v^{2}}{64}+22r_d^{2}\eta\ln(\frac{r}{r_{0}})-\frac{22\eta v^{2}}{3}\ln(\frac{r}{r_{0}}))+\frac{m^{4}}{r^{4}}(\frac{3}{8}+\frac{2747\eta}{140}-\frac{11\lambda\eta}{3}-\frac{22\eta}{3}\ln(\frac{r}{r_{0}})))')
-        print('E_3PN = ', E_3PN)
+    alpha = (e-1)/(4*e+0.5)
+    beta = 0.5*l/(4*e+0.5)
 
+    # the root z - alpha/z written as 2beta/(z^2 + alpha + alpha^2/z^2) with z^3 = |beta| + sqrt(beta^2 + alpha^3),
+    # which has no cancellation at small l and no beta/|beta| (NaN at l = 0, the periastron)
+    z2 = cbrt(np.abs(beta) + np.sqrt(beta**2 + alpha**3))**2
 
-    if param == 'all' or param == 'GW' : 
-        print('\nGravitational waveforms:')
+    return 2*beta/(z2 + alpha + alpha**2/z2)
 
-        h_plus_LO = latex2sympy(r'-dr^2 (\cos (\Theta ) (\cos (\alpha ) \cos (\phi )-\sin (\alpha ) \cos (\iota ) \sin (\phi ))-\sin (\Theta ) \sin (\iota ) \sin (\phi ))^2+dr^2 (\cos (\alpha ) \cos (\iota ) \sin (\phi )+\sin (\alpha ) \cos (\phi ))^2+r (2 dr d\phi (\cos (\Theta ) (\sin (\alpha ) \cos (\iota ) \cos (\phi )+\cos (\alpha ) \sin (\phi ))+\sin (\Theta ) \sin (\iota ) \cos (\phi )) (\cos (\Theta ) (\cos (\alpha ) \cos (\phi )-\sin (\alpha ) \cos (\iota ) \sin (\phi ))-\sin (\Theta ) \sin (\iota ) \sin (\phi ))-2 dr d\phi (\cos (\alpha ) \cos (\iota ) \sin (\phi )+\sin (\alpha ) \cos (\phi )) (\sin (\alpha ) \sin (\phi )-\cos (\alpha ) \cos (\iota ) \cos (\phi )))+r^2 (d\phi^2 (\sin (\alpha ) \sin (\phi )-\cos (\alpha ) \cos (\iota ) \cos (\phi ))^2-d\phi^2 (\cos (\Theta ) (\sin (\alpha ) \cos (\iota ) \cos (\phi )+\cos (\alpha ) \sin (\phi ))+\sin (\Theta ) \sin (\iota ) \cos (\phi ))^2)+z ((\cos (\Theta ) (\cos (\alpha ) \cos (\phi )-\sin (\alpha ) \cos (\iota ) \sin (\phi ))-\sin (\Theta ) \sin (\iota ) \sin (\phi ))^2-(\sin (\alpha ) (-\cos (\phi ))-\cos (\alpha ) \cos (\iota ) \sin (\phi ))^2)')
-        print('h_plus_LO = ', h_plus_LO)
 
+def kepler_starter(e, l, out=None) : # Mikkola's starting value of u, written into out if given
 
-def orbit_tex2py_NLOSO(param = 'all') :
-    
-    if param == 'all' or param == 'orbital' :
-        print('\nOrbital parameters:')
+    s = cubic(e, l)
+    s += 0.0071*s**5/((1+0.45*s**2)*(1+4*s**2)*e) # error on s
 
-        et2 = latex2sympy(r'\left(1 + 2\epsilon L^2\right)+\frac{1}{c^2}\left(-7 \epsilon^2 \eta  L^2+17 \epsilon^2 L^2-4 \epsilon \eta +4 \epsilon\right)-\frac{1}{c^3 L^2}\left(\left(4 \epsilon \sqrt{1-4 \eta }-2 \epsilon \eta+4 \epsilon\right)L\cdot S_1+\left(-2 \epsilon \eta-4 \epsilon \sqrt{1-4 \eta }+4 \epsilon\right)L\cdot S_2\right)+\frac{1}{c^4 L^2}\left(16 \epsilon^3 \eta ^2 L^4-47 \epsilon^3 \eta  L^4+112 \epsilon^3 L^4+10 \epsilon^2 \eta ^2 L^2+2 \epsilon^2 \eta  L^2+4 \epsilon^2 L^2+11 \epsilon \eta -17 \epsilon\right)+\frac{1}{c^5}\frac{1}{2 \left(2 \epsilon L^6+L^4\right)}\left(\left(-90 \epsilon^{5/2} (\eta -2) L^4 \sqrt{\epsilon-4 \epsilon \eta }+\epsilon^{3/2} (236-79 \eta ) L^2 \sqrt{\epsilon-4 \epsilon \eta }+2 \epsilon^3 \left(32 \eta ^2-14 \sqrt{1-4 \eta } \eta -159 \eta +34 \sqrt{1-4 \eta }+124\right) L^4+\epsilon^2 \left(48 \eta ^2-16 \sqrt{1-4 \eta } \eta -315 \eta +16 \sqrt{1-4 \eta }+252\right) L^2+\epsilon \left(8 \eta ^2-78 \eta +64\right)+2 \sqrt{\epsilon} (32-9 \eta ) \sqrt{\epsilon-4 \epsilon \eta }\right) L\cdot S_1+\left(90 \epsilon^{5/2} (\eta -2) L^4 \sqrt{\epsilon-4 \epsilon \eta }+\epsilon^{3/2} (79 \eta -236) L^2 \sqrt{\epsilon-4 \epsilon \eta }+2 \epsilon^3 \left(32 \eta ^2+\left(14 \sqrt{1-4 \eta }-159\right) \eta -34 \sqrt{1-4 \eta }+124\right) L^4+\epsilon^2 \left(48 \eta ^2+\left(16 \sqrt{1-4 \eta }-315\right) \eta -16 \sqrt{1-4 \eta }+252\right) L^2+\epsilon \left(8 \eta ^2-78 \eta +64\right)+2 \sqrt{\epsilon} (9 \eta -32) \sqrt{\epsilon-4 \epsilon \eta }\right) L\cdot S_2\right)')
-        print('et2 = ', et2)
+    return np.multiply(3, np.arcsinh(s), out=out)
 
-        er2 = latex2sympy(r'\left(1 + 2\epsilon L^2\right)+ \frac{1}{c^2}\left(5 \epsilon^2 \eta  L^2-15 \epsilon^2 L^2+2 \epsilon \eta -12 \epsilon\right)+ \frac{1}{c^3}\left(\left(-4 \epsilon^2 \eta +8 \epsilon^2 \sqrt{1-4 \eta }+8 \epsilon^2+\frac{8 \epsilon \sqrt{1-4 \eta }}{L^2}-\frac{4 \epsilon \eta }{L^2}+\frac{8 \epsilon}{L^2}\right)L\cdot S_1 + \left(-4 \epsilon^2 \eta -8 \epsilon^2 \sqrt{1-4 \eta }+8 \epsilon^2-\frac{4 \epsilon \eta }{L^2}-\frac{8 \epsilon \sqrt{1-4 \eta }}{L^2}+\frac{8 \epsilon}{L^2}\right)L\cdot S_2\right)+ \frac{1}{c^4}\left(4 \epsilon^3 \eta ^2 L^2-55 \epsilon^3 \eta  L^2+80 \epsilon^3 L^2+\epsilon^2 \eta ^2+\epsilon^2 \eta +26 \epsilon^2+\frac{22 \epsilon \eta }{L^2}-\frac{34 \epsilon}{L^2}\right)+ \frac{1}{c^5}\left(\frac{\epsilon}{L^4}\left(\epsilon^2 \left(-6 \eta ^2+\left(19 \sqrt{1-4 \eta }+49\right) \eta -80 \left(\sqrt{1-4 \eta }+1\right)\right) L^4+2 \epsilon \left(5 \eta ^2-8 \sqrt{1-4 \eta } \eta -35 \eta +2 \sqrt{1-4 \eta }+2\right) L^2+8 \eta ^2-6 \left(3 \sqrt{1-4 \eta }+13\right) \eta +64 \left(\sqrt{1-4 \eta }+1\right)\right)L\cdot S_1 + \frac{\epsilon}{L^4} \left(\epsilon^2 \left(-6 \eta ^2+\left(49-19 \sqrt{1-4 \eta }\right) \eta +80 \left(\sqrt{1-4 \eta }-1\right)\right) L^4+2 \epsilon \left(5 \eta ^2+\left(8 \sqrt{1-4 \eta }-35\right) \eta -2 \sqrt{1-4 \eta }+2\right) L^2+8 \eta ^2-78 \eta +18 \eta  \sqrt{1-4 \eta }-64 \sqrt{1-4 \eta }+64\right)L\cdot S_2\right)')
-        print('er2 = ', er2)
 
-        ar = latex2sympy(r'\frac{1}{2 \epsilon}+\frac{7-\eta }{4 c^2}+\frac{1}{2 c^3 L^2}\left(\left(\eta - 2 \sqrt{1-4 \eta } + 2\right) L\cdot S_1+\left(\eta +2 \sqrt{1-4 \eta }-2\right) L\cdot S_2\right)+\frac{1}{8 c^4 L^2}\left(\epsilon \left(\eta ^2+10 \eta +1\right) L^2-22 \eta +34\right)+\frac{1}{8 c^5 L^4}\left(L\cdot S_1 \left(\epsilon \left(-6 \eta ^2+\left(5 \sqrt{1-4 \eta }+19\right) \eta -8 \left(\sqrt{1-4 \eta }+1\right)\right) L^2-8 \eta ^2-64 \left(\sqrt{1-4 \eta }+1\right)+6 \left(3 \sqrt{1-4 \eta }+13\right) \eta \right)-L\cdot S_2 \left(\epsilon \left(6 \eta ^2+\left(5 \sqrt{1-4 \eta }-19\right) \eta -8 \sqrt{1-4 \eta }+8\right) L^2+8 \eta ^2+18 \sqrt{1-4 \eta } \eta -78 \eta -64 \sqrt{1-4 \eta }+64\right)\right)')
-        print('ar = ', ar)
+def kepler_table(e_min, e_max, l_max, n_e=64, n_l=2048) : # table of u on a regular grid in w = log(e-1) and x = asinh(l/(e-1)), starter of kepler_solve for large batches
 
-        n = latex2sympy(r'-2 \left(\sqrt{2} \epsilon^{3/2}\right)+\frac{\epsilon^{5/2}}{\sqrt{2} c^2} (\eta -15)-\frac{\epsilon^{7/2}}{8 \sqrt{2} c^4} \left(11 \eta ^2+30 \eta +555\right)')
-        print('n = ', n)
+    # u is close to linear in (w, x) both near the periastron (u ~ l/(e-1)) and far from it (u ~ x + w - log(e)), down to e -> 1
 
-        ephi2 = latex2sympy(r'(1+2\epsilon L^2) + \frac{1}{c^2}\left(\epsilon^2 \eta  L^2-15 \epsilon^2 L^2-12 \epsilon\right) + \frac{1}{c^3}\left(\left(-4 \epsilon^2 \eta +8 \epsilon^2 \sqrt{1-4 \eta }+8 \epsilon^2+\frac{8 \epsilon \sqrt{1-4 \eta }}{L^2}-\frac{4 \epsilon \eta }{L^2}+\frac{8 \epsilon}{L^2}\right)L\cdot S_1 + \left(-4 \epsilon^2 \eta -8 \epsilon^2 \sqrt{1-4 \eta }+8 \epsilon^2-\frac{4 \epsilon \eta }{L^2}-\frac{8 \epsilon \sqrt{1-4 \eta }}{L^2}+\frac{8 \epsilon}{L^2}\right)L\cdot S_2\right) + \frac{1}{c^4}\left(\frac{3}{2} \epsilon^3 \eta ^2 L^2-15 \epsilon^3 \eta  L^2+80 \epsilon^3 L^2+\frac{9 \epsilon^2 \eta ^2}{2}+44 \epsilon^2 \eta -8 \epsilon^2+\frac{15 \epsilon \eta ^2}{8 L^2}+\frac{29 \epsilon \eta }{L^2}-\frac{51 \epsilon}{L^2}\right) + \frac{1}{c^5}\left(\left(31 \epsilon^3 \eta +\epsilon^3 \eta  \sqrt{1-4 \eta }-80 \epsilon^3 \sqrt{1-4 \eta }-80 \epsilon^3+\frac{4 \epsilon^2 \eta ^2}{L^2}+\frac{68 \epsilon^2 \sqrt{1-4 \eta }}{L^2}-\frac{30 \epsilon^2 \sqrt{1-4 \eta } \eta }{L^2}-\frac{144 \epsilon^2 \eta }{L^2}+\frac{68 \epsilon^2}{L^2}+\frac{3 \epsilon \eta ^2}{2 L^4}+\frac{96 \epsilon \sqrt{1-4 \eta }}{L^4}-\frac{33 \epsilon \sqrt{1-4 \eta } \eta }{2 L^4}-\frac{213 \epsilon \eta }{2 L^4}+\frac{96 \epsilon}{L^4}\right)L\cdot S_1 + \left(\epsilon^3 \left(-\sqrt{1-4 \eta }\right) \eta +31 \epsilon^3 \eta +80 \epsilon^3 \sqrt{1-4 \eta }-80 \epsilon^3+\frac{4 \epsilon^2 \eta ^2}{L^2}+\frac{30 \epsilon^2 \eta  \sqrt{1-4 \eta }}{L^2}-\frac{144 \epsilon^2 \eta }{L^2}-\frac{68 \epsilon^2 \sqrt{1-4 \eta }}{L^2}+\frac{68 \epsilon^2}{L^2}+\frac{3 \epsilon \eta ^2}{2 L^4}+\frac{33 \epsilon \eta  \sqrt{1-4 \eta }}{2 L^4}-\frac{96 \epsilon \sqrt{1-4 \eta }}{L^4}-\frac{213 \epsilon \eta }{2 L^4}+\frac{96 \epsilon}{L^4}\right)L\cdot S_2\right)')
-        print('ephi2 = ', ephi2)
+    w = np.linspace(np.log(e_min - 1), np.log(e_max - 1), n_e)
+    x_max = np.arcsinh(l_max/(e_min - 1))
+    x = np.linspace(-x_max, x_max, n_l)
 
-    if param == 'all' or param == 'Kepler' :
-        print('\nKepler\'s equation:')
+    return {'w' : w, 'x' : x, 'u' : kepler_solve(1 + np.exp(w)[:,None], np.exp(w)[:,None]*np.sinh(x)[None,:])}
 
-        f_4t = latex2sympy(r'\frac{3 \sqrt{2} \epsilon^{3/2} (5-2 \eta )}{L}')
-        print('f_4t = ', f_4t)
 
-        f_5t = latex2sympy(r'\frac{\epsilon^{3/2}}{2 \sqrt{2} L^3} \left(\left(-14 \eta ^2+\left(35 \sqrt{1-4 \eta }+73\right) \eta -48 \left(\sqrt{1-4 \eta }+1\right)\right) L\cdot S_1+\left(-14 \eta ^2+\left(73-35 \sqrt{1-4 \eta }\right) \eta +48 \left(\sqrt{1-4 \eta }-1\right)\right) L\cdot S_2\right)')
-        print('f_5t = ', f_5t)
+def kepler_table_starter(table, e, l, out) : # bilinear interpolation of the table in (log(e-1), asinh(l/(e-1))), Mikkola's starter outside of the table
 
-        g_4t = latex2sympy(r'-\frac{\epsilon^{3/2} \eta  (\eta +4) \sqrt{4 \epsilon L^2+2}}{4 L}')
-        print('g_4t = ', g_4t)
+    w_grid, x_grid, u_grid = table['w'], table['x'], table['u']
 
-        g_5t = latex2sympy(r'\frac{\epsilon^{3/2}}{2 L^3} \sqrt{4 \epsilon L^2+2} \left(\left(-3 \eta ^2+\left(9 \sqrt{1-4 \eta }+11\right) \eta -4 \left(\sqrt{1-4 \eta }+1\right)\right) L\cdot S_1+\left(-3 \eta ^2-9 \sqrt{1-4 \eta } \eta +11 \eta +4 \sqrt{1-4 \eta }-4\right) L\cdot S_2\right)')
-        print('g_5t = ', g_5t)
+    e, w, x = np.broadcast_arrays(e, np.log(e - 1), np.arcsinh(l/(e - 1)))
 
-    if param == 'all' or param == 'angular' :
-        print('\nAngular equation:')
+    # fractional indices in the table
+    i = (w - w_grid[0])*((len(w_grid) - 1)/(w_grid[-1] - w_grid[0]))
+    j = (x - x_grid[0])*((len(x_grid) - 1)/(x_grid[-1] - x_grid[0]))
+    inside = (i >= 0) & (i <= len(w_grid) - 1) & (j >= 0) & (j <= len(x_grid) - 1)
 
-        d2 = latex2sympy(r'L+\frac{1}{c^2}\left(3 \epsilon \eta  L-\epsilon L\right) + \frac{1}{c^4}\left(3 \epsilon^2 \eta ^2 L-\frac{9}{2} \epsilon^2 \eta  L+\epsilon^2 L\right)')
-        print('d2 = ', d2)
+    i0 = np.minimum(i, len(w_grid) - 2).astype(np.intp, casting='unsafe')
+    j0 = np.minimum(j, len(x_grid) - 2).astype(np.intp, casting='unsafe')
+    np.clip(i0, 0, None, out=i0)
+    np.clip(j0, 0, None, out=j0)
+    di = i - i0
+    dj = j - j0
 
-        d3 = latex2sympy(r'\frac{1}{c^2}\left(2 \eta  L-4 L\right) + \frac{1}{2 L c^3}\left(\left(-\eta +2 \sqrt{1-4 \eta }+2\right)L\cdot S_1 + \left(\eta +2 \sqrt{1-4 \eta }-2\right)L\cdot S_2\right) + \frac{1}{c^4}\left(8 \epsilon \eta ^2 L-22 \epsilon \eta  L+4 \epsilon L\right) + \frac{\eta \epsilon}{8 L c^5}\left(\left(-18 \eta +31 \sqrt{1-4 \eta }+21\right)L\cdot S_1 + \left(-18 \eta -31 \sqrt{1-4 \eta }+21\right)L\cdot S_2\right)')
-        print('d3 = ', d3)
+    u00, u01, u10, u11 = u_grid[i0, j0], u_grid[i0, j0 + 1], u_grid[i0 + 1, j0], u_grid[i0 + 1, j0 + 1]
+    out[...] = (1 - di)*((1 - dj)*u00 + dj*u01) + di*((1 - dj)*u10 + dj*u11)
 
-        d4 = latex2sympy(r'\frac{1}{c^4}\left(5 \eta ^2 L-11 \eta  L+\frac{17 L}{2}\right) + \frac{1}{8 L c^5}\left(\left(-18 \eta ^2+23 \sqrt{1-4 \eta } \eta +21 \eta -24 \sqrt{1-4 \eta }-24\right)L\cdot S_1 + \left(-18 \eta ^2-23 \sqrt{1-4 \eta } \eta +21 \eta +24 \sqrt{1-4 \eta }-24\right)L\cdot S_2\right)')
-        print('d4 = ', d4)
+    if not np.all(inside) :
+        outside = ~inside
+        out[outside] = kepler_starter(e[outside], l[outside] if np.ndim(l) else l)
 
-        d5 = latex2sympy(r'\frac{1}{c^4}\left(\frac{\eta  L^3}{2}-\eta ^2 L^3\right) + \frac{1}{c^5}\left(\left(\frac{9 \eta ^2 L}{4}-\frac{15}{4} \sqrt{1-4 \eta } \eta  L-\frac{17 \eta  L}{4}+\sqrt{1-4 \eta } L+L\right)L\cdot S_1 + \left(\frac{9 \eta ^2 L}{4}+\frac{15}{4} \sqrt{1-4 \eta } \eta  L-\frac{17 \eta  L}{4}-\sqrt{1-4 \eta } L+L\right)L\cdot S_2\right)')
-        print('d5 = ', d5)
+    return out
 
-    if param == 'all' or param == 'precession' :
-        print('\nPrecession equations:')
 
-        f_3L = latex2sympy(r'\left(1 + \sqrt{1 - 4\eta} -\frac{\eta}{2}\right)\frac{1}{r^3}')
-        print('f_3L = ', f_3L)
+def kepler_solve(e, l, tier='DB5', out=None, table=None) : # eccentric anomaly u of e*sinh(u) - u = l, broadcasting over e and l, written into out if given
 
-        f_5L = latex2sympy(r'\left(\epsilon \eta  \left(-18 \eta +31 \sqrt{1-4 \eta }+21\right) r^2+6 \eta  \left(\eta -\sqrt{1-4 \eta }-1\right) L^2+\left(-18 \eta ^2+23\eta\sqrt{1-4 \eta }+21\eta -24\sqrt{1-4 \eta }-24\right) r\right)\frac{1}{8 r^5}')
-        print('f_5L = ', f_5L)
+    # tier is one of kepler_tiers, table (from kepler_table) replaces Mikkola's starter by an interpolation for large batches
 
-        g_3L = latex2sympy(r'\left(1 - \sqrt{1 - 4\eta} -\frac{\eta}{2}\right)\frac{1}{r^3}')
-        print('g_3L = ', g_3L)
+    if tier not in kepler_tiers :
+        raise ValueError('unknown Kepler solver tier ' + str(tier) + ', expected one of ' + str(kepler_tiers))
 
-        g_5L = latex2sympy(r'\left(\epsilon \eta  \left(-18 \eta -31 \sqrt{1-4 \eta }+21\right) r^2+6 \eta  \left(\eta +\sqrt{1-4 \eta }-1\right) L^2+\left(-18 \eta ^2-23\eta\sqrt{1-4 \eta } +21 \eta +24 \sqrt{1-4 \eta }-24\right) r\right)\frac{1}{8 r^5}')
-        print('g_5L = ', g_5L)
+    if np.iscomplexobj(e) or np.iscomplexobj(l) : # complex step of dy_dt_2_5PN_jacobian, u is continued to first order with its implicit derivative
+        u = kepler_solve(np.real(e), np.real(l), tier, None, table)
+        return u + 1j*(np.imag(l) - np.sinh(u)*np.imag(e))/(np.real(e)*np.cosh(u) - 1)
 
-    if param == 'all' or param == 'iterative' :
-        print('E and L in terms of et and n:')
+    shape = np.broadcast_shapes(np.shape(e), np.shape(l))
 
-        E = latex2sympy(r'-\frac{\left(\eta ^2+15 \eta -15\right) n^2}{48 c^4}+\frac{(\eta -15) n^{4/3}}{24 c^2}+\frac{n^{2/3}}{2}')
-        print('E = ', E)
+    if kepler_counts is not None :
+        kepler_counts['calls'] += 1
+        kepler_counts['values'] += int(np.prod(shape))
+    scalar = out is None and shape == ()
+    if out is None :
+        out = np.empty(shape)
 
-        L = latex2sympy(r'\frac{n s_1\text{kds1} \left(\text{et}^2^2 \left(135 (\eta -2) \sqrt{(1-4 \eta ) n^{2/3}}+\left(-94 \eta ^2+38 \sqrt{1-4 \eta } \eta +443 \eta -42 \sqrt{1-4 \eta }-312\right) \sqrt[3]{n}\right)-\text{et}^2 \left(3 (11 \eta +56) \sqrt{(1-4 \eta ) n^{2/3}}+\left(2 \eta ^2-64 \sqrt{1-4 \eta } \eta -169 \eta +168\right) \sqrt[3]{n}\right)+6 (\eta +9) \left(\sqrt{(1-4 \eta ) n^{2/3}}-\sqrt{1-4 \eta } \sqrt[3]{n}\right)\right)-n s_2\text{kds2} \left(\text{et}^2^2 \left(135 (\eta -2) \sqrt{(1-4 \eta ) n^{2/3}}+\left(94 \eta ^2+38 \sqrt{1-4 \eta } \eta -443 \eta -42 \sqrt{1-4 \eta }+312\right) \sqrt[3]{n}\right)-3 \text{et}^2 (11 \eta +56) \sqrt{(1-4 \eta ) n^{2/3}}+\text{et}^2 \left(2 \eta ^2+\left(64 \sqrt{1-4 \eta }-169\right) \eta +168\right) \sqrt[3]{n}+6 (\eta +9) \left(\sqrt{(1-4 \eta ) n^{2/3}}-\sqrt{1-4 \eta } \sqrt[3]{n}\right)\right)}{48 c^5 (\text{et}^2-1)^2 \text{et}^2}+\frac{n \left(\text{et}^2^2 \left(5 \eta ^2-73 \eta +33\right)-2 \text{et}^2 \left(9 \eta ^2-26 \eta +6\right)+\eta ^2-21 \eta +69\right)}{24 c^4 (\text{et}^2-1)^{3/2}}+\frac{n^{2/3} \left(\left(\eta -2 \left(\sqrt{1-4 \eta }+1\right)\right) s_1\text{kds1}+\left(\eta +2 \sqrt{1-4 \eta }-2\right) s_2\text{kds2}\right)}{2 c^3 (\text{et}^2-1)}+\frac{\sqrt[3]{n} (\text{et}^2 (5 \eta -9)+\eta +3)}{6 c^2 \sqrt{\text{et}^2-1}}+\frac{\sqrt{\text{et}^2-1}}{\sqrt[3]{n}}')
-        print('L = ', L)
+    if table is None :
+        kepler_starter(e, l, out=out)
+    else :
+        kepler_table_starter(table, e, np.broadcast_to(l, shape), out)
 
+    if tier == 'starter' :
+        return out[()] if scalar else out
 
+    f2 = e*np.sinh(out) # e*sinh(u), also the 2nd and 4th derivatives of f
+    f3 = e*np.cosh(out) # e*cosh(u), also the 3rd and 5th derivatives of f
+    fu = f2 - out - l   # f(u) = e*sinh(u) - u - l
+    f1 = f3 - 1         # f'(u)
 
-# Mikkola's method ==============================================================================================
+    if tier == 'halley' :
+        out -= 2*fu*f1/(2*f1*f1 - fu*f2)
 
-def cubic(e, l) : # returns the root of the depressed cubic equation (4e+1/2)s^3 + 3(e-1)s == l
+    else : # Danby-Burkardt's fifth order correction
 
-    alpha = (e-1)/(4*e+0.5)
-    beta = 0.5*l/(4*e+0.5)
+        u4 = -fu/f1
+        u4 = -fu/(f1 + f2*u4/2)
+        u4 = -fu/(f1 + u4*(f2/2 + f3*u4/6))
+        u4 = -fu/(f1 + u4*(f2/2 + u4*(f3/6 + f2*u4/24)))
+        out -= fu/(f1 + u4*(f2/2 + u4*(f3/6 + u4*(f2/24 + f3*u4/120))))
 
-    sign = beta/np.abs(beta)
+    return out[()] if scalar else out
 
-    z = cbrt(beta + sign*np.sqrt(beta**2+alpha**3))
 
-    return z - alpha/z
+def mikkola(e, l, DB_corr = True) : # Mikkola's solution of Kepler's equation, with or without the Danby-Burkardt correction
 
+    return kepler_solve(e, l, 'DB5' if DB_corr else 'starter')
 
-def mikkola(e, l, DB_corr = True) :
 
-    s = cubic(e, l)
-    ds = 0.0071*s**5/((1+0.45*s**2)*(1+4*s**2)*e) # error on s
-    s += ds
-    u = 3*np.log(s+np.sqrt(1+s**2))
+# Spinning compact binaries at 2.5PN =====================================================================================
 
-    # improve result with Danby Burkardt's method
+def orbit_tex_hash(tex=None) : # hash of the LaTeX of orbit_tex_NLOSO, stored in PN_generated.py to detect stale coefficient tables
 
-    if DB_corr :
+    tex = orbit_tex_NLOSO if tex is None else tex
 
-        eshu = e*np.sinh(u)
-        echu = e*np.cosh(u)
-        
-        fu  = -u + eshu - l
-        f1u = -1 + echu
-        f2u = eshu
-        f3u = echu
-        f4u = eshu
-        f5u = echu
+    return hashlib.sha256(repr(sorted((section, sorted(exprs.items())) for section, exprs in tex.items())).encode()).hexdigest()[:16]
 
-        u1 = -fu/ f1u
-        u2 = -fu/(f1u + f2u*u1/2)
-        u3 = -fu/(f1u + f2u*u2/2 + f3u*(u2*u2)/6.0)
-        u4 = -fu/(f1u + f2u*u3/2 + f3u*(u3*u3)/6.0 + f4u*(u3*u3*u3)/24.0)
-        u5 = -fu/(f1u + f2u*u4/2 + f3u*(u4*u4)/6.0 + f4u*(u4*u4*u4)/24.0 + f5u*(u4*u4*u4*u4)/120.0)
-        u += u5
 
-    return u
+if PN_generated.source_hash != orbit_tex_hash() :
+    warnings.warn('PN_generated.py was generated from another version of orbit_tex_NLOSO, run codegen_tools.write_coefficient_module()', RuntimeWarning)
 
 
-# Spinning compact binaries at 2.5PN =====================================================================================
-
 def PN_param(PN = 5) :
 
+    if np.ndim(PN) : # several orders integrated together (see spinning_orbit_2_5PN_orders), switches of the shape of PN
+        PN = np.asarray(PN)
+        return 1*(PN >= 2), 1*((PN == 3) | (PN == 5)), 1*(PN >= 4), 1*(PN == 5)
+
     if PN == 5 :
         PN5 = 1
         PN4 = 1
@@ -283,243 +332,464 @@ def PN_param(PN = 5) :
     return PN2, PN3, PN4, PN5
 
 
-def spinning_orbit_2_5PN_param(n, et, kds1, kds2, eta, S1, S2, t, PN=5) :
+def initial_mean_motion(b, et0, eta) : # mean motion n from the impact parameter b and et0 at 1PN
 
-    c = 1
-    PN2, PN3, PN4, PN5 = PN_param(PN)
+    return (np.sqrt(et0**2 - 1)/(b + np.sqrt(et0**2 - 1) * ((eta - 1)/(eta**2 - 1) + (7*eta - 6)/6)))**(3/2)
 
-    E =  n**(2/3)/2 - PN4*n**2*(eta**2 + 15*eta - 15)/(48*c**4) + PN2*(n**(4/3)*(eta - 15))/((24*c**2))
-    L =  (kds1*n*S1*(-et**2*(n**(1/3)*(2*eta**2 - 1*64*np.sqrt(-1*4*eta + 1)*eta - 1*169*eta + 168) + 3*np.sqrt(n**(2/3)*(-1*4*eta + 1))*(11*eta + 56)) + (n**(1/3)*(-1*94*eta**2 + 38*eta*np.sqrt(-1*4*eta + 1) + 443*eta - 1*42*np.sqrt(-1*4*eta + 1) - 312) + 135*np.sqrt(n**(2/3)*(-1*4*eta + 1))*(eta - 2))*(et**2)**2 + 6*(eta + 9)*(-n**(1/3)*np.sqrt(-1*4*eta + 1) + np.sqrt(n**(2/3)*(-1*4*eta + 1)))) - kds2*n*S2*(et**2*n**(1/3)*(2*eta**2 + eta*(64*np.sqrt(-1*4*eta + 1) - 169) + 168) - 1*3*et**2*(11*eta + 56)*np.sqrt(n**(2/3)*(-1*4*eta + 1)) + (n**(1/3)*(94*eta**2 + 38*eta*np.sqrt(-1*4*eta + 1) - 1*443*eta - 1*42*np.sqrt(-1*4*eta + 1) + 312) + 135*np.sqrt(n**(2/3)*(-1*4*eta + 1))*(eta - 2))*(et**2)**2 + 6*(eta + 9)*(-n**(1/3)*np.sqrt(-1*4*eta + 1) + np.sqrt(n**(2/3)*(-1*4*eta + 1)))))/((48*et**2*c**5*(et**2 - 1)**2))*PN5 + (n*(-1*2*et**2*(9*eta**2 - 1*26*eta + 6) + (5*eta**2 - 1*73*eta + 33)*(et**2)**2 + eta**2 - 1*21*eta + 69))/((24*c**4*(et**2 - 1)**(3/2)))*PN4 + (n**(2/3)*(kds1*S1*(eta - 1*2*(np.sqrt(-1*4*eta + 1) + 1)) + kds2*S2*(eta + 2*np.sqrt(-1*4*eta + 1) - 2)))/((2*c**3*(et**2 - 1)))*PN3 + (n**(1/3)*(et**2*(5*eta - 9) + eta + 3))/((6*c**2*np.sqrt(et**2 - 1)))*PN2 + np.sqrt(et**2 - 1)/(n**(1/3))
 
+def spinning_initial_conditions(b, et0, eta, S1, S2, theta10, phi10, theta20, phi20, phi0=0) : # y0 of spinning_orbit_2_5PN from b, et0 and the spin angles
 
-    # orbital param
-    er2 =  (2*L**2*E + 1) + 1*((L*S1)*kds1*E*(L**4*E**2*(-1*6*eta**2 + eta*(19*np.sqrt(-1*4*eta + 1) + 49) - 1*80*(np.sqrt(-1*4*eta + 1) + 1)) + 2*L**2*E*(5*eta**2 - 1*8*np.sqrt(-1*4*eta + 1)*eta - 1*35*eta + 2*np.sqrt(-1*4*eta + 1) + 2) + 8*eta**2 - 1*6*(3*np.sqrt(-1*4*eta + 1) + 13)*eta + 64*(np.sqrt(-1*4*eta + 1) + 1))/(L**4) + (L*S2)*kds2*E*(L**4*E**2*(-1*6*eta**2 + eta*(-1*19*np.sqrt(-1*4*eta + 1) + 49) + 80*(np.sqrt(-1*4*eta + 1) - 1)) + 2*L**2*E*(5*eta**2 + eta*(8*np.sqrt(-1*4*eta + 1) - 35) - 1*2*np.sqrt(-1*4*eta + 1) + 2) + 8*eta**2 + 18*eta*np.sqrt(-1*4*eta + 1) - 1*78*eta - 1*64*np.sqrt(-1*4*eta + 1) + 64)/(L**4))/c**5*PN5 + 1*(4*L**2*E**3*eta**2 - 1*55*E**3*eta*L**2 + 80*L**2*E**3 + E**2*eta**2 + E**2*eta + 26*E**2 - 34*E/(L**2) + (22*E*eta)/(L**2))/c**4*PN4 + 1*((L*S1)*kds1*(-1*4*E**2*eta + 8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) + (8*E*np.sqrt(-1*4*eta + 1))/(L**2)) + (L*S2)*kds2*(-1*4*E**2*eta - 1*8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) - 8*E*np.sqrt(-1*4*eta + 1)/(L**2)))/c**3*PN3 + 1*(5*L**2*E**2*eta - 1*15*E**2*L**2 + 2*E*eta - 1*12*E)/c**2*PN2
-    ar =  1*((L*S1)*kds1*(L**2*E*(-1*6*eta**2 + eta*(5*np.sqrt(-1*4*eta + 1) + 19) - 1*8*(np.sqrt(-1*4*eta + 1) + 1)) - 1*8*eta**2 + 6*eta*(3*np.sqrt(-1*4*eta + 1) + 13) - 1*64*(np.sqrt(-1*4*eta + 1) + 1)) - (L*S2)*kds2*(L**2*E*(6*eta**2 + eta*(5*np.sqrt(-1*4*eta + 1) - 19) - 1*8*np.sqrt(-1*4*eta + 1) + 8) + 8*eta**2 + 18*eta*np.sqrt(-1*4*eta + 1) - 1*78*eta - 1*64*np.sqrt(-1*4*eta + 1) + 64))/(8*L**4*c**5)*PN5 + 1*(L**2*E*(eta**2 + 10*eta + 1) - 1*22*eta + 34)/(8*L**2*c**4)*PN4 + 1*((L*S1)*kds1*(eta - 1*2*np.sqrt(-1*4*eta + 1) - 2) + (L*S2)*kds2*(eta + 2*np.sqrt(-1*4*eta + 1) - 2))/(2*L**2*c**3)*PN3 + 1/(2*E) + (7 - eta)/((4*c**2))*PN2
-    ephi2 =  (2*L**2*E + 1) + 1*((L*S1)*kds1*(E**3*eta*np.sqrt(-1*4*eta + 1) + 31*E**3*eta - 1*80*E**3*np.sqrt(-1*4*eta + 1) - 1*80*E**3 - 213*E*eta/(2*L**4) + (3*E*eta**2)/((2*L**4)) - 33*E*eta*np.sqrt(-1*4*eta + 1)/(2*L**4) + (96*E)/(L**4) + (96*E*np.sqrt(-1*4*eta + 1))/(L**4) + (68*E**2)/(L**2) - 144*E**2*eta/(L**2) + (4*E**2*eta**2)/(L**2) + (68*E**2*np.sqrt(-1*4*eta + 1))/(L**2) - 30*E**2*eta*np.sqrt(-1*4*eta + 1)/(L**2)) + (L*S2)*kds2*(E**3*(-1)*np.sqrt(-1*4*eta + 1)*eta + 31*E**3*eta + 80*E**3*np.sqrt(-1*4*eta + 1) - 1*80*E**3 - 213*E*eta/(2*L**4) + (3*E*eta**2)/((2*L**4)) + (33*E*eta*np.sqrt(-1*4*eta + 1))/((2*L**4)) + (96*E)/(L**4) - 96*E*np.sqrt(-1*4*eta + 1)/(L**4) + (68*E**2)/(L**2) - 144*E**2*eta/(L**2) + (4*E**2*eta**2)/(L**2) - 68*E**2*np.sqrt(-1*4*eta + 1)/(L**2) + (30*E**2*eta*np.sqrt(-1*4*eta + 1))/(L**2)))/c**5*PN5 + 1*(3*E**3*eta**2*L**2/2 - 1*15*E**3*eta*L**2 + 80*L**2*E**3 + 44*E**2*eta - 1*8*E**2 + (9*E**2*eta**2)/2 + (15*E*eta**2)/((8*L**2)) - 51*E/(L**2) + (29*E*eta)/(L**2))/c**4*PN4 + 1*((L*S1)*kds1*(-1*4*E**2*eta + 8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) + (8*E*np.sqrt(-1*4*eta + 1))/(L**2)) + (L*S2)*kds2*(-1*4*E**2*eta - 1*8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) - 8*E*np.sqrt(-1*4*eta + 1)/(L**2)))/c**3*PN3 + 1*(L**2*E**2*eta - 1*15*E**2*L**2 - 1*12*E)/c**2*PN2
-    
-    # Kepler's equation:
-    f_4t =  PN4*(3*np.sqrt(2)*E**(3/2)*(-1*2*eta + 5))/L
-    f_5t =  PN5*E**(3/2)*((L*S1)*kds1*(-1*14*eta**2 + eta*(35*np.sqrt(-1*4*eta + 1) + 73) - 1*48*(np.sqrt(-1*4*eta + 1) + 1)) + (L*S2)*kds2*(-1*14*eta**2 + eta*(-1*35*np.sqrt(-1*4*eta + 1) + 73) + 48*(np.sqrt(-1*4*eta + 1) - 1)))/((2*np.sqrt(2)*L**3))
-    g_4t =  -E**(3/2)*PN4*eta*(eta + 4)*np.sqrt(4*L**2*E + 2)/(4*L)
-    g_5t =  PN5*E**(3/2)*np.sqrt(4*L**2*E + 2)*((L*S1)*kds1*(-1*3*eta**2 + eta*(9*np.sqrt(-1*4*eta + 1) + 11) - 1*4*(np.sqrt(-1*4*eta + 1) + 1)) + (L*S2)*kds2*(-1*3*eta**2 - 1*9*np.sqrt(-1*4*eta + 1)*eta + 11*eta + 4*np.sqrt(-1*4*eta + 1) - 4))/((2*L**3))
+    n0 = initial_mean_motion(b, et0, eta)
+
+    s10 = np.array([np.sin(theta10)*np.cos(phi10), np.sin(theta10)*np.sin(phi10), np.cos(theta10)])
+    s20 = np.array([np.sin(theta20)*np.cos(phi20), np.sin(theta20)*np.sin(phi20), np.cos(theta20)])
+
+    kx0 = -n0**(1/3)*(S1*s10[0] + S2*s20[0])/np.sqrt(et0**2-1)
+    ky0 = -n0**(1/3)*(S1*s10[1] + S2*s20[1])/np.sqrt(et0**2-1)
+    kz0 = np.sqrt(1- kx0**2 - ky0**2)
+
+    return b, et0, kx0, ky0, kz0, s10[0], s10[1], s10[2], s20[0], s20[1], s20[2], phi0
+
+
+PN_coefficients_cache = {}
+
+def PN_coefficients(eta, S1, S2, PN=5) : # coefficients of the orbital parameters as polynomials in E, L, kds1 and kds2, built once per binary and cached
+
+    # eta, S1, S2 and PN can be arrays (ensembles, several PN orders), the coefficients then have their broadcast shape
+
+    try :
+        key = (PN, eta, S1, S2)
+        hash(key)
+    except TypeError : # arrays are keyed by their content
+        key = tuple((np.shape(x), np.asarray(x, dtype=float).tobytes()) for x in (PN, eta, S1, S2))
+
+    if key in PN_coefficients_cache :
+        return PN_coefficients_cache[key]
+
+    # the tables are evaluated by PN_generated.coefficient_kernel, generated from orbit_tex_NLOSO by codegen_tools.write_coefficient_module,
+    # one flat tuple that coefficient_shapes splits into the entries of each key, (S1 coeff, S2 coeff) pairs for the spin terms
+    values = iter(PN_generated.coefficient_kernel(eta, np.sqrt(1 - 4*eta), S1, S2, *PN_param(PN)))
+    C = {name : tuple(next(values) if size == 1 else tuple(next(values) for _ in range(size)) for size in shapes) for name, shapes in PN_generated.coefficient_shapes.items()}
+
+    if len(PN_coefficients_cache) >= 256 :
+        del PN_coefficients_cache[next(iter(PN_coefficients_cache))]
+    PN_coefficients_cache[key] = C
+
+    return C
+
+
+def spin_term(c, kds1, kds2) : # c = (S1 coeff, S2 coeff)
+
+    return c[0]*kds1 + c[1]*kds2
+
+
+def spinning_orbit_2_5PN_L(C, x, et, kds1, kds2) : # L in terms of x = n**(1/3) and et
+
+    w = et**2
+    q = np.sqrt(w - 1)
+
+    l1, l2, l3, l4, l5, lA, lB, lC = C['L']
+
+    return q/x + x*(l1 + l2*w)/q + x**3*(l3 + w*(l4 + l5*w))/(q*(w - 1)) + x**2*spin_term(lA, kds1, kds2)/(w - 1) + x**4*(w*spin_term(lB, kds1, kds2) + spin_term(lC, kds1, kds2))/(w - 1)**2
+
+
+def spinning_orbit_2_5PN_et(C, E, L, kds1, kds2) : # et**2 in terms of E and L
+
+    L2 = L*L
+    a1, a2, a3, a4, a5, sA, sB, sC, sD = C['et2']
+
+    return 1 + E*(2*L2 + a1 + E*(a2 + L2*(a4 + a5*E)) + a3/L2) + E*spin_term(sA, kds1, kds2)/L + E*(spin_term(sB, kds1, kds2) + E*L2*(spin_term(sD, kds1, kds2) + E*L2*spin_term(sC, kds1, kds2)))/(2*L*L2*(2*E*L2 + 1))
+
+
+def spinning_orbit_2_5PN_e2(c, E, L, kds1, kds2) : # er**2 or ephi**2 in terms of E and L, c = C['er2'] or C['ephi2']
+
+    L2 = L*L
+    b1, b2, b3, b4, b5, sA, sB, sC, sD = c
+
+    return 1 + E*(2*L2 + b1 + E*(b2 + L2*(b4 + b5*E)) + b3/L2) + E*(E*E*L*spin_term(sA, kds1, kds2) + E*spin_term(sB, kds1, kds2)/L + (1/L + E*L)*spin_term(sC, kds1, kds2) + spin_term(sD, kds1, kds2)/(L*L2))
+
+
+def orbital_param_from_coeffs(C, E, L, kds1, kds2) : # ar, er, ephi, d2, d3, d4, d5, f_4t, f_5t, g_4t, g_5t from the coefficients of PN_coefficients
+
+    L2 = L*L
+
+    a0, a1, a2, aA, aB, aC = C['ar']
+    ar = 1/(2*E) + a0 + a1*E + a2/L2 + (spin_term(aA, kds1, kds2) + E*spin_term(aC, kds1, kds2) + spin_term(aB, kds1, kds2)/L2)/L
+
+    er = np.sqrt(spinning_orbit_2_5PN_e2(C['er2'], E, L, kds1, kds2))
+    ephi = np.sqrt(spinning_orbit_2_5PN_e2(C['ephi2'], E, L, kds1, kds2))
+
+    # Kepler's equation
+    ft4, ft5, gt4, gt5 = C['t']
+    E32 = E*np.sqrt(E)
+    g = E32*np.sqrt(4*L2*E + 2)
+    f_4t = ft4*E32/L
+    f_5t = E32*spin_term(ft5, kds1, kds2)/L2
+    g_4t = gt4*g/L
+    g_5t = g*spin_term(gt5, kds1, kds2)/L2
 
     # angular equation
-    d2 =  L + 1*(3*L*E**2*eta**2 - 1*9*E**2*eta*L/2 + L*E**2)/c**4*PN4 + 1*(3*L*E*eta - L*E)/c**2*PN2
-    d3 =  (E*eta)*((L*S1)*kds1*(-1*18*eta + 31*np.sqrt(-1*4*eta + 1) + 21) + (L*S2)*kds2*(-1*18*eta - 1*31*np.sqrt(-1*4*eta + 1) + 21))/((8*L*c**5))*PN5 + 1*((L*S1)*kds1*(-eta + 2*np.sqrt(-1*4*eta + 1) + 2) + (L*S2)*kds2*(-eta - 2*np.sqrt(-1*4*eta + 1) + 2))/(2*L*c**3)*PN3 + 1*(8*L*E*eta**2 - 1*22*E*eta*L + 4*L*E)/c**4*PN4 + 1*(2*L*eta - 1*4*L)/c**2*PN2
-    d4 =  1*((L*S1)*kds1*(-1*18*eta**2 + 23*eta*np.sqrt(-1*4*eta + 1) + 21*eta - 1*24*np.sqrt(-1*4*eta + 1) - 24) + (L*S2)*kds2*(-1*18*eta**2 - 1*23*np.sqrt(-1*4*eta + 1)*eta + 21*eta + 24*np.sqrt(-1*4*eta + 1) - 24))/(8*L*c**5)*PN5 + 1*(5*L*eta**2 - 1*11*eta*L + (17*L)/2)/c**4*PN4
-    d5 =  1*((L*S1)*kds1*(-1*15*np.sqrt(-1*4*eta + 1)*eta*L/4 + L*np.sqrt(-1*4*eta + 1) + L - 1*17*L*eta/4 + (9*L*eta**2)/4) + (L*S2)*kds2*(15*np.sqrt(-1*4*eta + 1)*eta*L/4 - L*np.sqrt(-1*4*eta + 1) + L - 1*17*L*eta/4 + (9*L*eta**2)/4))/c**5*PN5 + 1*(-L**3*eta**2 + (L**3*eta)/2)/c**4*PN4
+    d21, d22, d31, d32, d3A, d3B, d41, d4A, d51, d5A = C['d']
+    d2 = L*(1 + E*(d21 + d22*E))
+    d3 = L*(d31 + d32*E) + spin_term(d3A, kds1, kds2) + E*spin_term(d3B, kds1, kds2)
+    d4 = d41*L + spin_term(d4A, kds1, kds2)
+    d5 = L2*(d51*L + spin_term(d5A, kds1, kds2))
+
+    return ar, er, ephi, d2, d3, d4, d5, f_4t, f_5t, g_4t, g_5t
 
-    return E, L, ar, np.sqrt(er2), np.sqrt(ephi2), d2, d3, d4, d5, f_4t, f_5t, g_4t, g_5t
+
+def spinning_orbit_2_5PN_param(n, et, kds1, kds2, eta, S1, S2, t, PN=5) :
+
+    C = PN_coefficients(eta, S1, S2, PN)
+
+    x = np.cbrt(n) if not np.iscomplexobj(n) else n**(1/3) # complex in dy_dt_2_5PN_jacobian
+    x2 = x*x
+
+    E1, E2 = C['E']
+    E = x2*(0.5 + x2*(E1 + E2*x2))
+    L = spinning_orbit_2_5PN_L(C, x, et, kds1, kds2)
+
+    return (E, L) + orbital_param_from_coeffs(C, E, L, kds1, kds2)
 
 
 def spinning_orbit_2_5PN_param_from_E_L(E, L, kds1, kds2, eta, S1, S2, PN=5) :
 
-    PN2, PN3, PN4, PN5 = PN_param(PN)
-    PN0 = 1
-    
-    # orbital param
-    n = PN0*(2*E)**(3/2) - PN2*E**(5/2)*(eta - 15)/np.sqrt(2) + PN4*E**(7/2)*(11*eta**2 + 30*eta + 555)/(8*np.sqrt(2))
-    et2 = PN0*(2*L**2*E + 1) + 1*(16*L**4*E**3*eta**2 - 1*47*E**3*eta*L**4 + 112*L**4*E**3 + 10*L**2*E**2*eta**2 + 2*L**2*E**2*eta + 4*L**2*E**2 + 11*E*eta - 1*17*E)/(L**2*c**4)*PN4 + 2*E*((L*S1)*kds1*(-eta + 2*np.sqrt(-1*4*eta + 1) + 2) - (L*S2)*kds2*(eta + 2*np.sqrt(-1*4*eta + 1) - 2))/(L**2*c**3)*PN3 + 1*1*((L*S1)*kds1*(2*L**4*E**3*(32*eta**2 - 1*14*np.sqrt(-1*4*eta + 1)*eta - 1*159*eta + 34*np.sqrt(-1*4*eta + 1) + 124) - 1*90*E**(5/2)*(eta - 2)*L**4*np.sqrt(-1*4*E*eta + E) + L**2*E**2*(48*eta**2 - 1*16*np.sqrt(-1*4*eta + 1)*eta - 1*315*eta + 16*np.sqrt(-1*4*eta + 1) + 252) + L**2*E**(3/2)*(-1*79*eta + 236)*np.sqrt(-1*4*E*eta + E) + 2*np.sqrt(E)*(-1*9*eta + 32)*np.sqrt(-1*4*E*eta + E) + E*(8*eta**2 - 1*78*eta + 64)) + (L*S2)*kds2*(2*L**4*E**3*(32*eta**2 + eta*(14*np.sqrt(-1*4*eta + 1) - 159) - 1*34*np.sqrt(-1*4*eta + 1) + 124) + 90*L**4*E**(5/2)*(eta - 2)*np.sqrt(-1*4*E*eta + E) + L**2*E**2*(48*eta**2 + eta*(16*np.sqrt(-1*4*eta + 1) - 315) - 1*16*np.sqrt(-1*4*eta + 1) + 252) + L**2*E**(3/2)*(79*eta - 236)*np.sqrt(-1*4*E*eta + E) + 2*np.sqrt(E)*(9*eta - 32)*np.sqrt(-1*4*E*eta + E) + E*(8*eta**2 - 1*78*eta + 64)))/(c**5*(2*(2*L**6*E + L**4)))*PN5 + 1*(-1*7*E**2*eta*L**2 + 17*L**2*E**2 - 1*4*E*eta + 4*E)/c**2*PN2
-    er2 =  PN0*(2*L**2*E + 1) + 1*((L*S1)*kds1*E*(L**4*E**2*(-1*6*eta**2 + eta*(19*np.sqrt(-1*4*eta + 1) + 49) - 1*80*(np.sqrt(-1*4*eta + 1) + 1)) + 2*L**2*E*(5*eta**2 - 1*8*np.sqrt(-1*4*eta + 1)*eta - 1*35*eta + 2*np.sqrt(-1*4*eta + 1) + 2) + 8*eta**2 - 1*6*(3*np.sqrt(-1*4*eta + 1) + 13)*eta + 64*(np.sqrt(-1*4*eta + 1) + 1))/(L**4) + (L*S2)*kds2*E*(L**4*E**2*(-1*6*eta**2 + eta*(-1*19*np.sqrt(-1*4*eta + 1) + 49) + 80*(np.sqrt(-1*4*eta + 1) - 1)) + 2*L**2*E*(5*eta**2 + eta*(8*np.sqrt(-1*4*eta + 1) - 35) - 1*2*np.sqrt(-1*4*eta + 1) + 2) + 8*eta**2 + 18*eta*np.sqrt(-1*4*eta + 1) - 1*78*eta - 1*64*np.sqrt(-1*4*eta + 1) + 64)/(L**4))/c**5*PN5 + 1*(4*L**2*E**3*eta**2 - 1*55*E**3*eta*L**2 + 80*L**2*E**3 + E**2*eta**2 + E**2*eta + 26*E**2 - 34*E/(L**2) + (22*E*eta)/(L**2))/c**4*PN4 + 1*((L*S1)*kds1*(-1*4*E**2*eta + 8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) + (8*E*np.sqrt(-1*4*eta + 1))/(L**2)) + (L*S2)*kds2*(-1*4*E**2*eta - 1*8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) - 8*E*np.sqrt(-1*4*eta + 1)/(L**2)))/c**3*PN3 + 1*(5*L**2*E**2*eta - 1*15*E**2*L**2 + 2*E*eta - 1*12*E)/c**2*PN2
-    ar =  1*((L*S1)*kds1*(L**2*E*(-1*6*eta**2 + eta*(5*np.sqrt(-1*4*eta + 1) + 19) - 1*8*(np.sqrt(-1*4*eta + 1) + 1)) - 1*8*eta**2 + 6*eta*(3*np.sqrt(-1*4*eta + 1) + 13) - 1*64*(np.sqrt(-1*4*eta + 1) + 1)) - (L*S2)*kds2*(L**2*E*(6*eta**2 + eta*(5*np.sqrt(-1*4*eta + 1) - 19) - 1*8*np.sqrt(-1*4*eta + 1) + 8) + 8*eta**2 + 18*eta*np.sqrt(-1*4*eta + 1) - 1*78*eta - 1*64*np.sqrt(-1*4*eta + 1) + 64))/(8*L**4*c**5)*PN5 + 1*(L**2*E*(eta**2 + 10*eta + 1) - 1*22*eta + 34)/(8*L**2*c**4)*PN4 + 1*((L*S1)*kds1*(eta - 1*2*np.sqrt(-1*4*eta + 1) - 2) + (L*S2)*kds2*(eta + 2*np.sqrt(-1*4*eta + 1) - 2))/(2*L**2*c**3)*PN3 + PN0/(2*E) + (7 - eta)/((4*c**2))*PN2
-    ephi2 =  PN0*(2*L**2*E + 1) + 1*((L*S1)*kds1*(E**3*eta*np.sqrt(-1*4*eta + 1) + 31*E**3*eta - 1*80*E**3*np.sqrt(-1*4*eta + 1) - 1*80*E**3 - 213*E*eta/(2*L**4) + (3*E*eta**2)/((2*L**4)) - 33*E*eta*np.sqrt(-1*4*eta + 1)/(2*L**4) + (96*E)/(L**4) + (96*E*np.sqrt(-1*4*eta + 1))/(L**4) + (68*E**2)/(L**2) - 144*E**2*eta/(L**2) + (4*E**2*eta**2)/(L**2) + (68*E**2*np.sqrt(-1*4*eta + 1))/(L**2) - 30*E**2*eta*np.sqrt(-1*4*eta + 1)/(L**2)) + (L*S2)*kds2*(E**3*(-1)*np.sqrt(-1*4*eta + 1)*eta + 31*E**3*eta + 80*E**3*np.sqrt(-1*4*eta + 1) - 1*80*E**3 - 213*E*eta/(2*L**4) + (3*E*eta**2)/((2*L**4)) + (33*E*eta*np.sqrt(-1*4*eta + 1))/((2*L**4)) + (96*E)/(L**4) - 96*E*np.sqrt(-1*4*eta + 1)/(L**4) + (68*E**2)/(L**2) - 144*E**2*eta/(L**2) + (4*E**2*eta**2)/(L**2) - 68*E**2*np.sqrt(-1*4*eta + 1)/(L**2) + (30*E**2*eta*np.sqrt(-1*4*eta + 1))/(L**2)))/c**5*PN5 + 1*(3*E**3*eta**2*L**2/2 - 1*15*E**3*eta*L**2 + 80*L**2*E**3 + 44*E**2*eta - 1*8*E**2 + (9*E**2*eta**2)/2 + (15*E*eta**2)/((8*L**2)) - 51*E/(L**2) + (29*E*eta)/(L**2))/c**4*PN4 + 1*((L*S1)*kds1*(-1*4*E**2*eta + 8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) + (8*E*np.sqrt(-1*4*eta + 1))/(L**2)) + (L*S2)*kds2*(-1*4*E**2*eta - 1*8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) - 8*E*np.sqrt(-1*4*eta + 1)/(L**2)))/c**3*PN3 + 1*(L**2*E**2*eta - 1*15*E**2*L**2 - 1*12*E)/c**2*PN2
-    
-    # Kepler's equation:
-    f_4t =  PN4*(3*np.sqrt(2)*E**(3/2)*(-1*2*eta + 5))/L
-    f_5t =  PN5*E**(3/2)*((L*S1)*kds1*(-1*14*eta**2 + eta*(35*np.sqrt(-1*4*eta + 1) + 73) - 1*48*(np.sqrt(-1*4*eta + 1) + 1)) + (L*S2)*kds2*(-1*14*eta**2 + eta*(-1*35*np.sqrt(-1*4*eta + 1) + 73) + 48*(np.sqrt(-1*4*eta + 1) - 1)))/((2*np.sqrt(2)*L**3))
-    g_4t =  -E**(3/2)*PN4*eta*(eta + 4)*np.sqrt(4*L**2*E + 2)/(4*L)
-    g_5t =  PN5*E**(3/2)*np.sqrt(4*L**2*E + 2)*((L*S1)*kds1*(-1*3*eta**2 + eta*(9*np.sqrt(-1*4*eta + 1) + 11) - 1*4*(np.sqrt(-1*4*eta + 1) + 1)) + (L*S2)*kds2*(-1*3*eta**2 - 1*9*np.sqrt(-1*4*eta + 1)*eta + 11*eta + 4*np.sqrt(-1*4*eta + 1) - 4))/((2*L**3))
+    C = PN_coefficients(eta, S1, S2, PN)
 
-    # angular equation
-    d2 =  PN0*L + 1*(3*L*E**2*eta**2 - 1*9*E**2*eta*L/2 + L*E**2)/c**4*PN4 + 1*(3*L*E*eta - L*E)/c**2*PN2
-    d3 =  (E*eta)*((L*S1)*kds1*(-1*18*eta + 31*np.sqrt(-1*4*eta + 1) + 21) + (L*S2)*kds2*(-1*18*eta - 1*31*np.sqrt(-1*4*eta + 1) + 21))/((8*L*c**5))*PN5 + 1*((L*S1)*kds1*(-eta + 2*np.sqrt(-1*4*eta + 1) + 2) + (L*S2)*kds2*(-eta - 2*np.sqrt(-1*4*eta + 1) + 2))/(2*L*c**3)*PN3 + 1*(8*L*E*eta**2 - 1*22*E*eta*L + 4*L*E)/c**4*PN4 + 1*(2*L*eta - 1*4*L)/c**2*PN2
-    d4 =  1*((L*S1)*kds1*(-1*18*eta**2 + 23*eta*np.sqrt(-1*4*eta + 1) + 21*eta - 1*24*np.sqrt(-1*4*eta + 1) - 24) + (L*S2)*kds2*(-1*18*eta**2 - 1*23*np.sqrt(-1*4*eta + 1)*eta + 21*eta + 24*np.sqrt(-1*4*eta + 1) - 24))/(8*L*c**5)*PN5 + 1*(5*L*eta**2 - 1*11*eta*L + (17*L)/2)/c**4*PN4
-    d5 =  1*((L*S1)*kds1*(-1*15*np.sqrt(-1*4*eta + 1)*eta*L/4 + L*np.sqrt(-1*4*eta + 1) + L - 1*17*L*eta/4 + (9*L*eta**2)/4) + (L*S2)*kds2*(15*np.sqrt(-1*4*eta + 1)*eta*L/4 - L*np.sqrt(-1*4*eta + 1) + L - 1*17*L*eta/4 + (9*L*eta**2)/4))/c**5*PN5 + 1*(-L**3*eta**2 + (L**3*eta)/2)/c**4*PN4
+    n0, n1, n2 = C['n']
+    n = E*np.sqrt(E)*(n0 + E*(n1 + E*n2))
+    et = np.sqrt(spinning_orbit_2_5PN_et(C, E, L, kds1, kds2))
 
-    return n, np.sqrt(et2), ar, np.sqrt(er2), np.sqrt(ephi2), d2, d3, d4, d5, f_4t, f_5t, g_4t, g_5t
+    return (n, et) + orbital_param_from_coeffs(C, E, L, kds1, kds2)
 
 
-def dy_dt_2_5PN(y, t, t0, eta, S1, S2, t_eval, E_list, L_list, u_list, dk_list, dphi_list, radiation_reaction=False, spinning=True, PN=5) :
+def dy_dt_2_5PN(y, t, t0, eta, S1, S2, radiation_reaction=False, spinning=True, PN=5, aux=False) : # right-hand side for y of shape (len(y0), ...), broadcasting over the trailing axes
 
-    PN2, PN3, PN4, PN5 = PN_param(PN)
+    dy = np.zeros(np.shape(y), dtype=np.result_type(y, float))
 
     if spinning :
 
-        n, et, kx, ky, kz, s1x, s1y, s1z, s2x, s2y, s2z, phi = y
+        k = normalize(y[2:5], axis=0)
 
-        k = np.array([kx, ky, kz])/(kx**2 + ky**2 + kz**2)**0.5
-        if S1 != 0 and S2 != 0 :
-            s1 = np.array([s1x, s1y, s1z])/(s1x**2 + s1y**2 + s1z**2)**0.5
-            s2 = np.array([s2x, s2y, s2z])/(s2x**2 + s2y**2 + s2z**2)**0.5
-        else :
-            s1 = np.array([0, 0, 0])
-            s2 = np.array([0, 0, 0])
+        # spins are switched off for the whole binary as soon as one of them vanishes
+        spins_on = (np.asarray(S1) != 0) & (np.asarray(S2) != 0)
+        with np.errstate(invalid='ignore', divide='ignore') :
+            s1 = np.where(spins_on, normalize(y[5:8], axis=0), 0)
+            s2 = np.where(spins_on, normalize(y[8:11], axis=0), 0)
 
-        kds1 = np.dot(k, s1)
-        kds2 = np.dot(k, s2)
+        kds1 = dot(k, s1, axis=0)
+        kds2 = dot(k, s2, axis=0)
 
-        E, L, ar, er, ephi, d2, d3, d4, d5, f_4t, f_5t, g_4t, g_5t = spinning_orbit_2_5PN_param(n, et, kds1, kds2, eta, S1, S2, t, PN=PN, analytic=analytic_E_L)
+    else :
 
-        t_eval.append(t)
-        E_list.append(E)
-        L_list.append(L)
+        kds1 = 0
+        kds2 = 0
 
-        # solve Kepler's equation
+    n, et = y[0], y[1]
 
-        u1PN = mikkola(et, n*(t-t0))
-        nu1PN = 2*np.arctan(np.sqrt((ephi + 1)/(ephi - 1))*np.tanh(u1PN/2))
-        u = mikkola(et, n*(t-t0) - (f_4t + f_5t)*nu1PN - (g_4t + g_5t)*np.sin(nu1PN))
+    E, L, ar, er, ephi, d2, d3, d4, d5, f_4t, f_5t, g_4t, g_5t = spinning_orbit_2_5PN_param(n, et, kds1, kds2, eta, S1, S2, t, PN=PN)
 
-        u_list.append(u)
+    # solve Kepler's equation
 
-        dy = np.zeros(len(y))
+    u1PN = mikkola(et, n*(t-t0))
+    nu1PN = 2*np.arctan(np.sqrt((ephi + 1)/(ephi - 1))*np.tanh(u1PN/2))
+    u = mikkola(et, n*(t-t0) - (f_4t + f_5t)*nu1PN - (g_4t + g_5t)*np.sin(nu1PN))
 
-        # dn/dt and det/dt
+    # dn/dt and det/dt
 
+    if radiation_reaction :
         beta = et*np.cosh(u) - 1
+        dy[0] = -n**(11/3)*8*eta/(5*beta**7) * (-49*beta**2 - 32*beta**3 + 35*(et**2-1)*beta - 6*beta**4 + 9*et**2*beta**2)
+        dy[1] = -n**(8/3)*8*eta*(et**2-1)/(15*beta**7*et) * (-49*beta**2 - 17*beta**3 + 35*(et**2-1)*beta - 3*beta**4 + 9*et**2*beta**2)
 
-        if radiation_reaction :
-            dy[0] = -n**(11/3)*8*eta/(5*beta**7) * (-49*beta**2 - 32*beta**3 + 35*(et**2-1)*beta - 6*beta**4 + 9*et**2*beta**2)
-            dy[1] = -n**(8/3)*8*eta*(et**2-1)/(15*beta**7*et) * (-49*beta**2 - 17*beta**3 + 35*(et**2-1)*beta - 3*beta**4 + 9*et**2*beta**2)
-        else :
-            dy[0] = 0
-            dy[1] = 0
+    r = ar*(er*np.cosh(u) - 1)
+
+    if spinning :
 
         # precession equation
 
-        r = ar*(er*np.cosh(u) - 1)
+        s1crossk = cross(s1, k, axis=0)
+        s2crossk = cross(s2, k, axis=0)
 
-        s1crossk = np.cross(s1, k)
-        s2crossk = np.cross(s2, k)
+        C = PN_coefficients(eta, S1, S2, PN)
+        f3, f5a, f5b, f5c = C['f_L']
+        g3, g5a, g5b, g5c = C['g_L']
 
-        f_3L =  PN3*(-1*eta/2 + np.sqrt(-1*4*eta + 1) + 1)*1/r**3
-        f_5L =  PN5*(6*L**2*eta*(eta - np.sqrt(-1*4*eta + 1) - 1) + E*eta*r**2*(-1*18*eta + 31*np.sqrt(-1*4*eta + 1) + 21) + r*(-1*18*eta**2 + 23*eta*np.sqrt(-1*4*eta + 1) + 21*eta - 1*24*np.sqrt(-1*4*eta + 1) - 24))*1/(8*r**5)
-        g_3L =  PN3*(-1*eta/2 - np.sqrt(-1*4*eta + 1) + 1)*1/r**3
-        g_5L =  PN5*(6*L**2*eta*(eta + np.sqrt(-1*4*eta + 1) - 1) + E*eta*r**2*(-1*18*eta - 1*31*np.sqrt(-1*4*eta + 1) + 21) + r*(-1*18*eta**2 - 1*23*eta*np.sqrt(-1*4*eta + 1) + 21*eta + 24*np.sqrt(-1*4*eta + 1) - 24))*1/(8*r**5)
+        f_L = (f3 + f5b*E + (f5c + f5a*L**2/r)/r)/r**3
+        g_L = (g3 + g5b*E + (g5c + g5a*L**2/r)/r)/r**3
 
-        dk = (f_3L + f_5L)*S1*s1crossk + (g_3L + g_5L)*S2*s2crossk
-        dy[2], dy[3], dy[4] = dk[0], dk[1], dk[2]
-        ds1 = -(f_3L + f_5L)*L*s1crossk
-        dy[5], dy[6], dy[7] = ds1[0], ds1[1], ds1[2]
-        ds2 = -(g_3L + g_5L)*L*s2crossk
-        dy[8], dy[9], dy[10] = ds2[0], ds2[1], ds2[2]
-
-        dk_list.append(dk)
+        dy[2:5] = f_L*S1*s1crossk + g_L*S2*s2crossk
+        dy[5:8] = -f_L*L*s1crossk
+        dy[8:11] = -g_L*L*s2crossk
 
         # dphi/dt
 
-        dky = dy[3]
-        dkx = dy[2]
-        dalpha = (kx*dky - dkx*ky)/(kx**2 + ky**2)
+        dalpha = (y[2]*dy[3] - dy[2]*y[3])/(y[2]**2 + y[3]**2)
 
-        dy[11] = d2/r**2 + d3/r**3 + d4/r**4 + d5/r**5 - dalpha*kz
-        dphi_list.append(dy[11])
+        dy[11] = d2/r**2 + d3/r**3 + d4/r**4 + d5/r**5 - dalpha*y[4]
 
-        return dy
-    
-    else : 
+    if aux :
+        return dy, (E, L, ar, er, ephi, f_4t + f_5t, g_4t + g_5t, u)
 
-        n, et, phi0 =  y
+    return dy
 
-        kds1 = 0
-        kds2 = 0
 
-        E, L, ar, er, ephi, d2, d3, d4, d5, f_4t, f_5t, g_4t, g_5t = spinning_orbit_2_5PN_param(n, et, kds1, kds2, eta, S1, S2, t, PN=PN)
+def dy_dt_2_5PN_jacobian(y, t, t0, eta, S1, S2, radiation_reaction=False, spinning=True, PN=5) : # Jacobian J[i, ..., j] = d(dy_i/dt)/dy_j of dy_dt_2_5PN for y of shape (len(y0), ...), Dfun of odeint for a single binary
 
-        t_eval.append(t)
-        E_list.append(E)
-        L_list.append(L)
+    # the right-hand side is analytic in y (kepler_solve differentiates Kepler's equation implicitly for complex arguments),
+    # so the complex step Im f(y + ih e_j)/h gives the column j exactly, without the cancellation of finite differences,
+    # all the columns are evaluated at once along a new trailing axis (eta, S1, S2 and PN arrays must broadcast against it)
 
-        # solve Kepler's equation
+    h = 1e-30
+    Y = y[..., None] + 1j*h*np.eye(len(y)).reshape((len(y),) + (1,)*(np.ndim(y) - 1) + (len(y),))
 
-        u1PN = mikkola(et, n*(t-t0))
-        nu1PN = 2*np.arctan(np.sqrt((ephi + 1)/(ephi - 1))*np.tanh(u1PN/2))
-        u = mikkola(et, n*(t-t0) - (f_4t + f_5t)*nu1PN - (g_4t + g_5t)*np.sin(nu1PN))
+    return np.imag(dy_dt_2_5PN(Y, t, t0, eta, S1, S2, radiation_reaction, spinning, PN))/h
 
-        u_list.append(u)
 
-        dy = np.zeros(len(y))
+# Compiled backend ======================================================================================================
 
-        beta = et*np.cosh(u) - 1
+# scalar versions of dy_dt_2_5PN and of the functions it calls, compiled by numba (and cached on disk next to this file, so that
+# new processes load them instead of compiling), for the single binaries that odeint integrates one small state at a time.
+# The coefficients of PN_coefficients are passed as one flat array, coefficient_offsets locates the entries of each key.
+# The kernels are plain Python functions until compile_kernels replaces them by their numba versions
+
+coefficient_keys = ('E', 'L', 'n', 'et2', 'er2', 'ephi2', 'ar', 't', 'd', 'f_L', 'g_L')
+
+def flat_coefficients(C, keys=coefficient_keys) : # the coefficients of PN_coefficients (scalar binary) in one array, spin pairs expanded
+
+    return np.array([float(x) for key in keys for c in C[key] for x in (c if isinstance(c, tuple) else (c,))])
+
+coefficient_offsets = dict(zip(coefficient_keys, np.cumsum([0] + [len(flat_coefficients(PN_coefficients(0.2, 1., 1.), (key,))) for key in coefficient_keys]).tolist()))
+
+offset_E, offset_L, offset_er2, offset_ephi2, offset_ar, offset_t, offset_d, offset_f_L, offset_g_L = [coefficient_offsets[key] for key in ('E', 'L', 'er2', 'ephi2', 'ar', 't', 'd', 'f_L', 'g_L')]
 
-        if radiation_reaction :
-            dy[0] = -n**(11/3)*8*eta/(5*beta**7) * (-49*beta**2 - 32*beta**3 + 35*(et**2-1)*beta - 6*beta**4 + 9*et**2*beta**2)
-            dy[1] = -n**(8/3)*8*eta*(et**2-1)/(15*beta**7*et) * (-49*beta**2 - 17*beta**3 + 35*(et**2-1)*beta - 3*beta**4 + 9*et**2*beta**2)
+kernel_coefficients_cache = {}
+
+def kernel_coefficients(eta, S1, S2, PN=5) : # flat coefficients of the binary, (N, n_coefficients) for arrays eta, S1, S2 of an ensemble
+
+    key = tuple((np.shape(x), np.asarray(x, dtype=float).tobytes()) for x in (PN, eta, S1, S2))
+
+    if key not in kernel_coefficients_cache :
+        if len(kernel_coefficients_cache) >= 256 :
+            del kernel_coefficients_cache[next(iter(kernel_coefficients_cache))]
+        if np.ndim(eta) or np.ndim(S1) or np.ndim(S2) or np.ndim(PN) :
+            binaries = np.broadcast_arrays(eta, S1, S2, PN)
+            kernel_coefficients_cache[key] = np.array([flat_coefficients(PN_coefficients(float(e), float(s1), float(s2), int(order))) for e, s1, s2, order in zip(*[np.ravel(x) for x in binaries])])
         else :
-            dy[0] = 0
-            dy[1] = 0
+            kernel_coefficients_cache[key] = flat_coefficients(PN_coefficients(eta, S1, S2, PN))
 
-        return dy
+    return kernel_coefficients_cache[key]
 
 
-def spinning_orbit_2_5PN(t, t0, eta, S1, S2, y0, PN=5, analytic_E_L=True, radiation_reaction=False, spinning=True, verbose=True, num_checks=False) :
+def kepler_kernel(e, l) : # kepler_solve for scalars, Mikkola's starter and the Danby-Burkardt correction
 
-    PN2, PN3, PN4, PN5 = PN_param(PN)
+    alpha = (e - 1)/(4*e + 0.5)
+    beta = 0.5*l/(4*e + 0.5)
+    z2 = np.cbrt(np.abs(beta) + np.sqrt(beta**2 + alpha**3))**2
 
-    if verbose : print('Computing orbit at ' + str(PN/2) + 'PN ========================\n')
+    s = 2*beta/(z2 + alpha + alpha**2/z2)
+    s += 0.0071*s**5/((1 + 0.45*s**2)*(1 + 4*s**2)*e)
+    u = 3*np.arcsinh(s)
 
-    # find xi in terms of et0 and b
+    f2 = e*np.sinh(u)
+    f3 = e*np.cosh(u)
+    fu = f2 - u - l
+    f1 = f3 - 1
 
-    b = y0[0]
-    et0 = y0[1]
-    phi0 = y0[-1]
+    u4 = -fu/f1
+    u4 = -fu/(f1 + f2*u4/2)
+    u4 = -fu/(f1 + u4*(f2/2 + f3*u4/6))
+    u4 = -fu/(f1 + u4*(f2/2 + u4*(f3/6 + f2*u4/24)))
 
-    n0 = (np.sqrt(et0**2 - 1)/(b + np.sqrt(et0**2 - 1) * ((eta - 1)/(eta**2 - 1) + (7*eta - 6)/6)))**(3/2)
-    yini = np.copy(y0)
-    yini[0] = n0
+    return u - fu/(f1 + u4*(f2/2 + u4*(f3/6 + u4*(f2/24 + f3*u4/120))))
 
-    # solve differential system =================
 
-    if verbose : print('Solving differential system...')
+def spin_kernel(c, i, kds1, kds2) : # spin_term of the pair c[i], c[i+1]
 
-    t_eval, E_list, L_list, u_list, dk_list, dphi_list = [], [], [], [], [], []
+    return c[i]*kds1 + c[i+1]*kds2
 
-    sol = odeint(dy_dt_2_5PN, yini, t, args=(t0, eta, S1, S2, t_eval, E_list, L_list, u_list, dk_list, dphi_list, radiation_reaction, spinning, PN, analytic_E_L))
 
+def e2_kernel(c, o, E, L, kds1, kds2) : # spinning_orbit_2_5PN_e2 of the coefficients at offset o
 
-    if spinning : 
-        n, et, k, s1, s2, phi = sol[:,0], sol[:,1], sol[:,2:5], sol[:,5:8], sol[:,8:11], sol[:,11]
+    L2 = L*L
 
-        # set phi(t0) = phi0
-        phi_at_t0 = np.interp(t0, t, phi)
-        phi -= phi_at_t0  + phi0 
+    return (1 + E*(2*L2 + c[o] + E*(c[o+1] + L2*(c[o+3] + c[o+4]*E)) + c[o+2]/L2)
+            + E*(E*E*L*spin_kernel(c, o+5, kds1, kds2) + E*spin_kernel(c, o+7, kds1, kds2)/L + (1/L + E*L)*spin_kernel(c, o+9, kds1, kds2) + spin_kernel(c, o+11, kds1, kds2)/(L*L2)))
 
-        k = np.transpose(k)
-        s1 = np.transpose(s1)
-        s2 = np.transpose(s2)
 
-        kds1 = dot(k, s1)
-        kds2 = dot(k, s2)
+def param_kernel(c, n, et, kds1, kds2) : # spinning_orbit_2_5PN_param for scalars, returns E, L, ar, er, ephi, d2, d3, d4, d5, f_4t + f_5t, g_4t + g_5t
 
-    else :
-        n, et = sol[:,0], sol[:,1]
-        s1 = np.zeros((3, len(t)))
-        s2 = np.zeros((3, len(t)))
-        
-        kds1 = 0
-        kds2 = 0
+    x = np.cbrt(n)
+    x2 = x*x
 
-    # get system parameters ===================
+    o = offset_E
+    E = x2*(0.5 + x2*(c[o] + c[o+1]*x2))
 
-    if verbose : print('Getting system parameters...')
+    o = offset_L
+    w = et*et
+    q = np.sqrt(w - 1)
+    L = q/x + x*(c[o] + c[o+1]*w)/q + x**3*(c[o+2] + w*(c[o+3] + c[o+4]*w))/(q*(w - 1)) + x2*spin_kernel(c, o+5, kds1, kds2)/(w - 1) + x**4*(w*spin_kernel(c, o+7, kds1, kds2) + spin_kernel(c, o+9, kds1, kds2))/(w - 1)**2
+    L2 = L*L
 
-    E = np.interp(t, t_eval, E_list)
-    L = np.interp(t, t_eval, L_list)
+    o = offset_ar
+    ar = 1/(2*E) + c[o] + c[o+1]*E + c[o+2]/L2 + (spin_kernel(c, o+3, kds1, kds2) + E*spin_kernel(c, o+7, kds1, kds2) + spin_kernel(c, o+5, kds1, kds2)/L2)/L
 
-    n_2, et_2, ar, er, ephi, d2, d3, d4, d5, f_4t, f_5t, g_4t, g_5t = spinning_orbit_2_5PN_param_from_E_L(E, L, kds1, kds2, eta, S1, S2, PN=PN)
+    er = np.sqrt(e2_kernel(c, offset_er2, E, L, kds1, kds2))
+    ephi = np.sqrt(e2_kernel(c, offset_ephi2, E, L, kds1, kds2))
 
+    # Kepler's equation
+    o = offset_t
+    E32 = E*np.sqrt(E)
+    g = E32*np.sqrt(4*L2*E + 2)
+    f_t = c[o]*E32/L + E32*spin_kernel(c, o+1, kds1, kds2)/L2
+    g_t = c[o+3]*g/L + g*spin_kernel(c, o+4, kds1, kds2)/L2
 
-    # solve Kepler's equation (interpolating the u's already computed in odeint calls does not really work somehow...) =================
-    
-    u1PN = mikkola(et, n*(t-t0))
+    # angular equation
+    o = offset_d
+    d2 = L*(1 + E*(c[o] + c[o+1]*E))
+    d3 = L*(c[o+2] + c[o+3]*E) + spin_kernel(c, o+4, kds1, kds2) + E*spin_kernel(c, o+6, kds1, kds2)
+    d4 = c[o+8]*L + spin_kernel(c, o+9, kds1, kds2)
+    d5 = L2*(c[o+11]*L + spin_kernel(c, o+12, kds1, kds2))
+
+    return E, L, ar, er, ephi, d2, d3, d4, d5, f_t, g_t
+
+
+def dy_dt_2_5PN_kernel(y, t, t0, eta, S1, S2, radiation_reaction, spinning, c) : # dy_dt_2_5PN of one binary, y of shape (len(y0)), c = kernel_coefficients(eta, S1, S2, PN)
+
+    dy = np.zeros(len(y))
+
+    kds1 = 0.
+    kds2 = 0.
+    k = np.zeros(3)
+    s1 = np.zeros(3)
+    s2 = np.zeros(3)
+
+    if spinning :
+
+        k[:] = y[2:5]/np.sqrt(y[2]**2 + y[3]**2 + y[4]**2)
+
+        # spins are switched off for the whole binary as soon as one of them vanishes
+        if S1 != 0 and S2 != 0 :
+            s1[:] = y[5:8]/np.sqrt(y[5]**2 + y[6]**2 + y[7]**2)
+            s2[:] = y[8:11]/np.sqrt(y[8]**2 + y[9]**2 + y[10]**2)
+
+        kds1 = k[0]*s1[0] + k[1]*s1[1] + k[2]*s1[2]
+        kds2 = k[0]*s2[0] + k[1]*s2[1] + k[2]*s2[2]
+
+    n, et = y[0], y[1]
+
+    E, L, ar, er, ephi, d2, d3, d4, d5, f_t, g_t = param_kernel(c, n, et, kds1, kds2)
+
+    # solve Kepler's equation
+
+    u1PN = kepler_kernel(et, n*(t - t0))
     nu1PN = 2*np.arctan(np.sqrt((ephi + 1)/(ephi - 1))*np.tanh(u1PN/2))
-    u = mikkola(et, n*(t-t0) - (f_4t + f_5t)*nu1PN - (g_4t + g_5t)*np.sin(nu1PN))
+    u = kepler_kernel(et, n*(t - t0) - f_t*nu1PN - g_t*np.sin(nu1PN))
 
+    # dn/dt and det/dt
 
+    if radiation_reaction :
+        beta = et*np.cosh(u) - 1
+        dy[0] = -n**(11/3)*8*eta/(5*beta**7) * (-49*beta**2 - 32*beta**3 + 35*(et**2 - 1)*beta - 6*beta**4 + 9*et**2*beta**2)
+        dy[1] = -n**(8/3)*8*eta*(et**2 - 1)/(15*beta**7*et) * (-49*beta**2 - 17*beta**3 + 35*(et**2 - 1)*beta - 3*beta**4 + 9*et**2*beta**2)
 
-    nu = 2*np.arctan(np.sqrt((ephi + 1)/(ephi - 1))*np.tanh(u/2))
+    r = ar*(er*np.cosh(u) - 1)
+
+    if spinning :
+
+        # precession equation
+
+        s1crossk = np.cross(s1, k)
+        s2crossk = np.cross(s2, k)
+
+        o = offset_f_L
+        f_L = (c[o] + c[o+2]*E + (c[o+3] + c[o+1]*L**2/r)/r)/r**3
+        o = offset_g_L
+        g_L = (c[o] + c[o+2]*E + (c[o+3] + c[o+1]*L**2/r)/r)/r**3
+
+        dy[2:5] = f_L*S1*s1crossk + g_L*S2*s2crossk
+        dy[5:8] = -f_L*L*s1crossk
+        dy[8:11] = -g_L*L*s2crossk
+
+        # dphi/dt
+
+        dalpha = (y[2]*dy[3] - dy[2]*y[3])/(y[2]**2 + y[3]**2)
+
+        dy[11] = d2/r**2 + d3/r**3 + d4/r**4 + d5/r**5 - dalpha*y[4]
+
+    return dy
+
+
+def dy_dt_2_5PN_batch_kernel(y, t, t0, eta, S1, S2, N, radiation_reaction, spinning, c) : # dy_dt_2_5PN_batch, one dy_dt_2_5PN_kernel per binary, c of shape (N, n_coefficients)
+
+    dy = np.empty(len(y))
+    n_y = len(y)//N
+
+    for i in range(N) :
+        dy[i*n_y:(i + 1)*n_y] = dy_dt_2_5PN_kernel(y[i*n_y:(i + 1)*n_y], t, t0, eta[i], S1[i], S2[i], radiation_reaction, spinning, c[i])
+
+    return dy
+
+
+def dy_dt_2_5PN_numba(y, t, t0, eta, S1, S2, radiation_reaction=False, spinning=True, PN=5) : # dy_dt_2_5PN of a single binary through the compiled kernel (see rhs_backend)
+
+    return dy_dt_2_5PN_kernel(y, t, t0, eta, S1, S2, radiation_reaction, spinning, kernel_coefficients(eta, S1, S2, PN))
+
+
+def dy_dt_2_5PN_batch_numba(y, t, t0, eta, S1, S2, N, radiation_reaction=False, spinning=True, PN=5) : # dy_dt_2_5PN_batch through the compiled kernel
+
+    return dy_dt_2_5PN_batch_kernel(y, t, t0, eta, S1, S2, N, radiation_reaction, spinning, kernel_coefficients(eta, S1, S2, np.broadcast_to(PN, np.shape(eta))))
 
-    if verbose : print('Find motion of the orbital basis...')
+
+kernel_names = ('kepler_kernel', 'spin_kernel', 'e2_kernel', 'param_kernel', 'dy_dt_2_5PN_kernel', 'dy_dt_2_5PN_batch_kernel')
+
+numba_state = {'compiled' : None}
+
+
+def compile_kernels() : # replace the kernels by their numba versions (compiled on their first call), once, returns False if numba is not installed
+
+    # numba resolves the kernels called by a kernel from the module globals when it compiles it, the compiled versions are then called
+
+    if numba_state['compiled'] is None :
+        try :
+            import numba
+        except ImportError :
+            numba_state['compiled'] = False
+            return False
+
+        for name in kernel_names :
+            globals()[name] = numba.njit(cache=True, error_model='numpy')(globals()[name])
+        numba_state['compiled'] = True
+
+    return numba_state['compiled']
+
+
+rhs_backends = ('numpy', 'numba', 'auto')
+
+
+def rhs_backend(backend, batch=False) : # right-hand side of the backend, 'numba' falls back to numpy when numba is not installed, 'auto' is numba if installed
+
+    if backend not in rhs_backends :
+        raise ValueError('unknown backend ' + str(backend) + ', expected one of ' + str(rhs_backends))
+
+    if backend == 'numpy' or not compile_kernels() :
+        return dy_dt_2_5PN_batch if batch else dy_dt_2_5PN
+
+    return dy_dt_2_5PN_batch_numba if batch else dy_dt_2_5PN_numba
+
+
+def orbit_from_state(t, t0, eta, S1, S2, y, phi0=0, PN=5, spinning=True, phi_shift=None) : # orbit from the integrated state y of shape (len(y0), ..., len(t)), returns the vectors with shape (3, ..., len(t))
+
+    # the spinning phase is y[11] - phi_shift, phi_shift = y[11](t0) + phi0 interpolated on t by default
+
+    PN2, PN3, PN4, PN5 = PN_param(PN)
+
+    # auxiliary quantities evaluated directly on the time grid
+
+    dy, (E, L, ar, er, ephi, f_t, g_t, u) = dy_dt_2_5PN(y, t, t0, eta, S1, S2, False, spinning, PN, aux=True)
+
+    n, et = y[0], y[1]
+    nu = 2*np.arctan(np.sqrt((ephi + 1)/(ephi - 1))*np.tanh(u/2))
 
     # get radial motion ===================
 
@@ -527,17 +797,28 @@ def spinning_orbit_2_5PN(t, t0, eta, S1, S2, y0, PN=5, analytic_E_L=True, radiat
 
     # get orbital basis ===============
 
-    if spinning : 
+    if spinning :
+
+        phi = np.copy(y[11])
+
+        # set phi(t0) = phi0
+        if phi_shift is None :
+            phi_shift = np.apply_along_axis(lambda p : np.interp(t0, t, p), -1, phi)[..., None] + phi0
+        phi -= phi_shift
 
-        k /= np.sqrt(k[0]**2 + k[1]**2 + k[2]**2)
+        k = normalize(y[2:5], axis=0)
+        s1, s2 = y[5:8], y[8:11]
 
         iota = np.arccos(k[2])
         alpha = -np.arctan(k[0]/k[1])
-        
+
         n_vec = np.array([np.cos(alpha)*np.cos(phi) - np.cos(iota)*np.sin(alpha)*np.sin(phi), np.sin(alpha)*np.cos(phi) + np.cos(iota)*np.cos(alpha)*np.sin(phi), np.sin(iota)*np.sin(phi)])
-        xi_vec = cross(k, n_vec)
+        xi_vec = cross(k, n_vec, axis=0)
+
+    else :
 
-    else : 
+        s1 = np.zeros((3,) + np.shape(n))
+        s2 = np.zeros((3,) + np.shape(n))
 
         K = 1 + PN2*3/L**2 - 0.25*PN4*3*(-35 - 10*E*L**2 + 10*eta + 4*E*L**2*eta)/L**4
         f_4phi = -PN4*(1 + 2*E*L**2)*eta*(3*eta - 1)/(8*L**2)
@@ -545,31 +826,21 @@ def spinning_orbit_2_5PN(t, t0, eta, S1, S2, y0, PN=5, analytic_E_L=True, radiat
 
         phi = phi0 + K*(nu + f_4phi*np.sin(2*nu) + g_4phi*np.sin(3*nu))
 
-        n_vec = np.array([np.cos(phi), np.sin(phi), np.zeros(len(t))])
-        k = np.array([np.zeros(len(t)), np.zeros(len(t)), np.ones(len(t))])
-        xi_vec = cross(k, n_vec)
-
+        n_vec = np.array([np.cos(phi), np.sin(phi), np.zeros(np.shape(phi))])
+        k = np.array([np.zeros(np.shape(phi)), np.zeros(np.shape(phi)), np.ones(np.shape(phi))])
+        xi_vec = cross(k, n_vec, axis=0)
 
     # analytical derivatives =======================
 
-    if verbose : print('Computing derivatives...')
-
-    # radial derivative
-
     dnu_du = np.sqrt((ephi + 1)/(ephi - 1))/(np.cosh(u/2)**2 + (ephi + 1)/(ephi - 1)*np.sinh(u/2)**2)
-    dt_du = (et*np.cosh(u) - 1 + (f_4t + f_5t + np.cos(nu)*(g_4t + g_5t))*dnu_du)/n
+    dt_du = (et*np.cosh(u) - 1 + (f_t + np.cos(nu)*g_t)*dnu_du)/n
     dr = ar*er*np.sinh(u)/dt_du
 
+    if spinning :
 
-    # position derivative
-
-    if spinning : 
-        dk_list = np.array(dk_list)
-        dkx, dky, dkz, dphi = np.interp(t, t_eval, dk_list[:,0]), np.interp(t, t_eval, dk_list[:,1]), np.interp(t, t_eval, dk_list[:,2]), np.interp(t, t_eval, dphi_list)
-
-        dk = np.array([dkx, dky, dkz])
+        dk, dphi = dy[2:5], dy[11]
 
-        dalpha = (k[0]*dk[1] - dk[0]*k[1])/(k[0]**2 + k[1]**2)   
+        dalpha = (k[0]*dk[1] - dk[0]*k[1])/(k[0]**2 + k[1]**2)
         diota = -dk[2]/np.sqrt(1-k[2]**2)
 
         dn_vec = (np.cos(iota)*dalpha + dphi)*xi_vec + (np.sin(phi)*diota - np.cos(phi)*np.sin(iota)*dalpha)*k
@@ -580,8 +851,182 @@ def spinning_orbit_2_5PN(t, t0, eta, S1, S2, y0, PN=5, analytic_E_L=True, radiat
 
         dphi = K*(1 + 2*f_4phi*np.cos(2*nu) + 3*g_4phi*np.cos(3*nu))*dnu_du/dt_du
 
-        v = dr*np.array([np.cos(phi), np.sin(phi), np.zeros(len(t))]) + r*dphi*np.array([-np.sin(phi), np.cos(phi), np.zeros(len(t))])
+        v = dr*np.array([np.cos(phi), np.sin(phi), np.zeros(np.shape(phi))]) + r*dphi*np.array([-np.sin(phi), np.cos(phi), np.zeros(np.shape(phi))])
+
+    return r, phi, n_vec, k, xi_vec, s1, s2, dr, v
+
+
+# Profiling =============================================================================================================
+
+# trace_memory measures the peak allocated memory with tracemalloc, exact but ~10 times slower, otherwise only the peak resident memory of the process is reported
+profile_config = {'trace_memory' : False}
+
+
+def odeint_stats(info) : # summary of the infodict of odeint(..., full_output=True)
+
+    hu = info['hu'][info['hu'] > 0]
+
+    return {'steps' : int(info['nst'][-1]), 'step_min' : float(np.min(hu, initial=np.inf)), 'step_max' : float(np.max(hu, initial=0.)),
+            'rhs_evaluations' : int(info['nfe'][-1]), 'jacobian_evaluations' : int(info['nje'][-1]),
+            'method_switches' : int(np.count_nonzero(np.diff(info['mused']))), 'stiff_fraction' : float(np.mean(info['mused'] == 2)), 'message' : info['message']}
+
+
+def peak_rss() : # peak resident memory of the process in bytes, 0 where the resource module is missing
+
+    if resource is None :
+        return 0
+
+    # ru_maxrss is in kilobytes, except on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*(1 if sys.platform == 'darwin' else 1024)
+
+
+@contextmanager
+def orbit_profile(profile, rhs, **settings) : # context of one orbit computation, yields stage(name) which ends a timed stage and the right-hand side to integrate
+
+    # profile is None, then nothing is measured and rhs is yielded unchanged, or a dict which receives the report :
+    # the settings, the wall time of every stage, the number of rhs evaluations and of kepler_solve calls (and solved values),
+    # the solver statistics (filled by the caller in profile['solver']), the peak resident memory of the process and,
+    # if profile_config['trace_memory'], the peak memory allocated during the call
+
+    if profile is None :
+        yield (lambda name : None), rhs
+        return
 
+    global kepler_counts
+
+    profile.clear()
+    profile.update(settings)
+    profile.update({'stages' : {}, 'rhs_calls' : 0, 'kepler_calls' : 0, 'kepler_values' : 0, 'solver' : {}})
+
+    def counted_rhs(*args) :
+        profile['rhs_calls'] += 1
+        return rhs(*args)
+
+    clock = [perf_counter()]
+    def stage(name) :
+        now = perf_counter()
+        profile['stages'][name] = now - clock[0]
+        clock[0] = now
+
+    trace = profile_config['trace_memory'] and not tracemalloc.is_tracing()
+    if trace :
+        tracemalloc.start()
+
+    outer_counts, kepler_counts = kepler_counts, {'calls' : 0, 'values' : 0}
+    start = clock[0]
+
+    try :
+        yield stage, counted_rhs
+    finally :
+        profile['kepler_calls'], profile['kepler_values'] = kepler_counts['calls'], kepler_counts['values']
+        kepler_counts = outer_counts
+        if outer_counts is not None : # an orbit profiled inside another profiled computation also counts for the outer one
+            outer_counts['calls'] += profile['kepler_calls']
+            outer_counts['values'] += profile['kepler_values']
+
+        profile['total'] = perf_counter() - start
+        profile['peak_rss_bytes'] = peak_rss()
+        if trace :
+            profile['peak_allocated_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+
+def merge_profiles(profiles) : # aggregate of orbit profiles (from several binaries or workers), sums of the times and counts, maxima of the memory and step sizes
+
+    merged = {'orbits' : 0, 'stages' : {}, 'solver' : {}}
+
+    for profile in profiles :
+
+        merged['orbits'] += 1
+
+        for name, seconds in profile['stages'].items() :
+            merged['stages'][name] = merged['stages'].get(name, 0.) + seconds
+
+        for key in ('total', 'rhs_calls', 'kepler_calls', 'kepler_values') :
+            merged[key] = merged.get(key, 0) + profile[key]
+        for key in ('peak_rss_bytes', 'peak_allocated_bytes') :
+            if key in profile :
+                merged[key] = max(merged.get(key, 0), profile[key])
+
+        for key, value in profile['solver'].items() :
+            if key == 'step_min' :
+                merged['solver'][key] = min(merged['solver'].get(key, np.inf), value)
+            elif key == 'step_max' :
+                merged['solver'][key] = max(merged['solver'].get(key, 0.), value)
+            elif isinstance(value, (int, float)) :
+                merged['solver'][key] = merged['solver'].get(key, 0) + value
+
+    if 'stiff_fraction' in merged['solver'] : # averaged over the orbits
+        merged['solver']['stiff_fraction'] /= merged['orbits']
+
+    return merged
+
+
+def integrate_state(t, yini, args, solver='odeint', jacobian=True, rhs=dy_dt_2_5PN, profile=None) : # state of dy_dt_2_5PN (args after t) on the grid t from yini at t[0], increasing or decreasing, returns shape (len(t), len(yini))
+
+    Dfun = dy_dt_2_5PN_jacobian if jacobian else None
+
+    if solver == 'odeint' and profile is None :
+        return odeint(rhs, yini, t, args=args, Dfun=Dfun)
+
+    if solver == 'odeint' : # the info dict holds arrays of the size of t, only requested when profiling
+        sol, info = odeint(rhs, yini, t, args=args, Dfun=Dfun, full_output=True)
+        profile['solver'] = odeint_stats(info)
+        return sol
+
+    jac = (lambda t, y : Dfun(y, t, *args)) if jacobian else None
+
+    return integrate_dense(lambda t, y : rhs(y, t, *args), t, yini, method=solver, stats=None if profile is None else profile['solver'], jac=jac)
+
+
+def spinning_orbit_2_5PN(t, t0, eta, S1, S2, y0, PN=5, analytic_E_L=True, radiation_reaction=False, spinning=True, verbose=True, num_checks=False, solver='odeint', profile=None, jacobian=True, checkpoint=None, backend='numpy') :
+
+    # solver = 'odeint', or the name of a scipy.integrate dense-output solver ('DOP853', 'LSODA', 'RK45', 'Radau', 'BDF', ...)
+    # jacobian passes dy_dt_2_5PN_jacobian to the stiff methods, instead of a Jacobian estimated with len(y0) evaluations of dy_dt_2_5PN
+    # profile, when given, is a dict which receives a report of the computation, see orbit_profile
+    # checkpoint, when given, is a dict which receives the state at both ends of t, see extend_orbit
+    # backend selects the right-hand side integrated, see rhs_backend
+
+    PN2, PN3, PN4, PN5 = PN_param(PN)
+
+    if verbose : print('Computing orbit at ' + str(PN/2) + 'PN ========================\n')
+
+    with orbit_profile(profile, rhs_backend(backend), PN=PN, solver=solver, backend=backend, n_samples=len(t), radiation_reaction=radiation_reaction, spinning=spinning) as (stage, rhs) :
+
+        # find xi in terms of et0 and b
+
+        b = y0[0]
+        et0 = y0[1]
+        phi0 = y0[-1]
+
+        n0 = initial_mean_motion(b, et0, eta)
+        yini = np.array(y0, dtype=float)
+        yini[0] = n0
+
+        stage('initial_conditions')
+
+        # solve differential system =================
+
+        if verbose : print('Solving differential system...')
+
+        args = (t0, eta, S1, S2, radiation_reaction, spinning, PN)
+        sol = integrate_state(t, yini, args, solver, jacobian, rhs, profile)
+
+        stage('integration')
+
+        # get system parameters, Kepler's equation and derivatives, evaluated once on the time grid ===================
+
+        if verbose : print('Getting system parameters and derivatives...')
+
+        phi_shift = np.interp(t0, t, sol[:,11]) + phi0 if spinning else None
+
+        r, phi, n_vec, k, xi_vec, s1, s2, dr, v = orbit_from_state(t, t0, eta, S1, S2, sol.T, phi0, PN=PN, spinning=spinning, phi_shift=phi_shift)
+
+        if checkpoint is not None :
+            checkpoint.update({'args' : args, 'phi0' : phi0, 'phi_shift' : phi_shift, 'solver' : solver, 'jacobian' : jacobian, 'backend' : backend,
+                               't_start' : t[0], 'y_start' : sol[0].copy(), 't_end' : t[-1], 'y_end' : sol[-1].copy()})
+
+        stage('orbit_from_state')
 
     if verbose : print('Done !\n')
 
@@ -589,6 +1034,19 @@ def spinning_orbit_2_5PN(t, t0, eta, S1, S2, y0, PN=5, analytic_E_L=True, radiat
 
     if num_checks :
 
+        import matplotlib.pyplot as plt
+        from plot_tools import create_plot
+
+        n, et = sol[:,0], sol[:,1]
+        kds1, kds2 = (dot(k, s1, axis=0), dot(k, s2, axis=0)) if spinning else (0, 0)
+
+        E, L = spinning_orbit_2_5PN_param(n, et, kds1, kds2, eta, S1, S2, t, PN=PN)[:2]
+
+        # the 1.5PN parameters of the 2.5PN check below are evaluated together with the 2.5PN ones, as a second order
+        orders = np.array([[PN], [3]]) if PN == 5 else PN
+        params = np.broadcast_arrays(*spinning_orbit_2_5PN_param_from_E_L(E, L, kds1, kds2, eta, S1, S2, PN=orders))
+        n_2, et_2, ar, er, ephi, d2, d3, d4, d5, f_4t, f_5t, g_4t, g_5t = [x[0] for x in params] if PN == 5 else params
+
         # deviation of orbital parameters from initial value
 
         create_plot(r'$t$ $(GM/c^3)$', r'$\left|\frac{\mathrm{param}-\mathrm{param_0}}{\mathrm{param_0}}\right|$', [t[0], t[-1]], title=str(PN/2)+'PN', logy=False)
@@ -605,7 +1063,7 @@ def spinning_orbit_2_5PN(t, t0, eta, S1, S2, y0, PN=5, analytic_E_L=True, radiat
 
         if PN == 5 :
 
-            n1_5PN, et1_5PN, ar1_5PN, er1_5PN, ephi1_5PN, d2_1_5PN, d3_1_5PN, d4_1_5PN, d5_1_5PN, f_4t_1_5PN, f_5t_1_5PN, g_4t_1_5PN, g_5t_1_5PN = spinning_orbit_2_5PN_param_from_E_L(E, L, kds1, kds2, eta, S1, S2, PN=3)
+            n1_5PN, et1_5PN, ar1_5PN, er1_5PN, ephi1_5PN, d2_1_5PN, d3_1_5PN, d4_1_5PN, d5_1_5PN, f_4t_1_5PN, f_5t_1_5PN, g_4t_1_5PN, g_5t_1_5PN = [x[1] for x in params]
 
             create_plot(r'$t$ $(GM/c^3)$', r'$\left|\frac{\mathrm{param}^{2.5}-\mathrm{param}^{1.5}}{\mathrm{param}^{1.5}}\right|$', [t[0], t[-1]], title=str(PN/2)+'PN', logy=True)
             
@@ -620,6 +1078,158 @@ def spinning_orbit_2_5PN(t, t0, eta, S1, S2, y0, PN=5, analytic_E_L=True, radiat
     return r, phi, n_vec, k, xi_vec, s1, s2, dr, v
 
 
+# Checkpointed integration windows =======================================================================================
+
+# a checkpoint holds the arguments of the integration and the raw state at both ends of the integrated window,
+# extend_orbit continues the integration from an end instead of redoing the window. The solver restarts from the
+# boundary state, the internal history of odeint (LSODA) is not accessible, so an extension matches a single run
+# to the integration tolerance, not bit for bit
+
+def orbit_checkpoint(t_start, t0, eta, S1, S2, y0, PN=5, radiation_reaction=False, spinning=True, solver='odeint', jacobian=True, backend='numpy') : # checkpoint of an empty window at t_start, y0 as in spinning_orbit_2_5PN, to be grown by extend_orbit
+
+    phi0 = y0[-1]
+
+    yini = np.array(y0, dtype=float)
+    yini[0] = initial_mean_motion(y0[0], y0[1], eta)
+
+    args = (t0, eta, S1, S2, radiation_reaction, spinning, PN)
+
+    # the spinning phase is shifted by its value at t0, reached by a two point integration if t0 is not t_start
+    phi_shift = None
+    if spinning :
+        phi_t0 = yini[11] if t0 == t_start else integrate_state(np.array([t_start, t0]), yini, args, solver, jacobian, rhs_backend(backend))[-1, 11]
+        phi_shift = phi_t0 + phi0
+
+    return {'args' : args, 'phi0' : phi0, 'phi_shift' : phi_shift, 'solver' : solver, 'jacobian' : jacobian, 'backend' : backend,
+            't_start' : t_start, 'y_start' : yini.copy(), 't_end' : t_start, 'y_end' : yini.copy()}
+
+
+def extend_orbit(checkpoint, t_new) : # orbit on t_new, after the end or before the start of the window of the checkpoint, returns the outputs of spinning_orbit_2_5PN on t_new
+
+    # only t_new is integrated, from the state at the nearest end of the window, and the checkpoint is updated to the grown window
+
+    t_new = np.asarray(t_new, dtype=float)
+    t0, eta, S1, S2, radiation_reaction, spinning, PN = args = checkpoint['args']
+
+    if t_new[0] >= checkpoint['t_end'] :
+        grid = t_new if t_new[0] == checkpoint['t_end'] else np.concatenate([[checkpoint['t_end']], t_new])
+        sol = integrate_state(grid, checkpoint['y_end'], args, checkpoint['solver'], checkpoint['jacobian'], rhs_backend(checkpoint['backend']))[len(grid) - len(t_new):]
+        checkpoint['t_end'], checkpoint['y_end'] = t_new[-1], sol[-1].copy()
+    elif t_new[-1] <= checkpoint['t_start'] :
+        grid = t_new[::-1] if t_new[-1] == checkpoint['t_start'] else np.concatenate([[checkpoint['t_start']], t_new[::-1]])
+        sol = integrate_state(grid, checkpoint['y_start'], args, checkpoint['solver'], checkpoint['jacobian'], rhs_backend(checkpoint['backend']))[len(grid) - len(t_new):][::-1]
+        checkpoint['t_start'], checkpoint['y_start'] = t_new[0], sol[0].copy()
+    else :
+        raise ValueError('t_new = [' + str(t_new[0]) + ', ' + str(t_new[-1]) + '] overlaps the integrated window [' + str(checkpoint['t_start']) + ', ' + str(checkpoint['t_end']) + ']')
+
+    return orbit_from_state(t_new, t0, eta, S1, S2, sol.T, checkpoint['phi0'], PN=PN, spinning=spinning, phi_shift=checkpoint['phi_shift'])
+
+
+def concatenate_orbits(first, second) : # outputs of spinning_orbit_2_5PN on two consecutive windows joined along time
+
+    return tuple(np.concatenate([a, b], axis=-1) for a, b in zip(first, second))
+
+
+def orbit_segments(t, t0, eta, S1, S2, y0, segment_size, PN=5, radiation_reaction=False, spinning=True, solver='odeint', jacobian=True, checkpoint=None, backend='numpy') : # yields (t_segment, outputs of spinning_orbit_2_5PN) over t, segment_size samples at a time
+
+    # y0 is given at t[0], only one segment of the orbit is in memory at a time, for long radiation reaction runs,
+    # checkpoint (a dict), when given, receives the state of the integration after every segment
+
+    state = orbit_checkpoint(t[0], t0, eta, S1, S2, y0, PN, radiation_reaction, spinning, solver, jacobian, backend)
+    if checkpoint is not None :
+        checkpoint.update(state)
+        state = checkpoint
+
+    for start in range(0, len(t), segment_size) :
+        t_segment = t[start:start + segment_size]
+        yield t_segment, extend_orbit(state, t_segment)
+
+
+# Batched ensemble integration ===========================================================================================
+
+def dy_dt_2_5PN_batch(y, t, t0, eta, S1, S2, N, radiation_reaction=False, spinning=True, PN=5) : # odeint wrapper of dy_dt_2_5PN for N binaries stacked in a flat state of shape (N*len(y0))
+
+    dy = dy_dt_2_5PN(y.reshape(N, -1).T, t, t0, eta, S1, S2, radiation_reaction, spinning, PN)
+
+    return dy.T.ravel()
+
+
+def dy_dt_2_5PN_batch_jacobian(y, t, t0, eta, S1, S2, N, radiation_reaction=False, spinning=True, PN=5) : # Jacobian of dy_dt_2_5PN_batch, block diagonal, packed in the banded format of odeint with ml = mu = len(y0)-1
+
+    n_y = len(y)//N
+    trailing = lambda x : x[..., None] if np.ndim(x) else x
+
+    J = dy_dt_2_5PN_jacobian(y.reshape(N, n_y).T, t, t0, trailing(eta), trailing(S1), trailing(S2), radiation_reaction, spinning, trailing(PN)) # J[i, binary, j]
+
+    # J[i, j] of the flat state is stored in band[mu + i - j, j]
+    i, j = np.indices((n_y, n_y))
+    band = np.zeros((2*n_y - 1, N, n_y))
+    band[n_y - 1 + i - j, :, j] = J[i, :, j]
+
+    return band.reshape(2*n_y - 1, N*n_y)
+
+
+def spinning_orbit_2_5PN_batch(t, t0, eta, S1, S2, y0, PN=5, radiation_reaction=False, spinning=True, verbose=True, jacobian=True, backend='numpy') : # spinning_orbit_2_5PN for an ensemble of binaries, y0 shape (N, len(y0)), eta, S1, S2 and PN scalars or shape (N)
+
+    # all binaries share the time grid and are integrated as a single state of shape (N, len(y0)),
+    # returns r, phi, dr shape (N, len(t)) and n_vec, k, xi_vec, s1, s2, v shape (N, 3, len(t))
+
+    y0 = np.atleast_2d(np.array(y0, dtype=float))
+    N, n_y = y0.shape
+
+    eta = np.broadcast_to(np.asarray(eta, dtype=float), (N,))
+    S1 = np.broadcast_to(np.asarray(S1, dtype=float), (N,))
+    S2 = np.broadcast_to(np.asarray(S2, dtype=float), (N,))
+
+    if verbose : print('Computing ' + str(N) + ' orbits at ' + str(PN/2) + 'PN ========================\n')
+
+    # find xi in terms of et0 and b
+
+    b = y0[:,0]
+    et0 = y0[:,1]
+    phi0 = y0[:,-1]
+
+    n0 = initial_mean_motion(b, et0, eta)
+    yini = np.copy(y0)
+    yini[:,0] = n0
+
+    # solve differential system, the Jacobian is block diagonal so it is declared banded =================
+
+    if verbose : print('Solving differential system...')
+
+    Dfun = dy_dt_2_5PN_batch_jacobian if jacobian else None
+    sol = odeint(rhs_backend(backend, batch=True), yini.ravel(), t, args=(t0, eta, S1, S2, N, radiation_reaction, spinning, PN), Dfun=Dfun, ml=n_y-1, mu=n_y-1)
+
+    y = sol.reshape(len(t), N, n_y).transpose(2, 1, 0)
+
+    if verbose : print('Getting system parameters and derivatives...')
+
+    r, phi, n_vec, k, xi_vec, s1, s2, dr, v = orbit_from_state(t, t0, eta[:,None], S1[:,None], S2[:,None], y, phi0[:,None], PN=PN if np.ndim(PN) == 0 else np.asarray(PN)[:,None], spinning=spinning)
+
+    if verbose : print('Done !\n')
+
+    n_vec, k, xi_vec, s1, s2, v = [np.moveaxis(vec, 0, 1) for vec in (n_vec, k, xi_vec, s1, s2, v)]
+
+    return r, phi, n_vec, k, xi_vec, s1, s2, dr, v
+
+
+def spinning_orbit_2_5PN_orders(t, t0, eta, S1, S2, y0, PN_orders=(2, 3, 4, 5), radiation_reaction=False, spinning=True, verbose=True, jacobian=True) : # the orbit of one binary at several PN orders in a single integration, returns {PN : outputs of spinning_orbit_2_5PN}
+
+    # the orders only differ by the switches of PN_param, they are stacked as the binaries of spinning_orbit_2_5PN_batch
+    # with one order each : the coefficients are built once as arrays over the orders and every evaluation of the
+    # right-hand side, of Kepler's equation and of the orbit on the time grid is shared by all of them
+    # the step size is the one of the most demanding order, the orders agree with separate runs to the integration tolerance
+
+    if not spinning : # a few scalar operations per evaluation, stacking them into arrays costs more than it shares
+        return {PN : spinning_orbit_2_5PN(t, t0, eta, S1, S2, y0, PN=PN, radiation_reaction=radiation_reaction, spinning=False, verbose=verbose, jacobian=jacobian) for PN in PN_orders}
+
+    y0 = np.tile(np.array(y0, dtype=float), (len(PN_orders), 1))
+
+    orbits = spinning_orbit_2_5PN_batch(t, t0, eta, S1, S2, y0, PN=np.array(PN_orders), radiation_reaction=radiation_reaction, spinning=spinning, verbose=verbose, jacobian=jacobian)
+
+    return {PN : tuple(x[i] for x in orbits) for i, PN in enumerate(PN_orders)}
+
+
 def ADM2harmonic(r, dr, n, v, s1, s2, S1, S2, eta, PN=5) : 
 
     #print('PN = ', PN)
@@ -627,9 +1237,12 @@ def ADM2harmonic(r, dr, n, v, s1, s2, S1, S2, eta, PN=5) :
     PN2, PN3, PN4, PN5 = PN_param(PN)
     S = S1*s1 + S2*s2
 
-    r_harm = r - PN3*0.5*eta*dot(S, cross(n, v)) + PN4*(eta*(5*dot(v, v) - 19*dr**2)/8 + (3*eta + 0.25)/r)
-    n_harm = n + PN3*0.5*eta/r*(n*dot(S, cross(n, v)) - cross(S, v)) + PN4*0.25*9*dr*eta/r*(dr*n - v)
-    v_harm = v - PN3*0.5*eta*cross(S, n)/r**2 + PN4*(eta*(dr*n*(3*dr**2 - 7*dot(v, v)) + v*(17*dr**2 - 13*dot(v, v)))/(8*r) + 0.25*((21*eta + 1)*v - (19*eta + 2)*dr*n)/r**2)
+    v2 = dot(v, v)
+    Sdncv = dot(S, cross(n, v))
+
+    r_harm = r - PN3*0.5*eta*Sdncv + PN4*(eta*(5*v2 - 19*dr**2)/8 + (3*eta + 0.25)/r)
+    n_harm = n + PN3*0.5*eta/r*(n*Sdncv - cross(S, v)) + PN4*0.25*9*dr*eta/r*(dr*n - v)
+    v_harm = v - PN3*0.5*eta*cross(S, n)/r**2 + PN4*(eta*(dr*n*(3*dr**2 - 7*v2) + v*(17*dr**2 - 13*v2))/(8*r) + 0.25*((21*eta + 1)*v - (19*eta + 2)*dr*n)/r**2)
 
     dr_harm = dot(v_harm, n_harm)
 
@@ -639,71 +1252,261 @@ def ADM2harmonic(r, dr, n, v, s1, s2, S1, S2, eta, PN=5) :
 
 # Gravitational waves emission ========================================================================================
 
-def GW_emission_from_orbit(Theta, R, t, n, velocity, r, dr, s1, s2, m1, m2, chi1, chi2, GW_order = 4) :
+def GW_polarisations(proj, z, v, dr, eta, delta, X1chi1, X2chi2, GW_order, h_plus, h_cross) : # fused polarisation polynomials of one block of samples, written into h_plus and h_cross
+
+    # proj holds the projections pdn, qdn, Ndn, pddr, qddr, Nddr, pds1cN, pds2cN, qds1cN, qds2cN of the block
+    # the polynomials are factored on the combinations shared by h_plus and h_cross, every power is computed once
+
+    pdn, qdn, Ndn, pddr, qddr, Nddr, pds1cN, pds2cN, qds1cN, qds2cN = proj
+
+    PN1, PN2, PN3, PN4 = [1 if i<=GW_order else 0 for i in range(4)]
+
+    Ndn2 = Ndn*Ndn
+    Nddr2 = Nddr*Nddr
+    NddrNdn = Nddr*Ndn
+    v2 = v*v
+    zdr = z*dr
+
+    P2v = pddr*pddr - qddr*qddr # pddr**2 - qddr**2
+    P2n = pdn*pdn - qdn*qdn     # pdn**2 - qdn**2
+    Xp = pddr*pdn - qddr*qdn
+    Cv = pddr*qddr
+    Cn = pdn*qdn
+    Xc = qddr*pdn + pddr*qdn
+
+    # coefficients shared by the NNLO terms of both polarisations
+    A = 6*(1 - 3*eta)*Nddr2 + ((42*eta - 14)*Ndn2 + 6*eta - 4)*z + (3 - 9*eta)*v2
+    B = z*((6*eta - 2)*Nddr2 + (29 + (7 - 21*eta)*Ndn2)*z + ((3 - 9*eta)*Ndn2 - 10 - 3*eta)*v2 + (12 - 36*eta)*NddrNdn*dr + ((45*eta - 15)*Ndn2 - 9*eta + 3)*dr*dr)
+    X = zdr*((15 - 45*eta)*Ndn2 + 10 + 6*eta) + (48*eta - 16)*NddrNdn*z
+
+    SO = X2chi2*pds2cN - X1chi1*pds1cN
+
+    # h_plus
+    np.multiply(PN3/6, P2v*A + 2*Xp*X + P2n*B, out=h_plus)
+    h_plus += P2v - PN1*P2n*z
+    h_plus -= PN2*0.5*delta*(z*((Ndn*dr - Nddr)*pdn*pdn - (3*Ndn*dr - Nddr)*qdn*qdn - 6*Ndn*Xp) + 2*P2v*Nddr)
+    h_plus += PN4*z*z*(pdn*SO + qdn*(X1chi1*qds1cN - X2chi2*qds2cN))
+    h_plus *= 2
+
+    # h_cross
+    np.multiply(PN3/6, Cv*A + Xc*X + Cn*B, out=h_cross)
+    h_cross += Cv - PN1*Cn*z
+    h_cross -= PN2*delta*((((3*Ndn*dr - Nddr)*qdn - 3*Ndn*qddr)*pdn - 3*Ndn*qdn*pddr)*z + 2*Cv*Nddr)
+    h_cross += PN4*z*z*qdn*SO
+    h_cross *= 4
+
+    return h_plus, h_cross
+
+
+def sky_basis(Theta, Phi=0) : # observer frames N (line of sight), p, q for observer angles of any shape, returns arrays of shape (..., 3)
+
+    # p x q = N, Phi = 0 gives N = (sin(Theta), 0, cos(Theta)), p = (0, -1, 0), q = (cos(Theta), 0, -sin(Theta))
+
+    Theta, Phi = np.broadcast_arrays(np.asarray(Theta, dtype=float), np.asarray(Phi, dtype=float))
+
+    N = np.stack([np.sin(Theta)*np.cos(Phi), np.sin(Theta)*np.sin(Phi), np.cos(Theta)], axis=-1)
+    p = np.stack([np.sin(Phi), -np.cos(Phi), np.zeros(Phi.shape)], axis=-1)
+    q = np.stack([np.cos(Theta)*np.cos(Phi), np.cos(Theta)*np.sin(Phi), -np.sin(Theta)], axis=-1)
+
+    return N, p, q
+
+
+def GW_sky_map(Theta, Phi, n, velocity, r, dr, s1, s2, m1, m2, chi1, chi2, GW_order = 4, chunk_size = None) : # polarisations for n_obs observers (Theta, Phi arrays of shape (n_obs)) from one orbit, returns h_plus, h_cross shape (n_obs, len(t))
+
+    # n, velocity, s1, s2 shape (3, len(t)) (or (N, 3, len(t)), the polarisations are then (N, n_obs, len(t)))
+    # the projections of the orbit on all observer frames come from one matrix product per block of samples,
+    # the spin terms use p.(s x N) = s.q and q.(s x N) = -s.p, chunk_size = None keeps about 8192 samples x observers per block
 
     m = m1 + m2
     eta = m1*m2/m**2
 
-    # New sky basis in the x,y,z basis
+    delta = np.abs(m1-m2)/m
+    X1chi1 = m1/m*chi1
+    X2chi2 = m2/m*chi2
 
-    N = np.array([np.sin(Theta)*np.ones(len(t)), np.zeros(len(t)), np.cos(Theta)*np.ones(len(t))])
-    p = np.array([np.zeros(len(t)), -np.ones(len(t)), np.zeros(len(t))])
-    q = np.array([np.cos(Theta)*np.ones(len(t)), np.zeros(len(t)), -np.sin(Theta)*np.ones(len(t))])
+    N, p, q = sky_basis(np.ravel(Theta), np.ravel(Phi))
+    n_obs = len(N)
 
-    # Compute dot products
-        
-    pdn = dot(p, n)
-    qdn = dot(q, n)
-    Ndn = dot(N, n)
-    
-    pddr = dot(p, velocity)
-    qddr = dot(q, velocity)
-    Nddr = dot(N, velocity)
+    basis = np.concatenate([p, q, N]) # (3*n_obs, 3), projects a vector on all frames at once
 
-    # Compute cross products        
-    
-    pds1cN = dot(p, cross(s1, N))
-    pds2cN = dot(p, cross(s2, N))
-    qds1cN = dot(q, cross(s1, N))
-    qds2cN = dot(q, cross(s2, N))
+    T = np.shape(n)[-1]
+    batch = np.broadcast_shapes(np.shape(n)[:-2], np.shape(velocity)[:-2], np.shape(s1)[:-2], np.shape(s2)[:-2], np.shape(r)[:-1], np.shape(dr)[:-1])
+    chunk_size = max(16, 8192//n_obs) if chunk_size is None else chunk_size
+    chunk_size = min(chunk_size, T)
 
+    h_plus = np.empty(batch + (n_obs, T))
+    h_cross = np.empty(batch + (n_obs, T))
 
-    # Compute polarisations
+    scratch = {name : np.empty(batch + (3*n_obs, chunk_size)) for name in ('n', 'v', 's1', 's2')}
 
-    PN1, PN2, PN3, PN4 = [1 if i<=GW_order else 0 for i in range(4)]
+    # scalar time series get an observer axis
+    block = lambda x, b : np.expand_dims(x[..., b], -2) if np.ndim(x) else x
 
-    z = 1/r
-    v = dot(velocity, velocity)**(1/2)
+    for start in range(0, T, chunk_size) :
 
-    delta = np.abs(m1-m2)/m
-    X1 = m1/m
-    X2 = m2/m
+        b = slice(start, min(start + chunk_size, T))
+        size = b.stop - b.start
 
-    # h_plus
-    LO_p = PN1*(qdn**2 - pdn**2)*z + pddr**2 - qddr**2
-    NLO_p = - PN2*0.5*delta * ((Ndn * dr - Nddr)*z*pdn**2 - 6*z*Ndn*pdn*pddr + (-3*Ndn*dr + Nddr)*z*qdn**2 + 6*z*Ndn*qdn*qddr + 2 * (pddr**2 - qddr**2)*Nddr)
-    NNLO_p = PN3*1/6 * (6*Nddr**2*(pddr**2-qddr**2)*(1-3*eta)
-    + ((6*eta-2)*Nddr**2*pdn**2 + (96*eta-32)*Nddr*Ndn*pddr*pdn + (-6*eta+2)*Nddr**2*qdn**2 + (-96*eta+32)*Nddr*Ndn*qddr*qdn + ((-14+42*eta)*Ndn**2 - 4 + 6*eta)*pddr**2 + ((-42*eta+14)*Ndn**2 + 4 - 6*eta)*qddr**2)*z
-    + ((-9*eta+3)*pddr**2 + (-3+9*eta)*qddr**2)*v**2
-    + ((29 + (7-21*eta)*Ndn**2)*pdn**2 + (-29 + (21*eta-7)*Ndn**2)*qdn**2)*z**2
-    + (((-9*eta+3)*Ndn**2 - 10 - 3*eta)*pdn**2 + ((-3+9*eta)*Ndn**2 + 10 + 3*eta)*qdn**2)*z*v**2
-    + ((-36*eta + 12)*Nddr*Ndn*pdn**2 + ((-90*eta+30)*Ndn**2 + 12*eta + 20)*pddr*pdn + (-12+36*eta)*Nddr*Ndn*qdn**2 + ((90*eta-30)*Ndn**2 - 12*eta - 20)*qddr*qdn)*z*dr
-    + (((45*eta-15)*Ndn**2 - 9*eta + 3)*pdn**2 + ((15-45*eta)*Ndn**2 - 3 + 9*eta)*qdn**2)*z*dr**2)
-    NNLO_SO_p = PN4*z**2*(pdn*(X2*chi2*pds2cN - X1*chi1*pds1cN) + qdn*(X1*chi1*qds1cN - X2*chi2*qds2cN))
+        proj = {}
+        for name, x in (('n', n), ('v', velocity), ('s1', s1), ('s2', s2)) :
+            out = scratch[name][..., :size]
+            np.matmul(basis, np.broadcast_to(x[..., b], batch + (3, size)), out=out)
+            proj[name] = out.reshape(batch + (3, n_obs, size))
 
-    # h_cross
-    LO_c = -PN1*pdn*qdn*z + pddr*qddr
-    NLO_c = -PN2*delta*((((3*Ndn*dr - Nddr)*qdn - 3*Ndn*qddr)*pdn - 3*Ndn*qdn*pddr)*z + 2*pddr*qddr*Nddr)
-    NNLO_c = PN3*1/6 * (6*(1-3*eta)*Nddr**2*pddr*qddr 
-    + (((6*eta-2)*Nddr**2*qdn + (48*eta-16)*Nddr*Ndn*qddr)*pdn + (48*eta-16)*Nddr*Ndn*pddr*qdn + ((-14+42*eta)*Ndn**2 - 4 + 6*eta)*qddr*pddr)*z
-    + (-9*eta+3)*qddr*pddr*v**2
-    + (29 + (7-21*eta)*Ndn**2)*qdn*pdn*z**2
-    + ((-9*eta+3)*Ndn**2 - 10 - 3*eta)*qdn*pdn*z*v**2
-    + (((-36*eta+12)*Nddr*Ndn*qdn + ((15-45*eta)*Ndn**2 + 10 + 6*eta)*qddr)*pdn + ((15-45*eta)*Ndn**2 + 10 + 6*eta)*pddr*qdn)*dr*z
-    + ((45*eta-15)*Ndn**2 - 9*eta + 3)*qdn*pdn*dr**2*z)
-    NNLO_SO_c = PN4*z**2*qdn*(X2*chi2*pds2cN - X1*chi1*pds1cN)
-
-    h_plus  = LO_p + NLO_p + NNLO_p + NNLO_SO_p
-    h_cross = LO_c + NLO_c + NNLO_c + NNLO_SO_c
-
-    return 2*h_plus, 4*h_cross
\ No newline at end of file
+        pdn, qdn, Ndn = proj['n'][..., 0, :, :], proj['n'][..., 1, :, :], proj['n'][..., 2, :, :]
+        pddr, qddr, Nddr = proj['v'][..., 0, :, :], proj['v'][..., 1, :, :], proj['v'][..., 2, :, :]
+        pds1cN, pds2cN = proj['s1'][..., 1, :, :], proj['s2'][..., 1, :, :]
+        qds1cN, qds2cN = -proj['s1'][..., 0, :, :], -proj['s2'][..., 0, :, :]
+
+        GW_polarisations((pdn, qdn, Ndn, pddr, qddr, Nddr, pds1cN, pds2cN, qds1cN, qds2cN), 1/block(r, b), np.expand_dims(norm(velocity[..., b]), -2), block(dr, b),
+                         eta, delta, X1chi1, X2chi2, GW_order, h_plus[..., b], h_cross[..., b])
+
+    return h_plus, h_cross
+
+
+def GW_emission_from_orbit(Theta, R, t, n, velocity, r, dr, s1, s2, m1, m2, chi1, chi2, GW_order = 4, chunk_size = 8192) :
+
+    # single observer at Theta in the x-z plane, see GW_sky_map, the time axis is processed in blocks of chunk_size samples
+    # (chunk_size = None evaluates the whole time series at once), the orbit can be batched as (N, 3, len(t))
+
+    chunk_size = np.shape(n)[-1] if chunk_size is None else chunk_size
+
+    h_plus, h_cross = GW_sky_map(Theta, 0., n, velocity, r, dr, s1, s2, m1, m2, chi1, chi2, GW_order, chunk_size)
+
+    return h_plus[..., 0, :], h_cross[..., 0, :]
+
+
+# Waveforms sampled in the eccentric anomaly =============================================================================
+
+def anomaly_grid(t_start, t_end, t0, n, et, n_samples) : # n_samples times between t_start and t_end uniform in the Newtonian eccentric anomaly u, returns t, u
+
+    # t = t0 + (et*sinh(u) - u)/n puts the nodes close together near the periastron t0 and far apart on the asymptotic legs
+
+    u = np.linspace(kepler_solve(et, n*(t_start - t0)), kepler_solve(et, n*(t_end - t0)), n_samples)
+
+    t = t0 + (et*np.sinh(u) - u)/n
+    t[0], t[-1] = t_start, t_end
+
+    return t, u
+
+
+def resample_anomaly(t_nodes, values, t, t0, n, et) : # values (..., len(t_nodes)) sampled on an anomaly_grid, interpolated onto the times t
+
+    # the cubic spline is built in u, where the nodes are uniform and the waveform smooth, and t is mapped to u with the Kepler solver
+
+    spline = CubicSpline(kepler_solve(et, n*(t_nodes - t0)), values, axis=-1)
+
+    return spline(kepler_solve(et, n*(t - t0)))
+
+
+def GW_waveform(t, t0, y0, m1, m2, chi1, chi2, Theta, PN=5, GW_order=4, radiation_reaction=False, spinning=True, n_anomaly=None) : # h_plus, h_cross of the binary on the time grid t, y0 as in spinning_orbit_2_5PN
+
+    # n_anomaly = None evaluates the orbit and the waveform on t, otherwise on n_anomaly nodes of anomaly_grid and resamples them onto t
+
+    eta = m1*m2/(m1 + m2)**2
+    S1, S2 = m1*chi1/m2, m2*chi2/m1
+
+    if n_anomaly is None :
+        nodes = t
+    else :
+        n0 = initial_mean_motion(y0[0], y0[1], eta)
+        nodes = anomaly_grid(t[0], t[-1], t0, n0, y0[1], n_anomaly)[0]
+
+    r, phi, n_vec, k, xi_vec, s1, s2, dr, v = spinning_orbit_2_5PN(nodes, t0, eta, S1, S2, y0, PN=PN, radiation_reaction=radiation_reaction, spinning=spinning, verbose=False)
+    r_harm, dr_harm, n_harm, v_harm = ADM2harmonic(r, dr, n_vec, v, s1, s2, S1, S2, eta, PN=PN)
+    h_plus, h_cross = GW_emission_from_orbit(Theta, None, nodes, n_harm, v_harm, r_harm, dr_harm, s1, s2, m1, m2, chi1, chi2, GW_order=GW_order)
+
+    if n_anomaly is None :
+        return h_plus, h_cross
+
+    return resample_anomaly(nodes, np.stack([h_plus, h_cross]), t, t0, n0, y0[1])
+
+
+# Orbit solutions with derived products computed on demand ===============================================================
+
+# rows of the contiguous storage of an orbit, in the order of the outputs of spinning_orbit_2_5PN
+orbit_fields = (('r', 1), ('phi', 1), ('n_vec', 3), ('k', 3), ('xi_vec', 3), ('s1', 3), ('s2', 3), ('dr', 1), ('v', 3))
+
+
+def orbit_solution(t, t0, y0, m1, m2, chi1, chi2, PN=5, radiation_reaction=False, spinning=True, solver='odeint', dtype=float) : # orbit of the binary as a dict, y0 as in spinning_orbit_2_5PN
+
+    # the 9 outputs of spinning_orbit_2_5PN are views O['r'], O['phi'], O['n_vec'], ... on one (21, len(t)) array O['data'] of type dtype
+    # (np.float32 halves the memory, the integration itself is always done in double precision), the derived products
+    # (orbit_positions, orbit_harmonic, orbit_waveform, orbit_radiated_energy) are computed on first access, cached in
+    # O['products'] and dropped with release_products
+
+    eta = m1*m2/(m1 + m2)**2
+    S1, S2 = m1*chi1/m2, m2*chi2/m1
+
+    orbit = spinning_orbit_2_5PN(t, t0, eta, S1, S2, y0, PN=PN, radiation_reaction=radiation_reaction, spinning=spinning, verbose=False, solver=solver)
+
+    data = np.empty((sum(rows for _, rows in orbit_fields), len(t)), dtype=dtype)
+    O = {'t' : t, 'data' : data, 'products' : {},
+         'params' : {'t0' : t0, 'm1' : m1, 'm2' : m2, 'chi1' : chi1, 'chi2' : chi2, 'eta' : eta, 'S1' : S1, 'S2' : S2, 'PN' : PN, 'radiation_reaction' : radiation_reaction}}
+
+    row = 0
+    for (name, rows), x in zip(orbit_fields, orbit) :
+        O[name] = data[row] if rows == 1 else data[row:row + rows]
+        O[name][...] = x
+        row += rows
+
+    return O
+
+
+def orbit_outputs(O) : # r, phi, n_vec, k, xi_vec, s1, s2, dr, v of the orbit, as returned by spinning_orbit_2_5PN
+
+    return tuple(O[name] for name, _ in orbit_fields)
+
+
+def orbit_product(O, key, compute) : # product key of the orbit, compute() on first access, stored with the type of the orbit
+
+    if key not in O['products'] :
+        O['products'][key] = tuple(np.asarray(x, dtype=O['data'].dtype) for x in compute())
+
+    return O['products'][key]
+
+
+def release_products(O, keys=None) : # drop the cached products of the orbit (all of them, or those of keys), returns the number of bytes released
+
+    keys = list(O['products']) if keys is None else [key for key in keys if key in O['products']]
+    released = 0
+
+    for key in keys :
+        released += sum(np.asarray(x).nbytes for x in O['products'].pop(key))
+
+    return released
+
+
+def orbit_positions(O) : # Cartesian position X, Y, Z = r*n_vec of the relative motion
+
+    return orbit_product(O, 'positions', lambda : tuple(O['r']*O['n_vec']))
+
+
+def orbit_harmonic(O) : # r_harm, dr_harm, n_harm, v_harm of ADM2harmonic
+
+    p = O['params']
+
+    return orbit_product(O, 'harmonic', lambda : ADM2harmonic(O['r'], O['dr'], O['n_vec'], O['v'], O['s1'], O['s2'], p['S1'], p['S2'], p['eta'], PN=p['PN']))
+
+
+def orbit_waveform(O, Theta, Phi=0., GW_order=4) : # h_plus, h_cross seen from the direction (Theta, Phi), cached per observer and GW order
+
+    p = O['params']
+
+    def compute() :
+        r_harm, dr_harm, n_harm, v_harm = orbit_harmonic(O)
+        h_plus, h_cross = GW_sky_map(np.atleast_1d(Theta), np.atleast_1d(Phi), n_harm, v_harm, r_harm, dr_harm, O['s1'], O['s2'], p['m1'], p['m2'], p['chi1'], p['chi2'], GW_order)
+        return h_plus[0], h_cross[0]
+
+    return orbit_product(O, ('waveform', Theta, Phi, GW_order), compute)
+
+
+def orbit_radiated_energy(O) : # leading order GW luminosity dE/dt = 8/15 eta^2 (12 v^2 - 11 dr^2)/r^4 and the energy radiated since t[0], in units of m c^2
+
+    eta = O['params']['eta']
+
+    def compute() :
+        luminosity = 8/15*eta**2*(12*dot(O['v'], O['v']) - 11*O['dr']**2)/O['r']**4
+        return luminosity, cumulative_trapezoid(luminosity, O['t'], initial=0)
+
+    return orbit_product(O, 'radiated_energy', compute)
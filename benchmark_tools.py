@@ -0,0 +1,524 @@
+import io
+import os
+import sys
+import json
+import argparse
+import platform
+import subprocess
+import contextlib
+import numpy as np
+import tracemalloc
+
+from time import perf_counter
+from datetime import datetime, timezone
+
+import PN_tools
+
+from PN_tools import kepler_tiers, kepler_solve, mikkola, GW_emission_from_orbit, spinning_initial_conditions, initial_mean_motion, spinning_orbit_2_5PN_param, dy_dt_2_5PN, dy_dt_2_5PN_jacobian, spinning_orbit_2_5PN, spinning_orbit_2_5PN_orders, ADM2harmonic, orbit_tex2py, orbit_tex2py_NLOSO
+from vector_tools import dot, cross, norm
+
+
+# Timing ================================================================================================================
+
+def best_time(f, repeat=5, warmup=True) : # best wall time of f() in seconds over repeat runs, after one warm-up call
+
+    if warmup :
+        f()
+
+    best = np.inf
+    for _ in range(repeat) :
+        start = perf_counter()
+        f()
+        best = min(best, perf_counter() - start)
+
+    return best
+
+
+# Kepler solver =========================================================================================================
+
+def bench_kepler(e=1.5, u_max=10., n_points=10**6, repeat=5, table=None) : # time per point and accuracy of every tier of kepler_solve against the exact u_0, with Mikkola's starter and with table if given
+
+    # returns {tier or tier+'_table' : {'ns_per_point', 'max_rel_error'}}, u_0 = 0 (l = 0) is part of the grid
+
+    u_0 = np.linspace(-u_max, u_max, n_points + 1 - n_points % 2)
+    l = e*np.sinh(u_0) - u_0
+    out = np.empty_like(u_0)
+
+    scale = np.maximum(np.abs(u_0), 1e-3) # relative error, absolute close to the periastron
+
+    starters = {'' : None} if table is None else {'' : None, '_table' : table}
+
+    results = {}
+    for suffix, starter_table in starters.items() :
+        for tier in kepler_tiers :
+
+            t = best_time(lambda : kepler_solve(e, l, tier, out=out, table=starter_table), repeat)
+
+            results[tier + suffix] = {'ns_per_point' : 1e9*t/len(u_0), 'max_rel_error' : np.max(np.abs(out - u_0)/scale)}
+
+    return results
+
+
+def print_bench(results, title='') : # one line per benchmark entry
+
+    if title :
+        print(title)
+
+    for name, record in results.items() :
+        print('    %-16s' % name + '  '.join('%s = %.3g' % item for item in record.items()))
+
+
+# Vector algebra ========================================================================================================
+
+def loop_dot(a, b) : # former per-sample implementation of dot, reference of bench_vector
+
+    adb = np.zeros(len(a[0]))
+
+    for i in range(len(a[0])) :
+        adb[i] = np.dot(a[:,i],b[:,i])
+
+    return adb
+
+
+def loop_cross(a, b) : # former per-sample implementation of cross, reference of bench_vector
+
+    acb = np.zeros((3,len(a[0])))
+
+    for i in range(len(a[0])) :
+        acb[:,i] = np.cross(a[:,i],b[:,i])
+
+    return acb
+
+
+def bench_vector(sizes=(10**3, 10**5, 10**7), repeat=3, loop_max=10**4, seed=0) : # time of dot, cross and norm on (3, T) arrays against the former per-sample loops
+
+    # the loops are timed on at most loop_max samples and scaled linearly, they would take minutes at T = 10^7
+    # returns {T : {'dot_ms', 'dot_loop_ms', 'dot_speedup', 'cross_ms', ...}}
+
+    rng = np.random.default_rng(seed)
+
+    results = {}
+    for T in sizes :
+
+        a, b = rng.normal(size=(2, 3, T))
+        out_scalar = np.empty(T)
+        out_vector = np.empty((3, T))
+
+        T_loop = min(T, loop_max)
+        record = {}
+
+        for name, f, loop_f, out in (('dot', dot, loop_dot, out_scalar), ('cross', cross, loop_cross, out_vector)) :
+            record[name + '_ms'] = 1e3*best_time(lambda : f(a, b, out=out), repeat)
+            record[name + '_loop_ms'] = 1e3*best_time(lambda : loop_f(a[:,:T_loop], b[:,:T_loop]), 1)*T/T_loop
+            record[name + '_speedup'] = record[name + '_loop_ms']/record[name + '_ms']
+
+        record['norm_ms'] = 1e3*best_time(lambda : norm(a, out=out_scalar), repeat)
+
+        results[T] = record
+
+    return results
+
+
+# Jacobian of the equations of motion ===================================================================================
+
+def finite_difference_jacobian(y, t, t0, eta, S1, S2, radiation_reaction=False, spinning=True, PN=5, rel_step=1e-6) : # central differences estimate of dy_dt_2_5PN_jacobian, reference of bench_jacobian
+
+    J = np.zeros((len(y), len(y)))
+
+    for j in range(len(y)) :
+        h = rel_step*max(abs(y[j]), 1e-3)
+        y_plus, y_minus = np.array(y, dtype=float), np.array(y, dtype=float)
+        y_plus[j] += h
+        y_minus[j] -= h
+        J[:, j] = (dy_dt_2_5PN(y_plus, t, t0, eta, S1, S2, radiation_reaction, spinning, PN) - dy_dt_2_5PN(y_minus, t, t0, eta, S1, S2, radiation_reaction, spinning, PN))/(2*h)
+
+    return J
+
+
+# (b, et0, chi) of equal spins, eta = 0.2, odeint switches to its stiff method during the close encounters (b = 8) only
+jacobian_cases = ((8., 2., 0.99), (8., 1.01, 0.5), (20., 1.2, 0.9), (40., 1.6, 0.9))
+
+
+def bench_jacobian(cases=jacobian_cases, T=20000, t_max=6000., repeat=3) : # check of dy_dt_2_5PN_jacobian against finite differences and orbit cost with and without it
+
+    # returns {'(b, et0, chi)' : {'jacobian_error', 'rhs_calls_fd', 'rhs_calls', 'ms_fd', 'ms', 'speedup'}}, the error is the largest
+    # deviation from finite_difference_jacobian relative to the largest entry of the row, along the orbit
+
+    eta = 0.2
+    m1 = (1 + np.sqrt(1 - 4*eta))/2
+    m2 = 1 - m1
+    t = np.linspace(-t_max, t_max, T)
+
+    results = {}
+    for b, et0, chi in cases :
+
+        S1, S2 = m1*chi/m2, m2*chi/m1
+        spinning = chi != 0
+        y0 = spinning_initial_conditions(b, et0, eta, S1, S2, 0.7, 0.2, 1.9, 2.) if spinning else (b, et0, 0.)
+
+        orbit = lambda jacobian, profile=None : spinning_orbit_2_5PN(t, 0., eta, S1, S2, y0, radiation_reaction=True, spinning=spinning, verbose=False, jacobian=jacobian, profile=profile)
+
+        y = np.array(y0, dtype=float)
+        y[0] = initial_mean_motion(b, et0, eta)
+        error = 0.
+        for time in (-t_max, -t_max/10, 0., t_max/2) :
+            J = dy_dt_2_5PN_jacobian(y, time, 0., eta, S1, S2, True, spinning)
+            J_fd = finite_difference_jacobian(y, time, 0., eta, S1, S2, True, spinning)
+            error = max(error, np.max(np.abs(J - J_fd)/(np.max(np.abs(J_fd), axis=1, keepdims=True) + 1e-300)))
+
+        record = {'jacobian_error' : error}
+        for key, jacobian in (('_fd', False), ('', True)) :
+            profile = {}
+            orbit(jacobian, profile)
+            record['rhs_calls' + key] = profile['rhs_calls']
+            record['ms' + key] = 1e3*best_time(lambda : orbit(jacobian), repeat)
+        record['speedup'] = record['ms_fd']/record['ms']
+
+        results[str((b, et0, chi))] = record
+
+    return results
+
+
+# Several PN orders in one integration ==================================================================================
+
+def bench_orders(cases=((40., 1.3, 0.9), (100., 1.5, 0.5), (40., 1.3, 0.)), PN_orders=(2, 3, 4, 5), T=20000, t_max=3000., repeat=3) : # spinning_orbit_2_5PN_orders against one spinning_orbit_2_5PN per order
+
+    # returns {'(b, et0, chi)' : {'ms_separate', 'ms_orders', 'speedup', 'max_rel_diff'}}, eta = 0.24, the deviation is the
+    # largest difference of r and phi between both runs relative to their largest value
+
+    eta = 0.24
+    m1 = (1 + np.sqrt(1 - 4*eta))/2
+    m2 = 1 - m1
+    t = np.linspace(-t_max, t_max, T)
+
+    results = {}
+    for b, et0, chi in cases :
+
+        S1, S2 = m1*chi/m2, m2*chi/m1
+        spinning = chi != 0
+        y0 = spinning_initial_conditions(b, et0, eta, S1, S2, 0.7, 0.2, 1.9, 2.) if spinning else (b, et0, 0.)
+
+        separate = lambda : {PN : spinning_orbit_2_5PN(t, 0., eta, S1, S2, y0, PN=PN, radiation_reaction=True, spinning=spinning, verbose=False) for PN in PN_orders}
+        together = lambda : spinning_orbit_2_5PN_orders(t, 0., eta, S1, S2, y0, PN_orders, radiation_reaction=True, spinning=spinning, verbose=False)
+
+        reference, orbits = separate(), together()
+        deviation = max(np.max(np.abs(x - y))/np.max(np.abs(x)) for PN in PN_orders for x, y in zip(reference[PN][:2], orbits[PN][:2]))
+
+        record = {'ms_separate' : 1e3*best_time(separate, repeat, warmup=False), 'ms_orders' : 1e3*best_time(together, repeat, warmup=False)}
+        record['speedup'] = record['ms_separate']/record['ms_orders']
+        record['max_rel_diff'] = deviation
+
+        results[str((b, et0, chi))] = record
+
+    return results
+
+
+# Compiled backend ======================================================================================================
+
+first_call_script = """
+import time, PN_tools
+start = time.perf_counter()
+PN_tools.rhs_backend('numba')(PN_tools.np.array([0.01, 1.3, 0.1, 0.1, 1., 1., 0., 0., 0., 1., 0., 0.]), 10., 0., 0.2, 0.5, 0.5)
+print(time.perf_counter() - start)
+"""
+
+
+def bench_backends(cases=((40., 1.3, 0.9), (100., 1.5, 0.5), (40., 1.3, 0.)), T=20000, t_max=3000., repeat=3) : # wall time of one orbit with the numpy and numba right-hand sides
+
+    # returns {'(b, et0, chi)' : {'ms_numpy', 'ms_numba', 'speedup', 'max_rel_diff'}} with radiation reaction, eta = 0.24, and under
+    # 'first_call' the time of the first call of the compiled right-hand side in a new interpreter (a worker start-up), which imports
+    # numba and loads the kernels from the disk cache once they have been compiled. Empty without numba
+
+    if not PN_tools.compile_kernels() :
+        return {}
+
+    eta = 0.24
+    m1 = (1 + np.sqrt(1 - 4*eta))/2
+    m2 = 1 - m1
+    t = np.linspace(-t_max, t_max, T)
+
+    results = {}
+    for b, et0, chi in cases :
+
+        S1, S2 = m1*chi/m2, m2*chi/m1
+        spinning = chi != 0
+        y0 = spinning_initial_conditions(b, et0, eta, S1, S2, 0.7, 0.2, 1.9, 2.) if spinning else (b, et0, 0.)
+
+        orbit = lambda backend : spinning_orbit_2_5PN(t, 0., eta, S1, S2, y0, radiation_reaction=True, spinning=spinning, verbose=False, backend=backend)
+
+        reference, orbits = orbit('numpy'), orbit('numba')
+        deviation = max(np.nanmax(np.abs(x - y))/np.nanmax(np.abs(x)) for x, y in zip(reference, orbits))
+
+        record = {'ms_numpy' : 1e3*best_time(lambda : orbit('numpy'), repeat), 'ms_numba' : 1e3*best_time(lambda : orbit('numba'), repeat)}
+        record['speedup'] = record['ms_numpy']/record['ms_numba']
+        record['max_rel_diff'] = deviation
+
+        results[str((b, et0, chi))] = record
+
+    directory = os.path.dirname(os.path.abspath(PN_tools.__file__))
+    output = subprocess.run([sys.executable, '-c', first_call_script], cwd=directory, capture_output=True, text=True, check=True).stdout
+    results['first_call'] = {'ms' : 1e3*float(output.split()[-1])}
+
+    return results
+
+
+# Waveform evaluation ===================================================================================================
+
+def peak_memory(f) : # peak memory allocated by numpy during f() in bytes
+
+    tracemalloc.start()
+    try :
+        f()
+        return tracemalloc.get_traced_memory()[1]
+    finally :
+        tracemalloc.stop()
+
+
+def bench_GW(T=10**6, chunk_sizes=(None, 2048, 8192, 32768), repeat=3, seed=0) : # time and peak memory of GW_emission_from_orbit for every chunk size on a random orbit of T samples
+
+    # returns {chunk_size : {'ms', 'peak_over_output'}}, the peak memory is given in units of the two output polarisations
+
+    rng = np.random.default_rng(seed)
+
+    n, velocity, s1, s2 = rng.normal(size=(4, 3, T))
+    r = rng.uniform(5., 50., T)
+    dr = rng.normal(size=T)
+
+    results = {}
+    for chunk_size in chunk_sizes :
+
+        f = lambda : GW_emission_from_orbit(np.pi/4, None, None, n, velocity, r, dr, s1, s2, 1.3, 0.7, 0.6, 0.4, chunk_size=chunk_size)
+
+        results[str(chunk_size)] = {'ms' : 1e3*best_time(f, repeat), 'peak_over_output' : peak_memory(f)/(2*8*T)}
+
+    return results
+
+
+# Import time ===========================================================================================================
+
+# the modules used by the pool workers and the command line, they must not load the heavy optional dependencies
+core_modules = ('vector_tools', 'PN_tools', 'cache_tools', 'sweep_tools', 'fourier_tools', 'fit_tools', 'catalog_tools')
+heavy_modules = ('matplotlib', 'sympy', 'astropy', 'latex2sympy2', 'tqdm', 'numba')
+
+import_script = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start, len([name for name in {heavy} if name in sys.modules]))
+"""
+
+
+def bench_import(modules=core_modules, repeat=3) : # import time of every module in a new interpreter and the number of heavy_modules it loads
+
+    # returns {module : {'ms', 'heavy_modules'}}, the best time over repeat interpreters (the first ones also warm the disk caches)
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+
+    results = {}
+    for module in modules :
+        times = []
+        for _ in range(repeat) :
+            output = subprocess.run([sys.executable, '-c', import_script.format(module=module, heavy=heavy_modules)], cwd=directory, capture_output=True, text=True, check=True).stdout
+            seconds, heavy = output.split()
+            times.append(float(seconds))
+        results[module] = {'ms' : 1e3*min(times), 'heavy_modules' : int(heavy)}
+
+    return results
+
+
+# Pipeline suite ========================================================================================================
+
+suite_sizes = (10**3, 10**4, 10**5, 10**6)
+suite_binary = {'m1' : 20., 'm2' : 15., 'chi1' : 0.8, 'chi2' : 0.6, 'b' : 70., 'et0' : 1.1, 'theta1' : 0.5, 'phi1' : 0.35, 'theta2' : 0.8, 'phi2' : 1.}
+
+
+def suite_timer(f, size, repeat) : # best time of f(), repeated and warmed up on small grids only
+
+    return best_time(f, repeat if size <= 10**4 else 1, warmup=size <= 10**4)
+
+
+def run_suite(sizes=suite_sizes, orbit_sizes=None, PN_orders=(0, 2, 3, 4, 5), repeat=5, latex=True, log=print) : # time every stage of the orbit-to-waveform pipeline, returns {'stage[size]' : seconds}
+
+    # orbit_sizes (default sizes) bounds the full integrations, the most expensive benchmarks, all binaries are suite_binary
+
+    orbit_sizes = sizes if orbit_sizes is None else orbit_sizes
+    p = suite_binary
+
+    eta = p['m1']*p['m2']/(p['m1'] + p['m2'])**2
+    S1, S2 = p['m1']*p['chi1']/p['m2'], p['m2']*p['chi2']/p['m1']
+    y0_spin = spinning_initial_conditions(p['b'], p['et0'], eta, S1, S2, p['theta1'], p['phi1'], p['theta2'], p['phi2'])
+    y0_orbit = p['b'], p['et0'], 0.
+
+    rng = np.random.default_rng(0)
+    results = {}
+
+    def record(name, f, size, n_repeat=repeat) :
+        results[name + '[' + str(size) + ']'] = t = suite_timer(f, size, n_repeat)
+        if log is not None :
+            log('%-40s %10.3e s' % (name + '[' + str(size) + ']', t))
+
+    # import of the core modules in a new interpreter, a heavy dependency loaded again shows up as a regression of its time
+    for module, record_import in bench_import(repeat=repeat).items() :
+        results['import_' + module + '[1]'] = record_import['ms']/1e3
+        if log is not None :
+            log('%-40s %10.3e s' % ('import_' + module + '[1]', record_import['ms']/1e3) + ('  (' + str(record_import['heavy_modules']) + ' heavy modules)' if record_import['heavy_modules'] else ''))
+
+    # right-hand side, one call on the state of one binary
+    y = np.array(y0_spin, dtype=float)
+    y[0] = 0.01
+    record('dy_dt_2_5PN', lambda : dy_dt_2_5PN(y, 10., 0., eta, S1, S2, True), 1, 100)
+
+    for size in sizes :
+
+        a, b = rng.normal(size=(2, 3, size))
+        l = rng.uniform(-50., 50., size)
+        n = rng.uniform(0.005, 0.02, size)
+        et = rng.uniform(1.05, 1.5, size)
+        kds = rng.uniform(-1., 1., (2, size))
+
+        record('mikkola', lambda : mikkola(1.5, l), size)
+        record('spinning_orbit_2_5PN_param', lambda : spinning_orbit_2_5PN_param(n, et, kds[0], kds[1], eta, S1, S2, None), size)
+        record('dot', lambda : dot(a, b), size)
+        record('cross', lambda : cross(a, b), size)
+
+    for size in orbit_sizes :
+
+        t = np.linspace(-1500, 1500, size)
+
+        for PN in PN_orders :
+            record('orbit_PN' + str(PN), lambda : spinning_orbit_2_5PN(t, 0., eta, 0., 0., y0_orbit, PN=PN, spinning=False, radiation_reaction=True, verbose=False), size, 1)
+            record('orbit_spinning_PN' + str(PN), lambda : spinning_orbit_2_5PN(t, 0., eta, S1, S2, y0_spin, PN=PN, radiation_reaction=True, verbose=False), size, 1)
+
+        r, phi, n_vec, k, xi_vec, s1, s2, dr, v = spinning_orbit_2_5PN(t, 0., eta, S1, S2, y0_spin, radiation_reaction=True, verbose=False)
+        r_harm, dr_harm, n_harm, v_harm = ADM2harmonic(r, dr, n_vec, v, s1, s2, S1, S2, eta)
+
+        record('ADM2harmonic', lambda : ADM2harmonic(r, dr, n_vec, v, s1, s2, S1, S2, eta), size)
+        record('GW_emission_from_orbit', lambda : GW_emission_from_orbit(np.pi/4, None, t, n_harm, v_harm, r_harm, dr_harm, s1, s2, p['m1'], p['m2'], p['chi1'], p['chi2']), size)
+
+    if latex :
+        # the NLO spin-orbit terms are parsed first, latex2sympy is left unusable after the failure of orbit_tex2py below
+        def parse_NLOSO() :
+            with contextlib.redirect_stdout(io.StringIO()) :
+                orbit_tex2py_NLOSO()
+        def parse() :
+            with contextlib.redirect_stdout(io.StringIO()) :
+                try :
+                    orbit_tex2py()
+                except TypeError : # the h_plus_LO expression is not understood by latex2sympy, the sections before it are parsed
+                    pass
+        record('orbit_tex2py_NLOSO', parse_NLOSO, 1, 1)
+        record('orbit_tex2py', parse, 1, 1)
+
+    return results
+
+
+# History and regressions ===============================================================================================
+
+def git_commit() : # short hash of the checked out commit, None outside of a git repository
+
+    try :
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError) :
+        return None
+
+
+def load_history(file) :
+
+    if not os.path.exists(file) :
+        return []
+
+    with open(file) as f :
+        return json.load(f)
+
+
+def append_history(file, results, label=None) : # add a run to the JSON history file, returns the run
+
+    run = {'label' : label, 'date' : datetime.now(timezone.utc).isoformat(timespec='seconds'), 'commit' : git_commit(),
+           'python' : platform.python_version(), 'numpy' : np.__version__, 'machine' : platform.node(), 'results' : results}
+
+    history = load_history(file) + [run]
+
+    tmp = file + '.tmp'
+    with open(tmp, 'w') as f :
+        json.dump(history, f, indent=1)
+    os.replace(tmp, file)
+
+    return run
+
+
+def find_run(history, ref) : # run of the history by index (as an int or a digit string) or by label
+
+    if isinstance(ref, int) or (isinstance(ref, str) and ref.lstrip('-').isdigit()) :
+        return history[int(ref)]
+
+    for run in reversed(history) :
+        if run['label'] == ref :
+            return run
+
+    raise ValueError('no benchmark run labelled ' + str(ref))
+
+
+def compare_runs(baseline, run, threshold=1.2) : # time ratios run/baseline of the benchmarks of both runs, returns {name : ratio} and the names slower than threshold
+
+    ratios = {name : run['results'][name]/baseline['results'][name] for name in baseline['results'] if name in run['results']}
+    regressions = [name for name, ratio in ratios.items() if ratio > threshold]
+
+    return ratios, regressions
+
+
+def print_comparison(baseline, run, ratios, regressions, threshold) :
+
+    describe = lambda r : str(r['label'] or '') + ' (' + r['date'] + ', ' + str(r['commit']) + ')'
+    print('baseline : ' + describe(baseline))
+    print('run      : ' + describe(run))
+
+    for name, ratio in ratios.items() :
+        flag = '  REGRESSION' if name in regressions else ''
+        print('%-40s %10.3e s -> %10.3e s  x%.2f%s' % (name, baseline['results'][name], run['results'][name], ratio, flag))
+
+    print(str(len(regressions)) + ' regression(s) above x' + str(threshold))
+
+
+def main(argv=None) : # command line : python benchmark_tools.py run|compare ...
+
+    parser = argparse.ArgumentParser(description='benchmark suite of the orbit-to-waveform pipeline')
+    parser.add_argument('--history', default='benchmark_history.json', help='JSON history file')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the suite and append it to the history')
+    run_parser.add_argument('--label', default=None)
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=list(suite_sizes))
+    run_parser.add_argument('--orbit-sizes', type=int, nargs='+', default=None)
+    run_parser.add_argument('--PN', type=int, nargs='+', default=[0, 2, 3, 4, 5])
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--no-latex', action='store_true', help='skip the LaTeX parsing benchmark')
+    run_parser.add_argument('--quick', action='store_true', help='sizes 10^3 and 10^4 only')
+
+    compare_parser = commands.add_parser('compare', help='compare a run with a baseline, exits with 1 on regressions')
+    compare_parser.add_argument('--baseline', default='0', help='index or label of the baseline run (default the first one)')
+    compare_parser.add_argument('--run', default='-1', help='index or label of the compared run (default the last one)')
+    compare_parser.add_argument('--threshold', type=float, default=1.2, help='time ratio above which a benchmark is a regression')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run' :
+        sizes = [10**3, 10**4] if args.quick else args.sizes
+        results = run_suite(sizes, args.orbit_sizes, args.PN, args.repeat, not args.no_latex)
+        run = append_history(args.history, results, args.label)
+        print('saved ' + str(len(results)) + ' benchmarks to ' + args.history + ' (run ' + str(len(load_history(args.history)) - 1) + ', commit ' + str(run['commit']) + ')')
+        return 0
+
+    history = load_history(args.history)
+    if len(history) < 1 :
+        print('no benchmark run in ' + args.history, file=sys.stderr)
+        return 2
+
+    baseline, run = find_run(history, args.baseline), find_run(history, args.run)
+    ratios, regressions = compare_runs(baseline, run, args.threshold)
+    print_comparison(baseline, run, ratios, regressions, args.threshold)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__' :
+    sys.exit(main())
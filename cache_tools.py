@@ -0,0 +1,232 @@
+import os
+import hashlib
+import numpy as np
+
+from collections import OrderedDict
+
+import PN_tools
+import vector_tools
+
+from PN_tools import spinning_orbit_2_5PN, ADM2harmonic, GW_sky_map
+
+
+# Content-addressed keys ================================================================================================
+
+code_version_cache = []
+
+
+def code_version() : # hash of the sources that compute the cached results, a code change invalidates the whole cache
+
+    if not code_version_cache :
+        h = hashlib.sha256()
+        for module in (PN_tools, vector_tools) :
+            with open(module.__file__, 'rb') as f :
+                h.update(f.read())
+        code_version_cache.append(h.hexdigest()[:16])
+
+    return code_version_cache[0]
+
+
+def hash_value(h, x) : # feed x (numbers, strings, arrays and nested tuples/lists of them) to the hash h, stable across runs
+
+    if isinstance(x, (tuple, list)) :
+        h.update(b'(' + str(len(x)).encode())
+        for item in x :
+            hash_value(h, item)
+    elif isinstance(x, str) :
+        h.update(b's' + x.encode())
+    elif x is None or isinstance(x, bool) :
+        h.update(repr(x).encode())
+    else :
+        x = np.ascontiguousarray(x, dtype=float)
+        h.update(b'a' + str(x.shape).encode() + x.tobytes())
+
+
+def cache_key(kind, *args) : # key of a result of kind computed from args, includes the code version
+
+    h = hashlib.sha256()
+    hash_value(h, (kind, code_version()) + args)
+
+    return kind + '_' + h.hexdigest()[:32]
+
+
+# Memory and disk tiers =================================================================================================
+
+cache_config = {'max_memory_bytes' : 2**29, 'directory' : None, 'max_disk_bytes' : 2**32}
+
+memory_cache = OrderedDict()
+cache_stats = {'memory_hits' : 0, 'disk_hits' : 0, 'misses' : 0}
+
+
+def set_cache(max_memory_bytes=None, directory=None, max_disk_bytes=None) : # configure the cache, directory enables the disk tier (directory='' disables it)
+
+    if max_memory_bytes is not None :
+        cache_config['max_memory_bytes'] = max_memory_bytes
+    if directory is not None :
+        cache_config['directory'] = directory or None
+    if max_disk_bytes is not None :
+        cache_config['max_disk_bytes'] = max_disk_bytes
+
+    evict_memory()
+    evict_disk()
+
+
+def clear_cache(disk=False) : # empty the memory tier, and the disk tier if disk
+
+    memory_cache.clear()
+
+    directory = cache_config['directory']
+    if disk and directory is not None and os.path.isdir(directory) :
+        for file in os.listdir(directory) :
+            if file.endswith('.npz') :
+                os.remove(os.path.join(directory, file))
+
+
+def entry_bytes(value) :
+
+    return sum(x.nbytes for x in value)
+
+
+def evict_memory() : # drop the least recently used entries above max_memory_bytes
+
+    total = sum(entry_bytes(value) for value in memory_cache.values())
+
+    while memory_cache and total > cache_config['max_memory_bytes'] :
+        total -= entry_bytes(memory_cache.popitem(last=False)[1])
+
+
+def evict_disk() : # delete the least recently used files above max_disk_bytes, the modification time is refreshed on every hit
+
+    directory = cache_config['directory']
+    if directory is None or not os.path.isdir(directory) :
+        return
+
+    files = [os.path.join(directory, file) for file in os.listdir(directory) if file.endswith('.npz')]
+    files = sorted((os.stat(file).st_mtime, os.stat(file).st_size, file) for file in files)
+    total = sum(size for _, size, _ in files)
+
+    for _, size, file in files :
+        if total <= cache_config['max_disk_bytes'] :
+            break
+        os.remove(file)
+        total -= size
+
+
+def store_memory(key, value) :
+
+    for x in value :
+        x.flags.writeable = False # shared between callers
+
+    memory_cache[key] = value
+    memory_cache.move_to_end(key)
+    evict_memory()
+
+
+def lookup(key) : # value of key from memory, then disk (copied to memory), None if it is in neither
+
+    if key in memory_cache :
+        memory_cache.move_to_end(key)
+        cache_stats['memory_hits'] += 1
+        return memory_cache[key]
+
+    directory = cache_config['directory']
+    if directory is None :
+        return None
+
+    # a missing file, or one evicted by another process while it is read, is a miss
+    file = os.path.join(directory, key + '.npz')
+    try :
+        with np.load(file) as data :
+            value = tuple(data['arr_' + str(i)] for i in range(len(data.files)))
+        os.utime(file)
+    except OSError :
+        return None
+
+    cache_stats['disk_hits'] += 1
+    store_memory(key, value)
+
+    return value
+
+
+def store(key, value) : # store the computed value of key in memory and on disk, returns it as a tuple of float arrays
+
+    value = tuple(np.asarray(x, dtype=float) for x in value)
+
+    directory = cache_config['directory']
+    if directory is not None :
+        # written to a temporary file first, an interrupted write never leaves a truncated entry
+        file = os.path.join(directory, key + '.npz')
+        os.makedirs(directory, exist_ok=True)
+        tmp = file + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp, 'wb') as f :
+            np.savez(f, *value)
+        os.replace(tmp, file)
+        evict_disk()
+
+    store_memory(key, value)
+
+    return value
+
+
+def cached(key, compute) : # value of key (a tuple of arrays) from memory, then disk, else compute() and store it in both
+
+    value = lookup(key)
+
+    if value is None :
+        cache_stats['misses'] += 1
+        value = store(key, compute())
+
+    return value
+
+
+def cached_batch(keys, compute) : # values of several keys, the missing ones computed together by compute(missing keys), which returns their values in order
+
+    # for computations cheaper as an ensemble (e.g. spinning_orbit_2_5PN_batch), a key repeated in keys is computed once,
+    # the cached values are read before the missing ones are stored, storing them can evict the others from memory
+
+    values = {key : lookup(key) for key in OrderedDict.fromkeys(keys)}
+    missing = [key for key, value in values.items() if value is None]
+
+    if missing :
+        cache_stats['misses'] += len(missing)
+        for key, value in zip(missing, compute(missing)) :
+            values[key] = store(key, value)
+
+    return [values[key] for key in keys]
+
+
+# Cached stages of the waveform pipeline ================================================================================
+
+def cached_orbit(t, t0, eta, S1, S2, y0, PN=5, radiation_reaction=False, spinning=True, solver='odeint') : # spinning_orbit_2_5PN through the cache, returns r, phi, n_vec, k, xi_vec, s1, s2, dr, v (read-only)
+
+    key = cache_key('orbit', t, t0, eta, S1, S2, tuple(y0), PN, radiation_reaction, spinning, solver)
+
+    return cached(key, lambda : spinning_orbit_2_5PN(t, t0, eta, S1, S2, y0, PN=PN, radiation_reaction=radiation_reaction, spinning=spinning, verbose=False, solver=solver))
+
+
+def cached_harmonic(t, t0, eta, S1, S2, y0, PN=5, radiation_reaction=False, spinning=True, solver='odeint') : # ADM2harmonic of cached_orbit, returns r_harm, dr_harm, n_harm, v_harm (read-only)
+
+    key = cache_key('harmonic', t, t0, eta, S1, S2, tuple(y0), PN, radiation_reaction, spinning, solver)
+
+    def compute() :
+        r, phi, n_vec, k, xi_vec, s1, s2, dr, v = cached_orbit(t, t0, eta, S1, S2, y0, PN, radiation_reaction, spinning, solver)
+        return ADM2harmonic(r, dr, n_vec, v, s1, s2, S1, S2, eta, PN=PN)
+
+    return cached(key, compute)
+
+
+def cached_waveform(t, t0, y0, m1, m2, chi1, chi2, Theta, Phi=0., PN=5, GW_order=4, radiation_reaction=False, spinning=True, solver='odeint') : # h_plus, h_cross for the observers (Theta, Phi), shape (n_obs, len(t)) (read-only)
+
+    # the orbit and its harmonic gauge version are cached separately, a new observer or GW_order only recomputes the projection
+
+    eta = m1*m2/(m1 + m2)**2
+    S1, S2 = m1*chi1/m2, m2*chi2/m1
+
+    key = cache_key('waveform', t, t0, tuple(y0), m1, m2, chi1, chi2, Theta, Phi, PN, GW_order, radiation_reaction, spinning, solver)
+
+    def compute() :
+        s1, s2 = cached_orbit(t, t0, eta, S1, S2, y0, PN, radiation_reaction, spinning, solver)[5:7]
+        r_harm, dr_harm, n_harm, v_harm = cached_harmonic(t, t0, eta, S1, S2, y0, PN, radiation_reaction, spinning, solver)
+        return GW_sky_map(Theta, Phi, n_harm, v_harm, r_harm, dr_harm, s1, s2, m1, m2, chi1, chi2, GW_order)
+
+    return cached(key, compute)
@@ -0,0 +1,242 @@
+import io
+import os
+import numpy as np
+
+from cache_tools import code_version
+from PN_tools import orbit_fields, orbit_waveform
+
+
+# Catalog layout ========================================================================================================
+
+# a catalog is a directory holding
+#   index.npy         one row of catalog_dtype per entry, read as a memory map, grown in place on every append : the new rows
+#                     are appended to the file and only then counted in its header
+#   chunks/000000.npz one file per append, compressed, with the time grid 't', the block size 'block' and every series
+#                     cut in blocks of samples 'name.0', 'name.1', ... of shape (entries of the chunk, ..., block)
+# a read only decompresses the blocks it needs, the members of an npz file being compressed separately
+
+catalog_params = ('m1', 'm2', 'chi1', 'chi2', 'b', 'et0', 'theta1', 'phi1', 'theta2', 'phi2', 'PN', 'GW_order', 'Theta', 'Phi', 'radiation_reaction')
+
+# series lists the names of the series stored for the entry, separated by spaces, in at most series_length characters
+series_length = 128
+
+catalog_dtype = [(name, float) for name in catalog_params] + [('t_start', float), ('t_end', float), ('n_t', int), ('chunk', int), ('row', int), ('version', 'U16'), ('series', 'U' + str(series_length))]
+
+
+def index_file(path) :
+
+    return os.path.join(path, 'index.npy')
+
+
+def chunk_file(path, chunk) :
+
+    return os.path.join(path, 'chunks', '%06d.npz' % chunk)
+
+
+def load_index(path) : # index of the catalog in path as a read-only memory map, empty if the catalog does not exist yet
+
+    if not os.path.exists(index_file(path)) :
+        return np.zeros(0, dtype=catalog_dtype)
+
+    return np.load(index_file(path), mmap_mode='r')
+
+
+def save_atomic(file, save) : # save(f) into a temporary file renamed to file, an interrupted write never leaves a truncated file
+
+    tmp = file + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp, 'wb') as f :
+        save(f)
+    os.replace(tmp, file)
+
+
+def index_append(path, entries) : # append the rows entries to index.npy without rewriting it, returns the number of rows before them
+
+    # the rows are written after the last counted one (dropping the leftovers of an interrupted append), flushed to disk, and only then
+    # counted by rewriting the header in place, an interrupted append leaves the index as it was. The header of an npy file is padded
+    # so that its shape can grow without changing its length
+
+    file = index_file(path)
+
+    if not os.path.exists(file) :
+        save_atomic(file, lambda f : np.save(f, entries))
+        return 0
+
+    with open(file, 'r+b') as f :
+
+        version = np.lib.format.read_magic(f)
+        read_header, write_header = {(1, 0) : (np.lib.format.read_array_header_1_0, np.lib.format.write_array_header_1_0),
+                                     (2, 0) : (np.lib.format.read_array_header_2_0, np.lib.format.write_array_header_2_0)}[version]
+        (n_rows,), _, dtype = read_header(f)
+        offset = f.tell()
+
+        if dtype != entries.dtype :
+            raise ValueError('the index of ' + path + ' has the rows ' + str(dtype) + ', not ' + str(entries.dtype) + ', it was written by another version of catalog_tools')
+
+        header = io.BytesIO()
+        write_header(header, {'descr' : np.lib.format.dtype_to_descr(dtype), 'fortran_order' : False, 'shape' : (n_rows + len(entries),)})
+        if len(header.getvalue()) != offset :
+            raise ValueError('the header of ' + file + ' cannot hold ' + str(n_rows + len(entries)) + ' rows')
+
+        f.seek(offset + n_rows*dtype.itemsize)
+        f.truncate()
+        f.write(entries.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+
+        f.seek(0)
+        f.write(header.getvalue())
+        f.flush()
+        os.fsync(f.fileno())
+
+    return n_rows
+
+
+# Writer ================================================================================================================
+
+def catalog_append(path, params, series, t, block=65536, dtype=None) : # add entries sharing the time grid t to the catalog in path, returns their rows in the index
+
+    # params maps names of catalog_params to values (scalars or arrays over the entries, missing ones are NaN),
+    # series maps names to arrays (n_entries, ..., len(t)), e.g. h_plus and h_cross, or the outputs of an orbit,
+    # stored with their type unless dtype is given (np.float32 halves the catalog)
+
+    series = {name : np.asarray(x) if dtype is None else np.asarray(x, dtype=dtype) for name, x in series.items()}
+    n_entries = len(next(iter(series.values())))
+
+    for name, x in series.items() :
+        if len(x) != n_entries or x.shape[-1] != len(t) :
+            raise ValueError('series ' + name + ' of shape ' + str(x.shape) + ' does not hold ' + str(n_entries) + ' entries of ' + str(len(t)) + ' samples')
+
+    names = ' '.join(series)
+    if any(len(name.split()) != 1 for name in series) or len(names) > series_length :
+        raise ValueError('the series names ' + str(list(series)) + ' must be single words of at most ' + str(series_length) + ' characters in total')
+
+    unknown = set(params) - set(catalog_params)
+    if unknown :
+        raise ValueError('unknown catalog parameters ' + str(sorted(unknown)) + ', expected some of ' + str(catalog_params))
+
+    # the chunks are numbered in the order of the appends, also those of interrupted appends are skipped
+    os.makedirs(os.path.join(path, 'chunks'), exist_ok=True)
+    chunk = max([int(file.split('.')[0]) + 1 for file in os.listdir(os.path.join(path, 'chunks')) if file.endswith('.npz')], default=0)
+
+    entries = np.zeros(n_entries, dtype=catalog_dtype)
+    for name in catalog_params :
+        entries[name] = params.get(name, np.nan)
+    entries['t_start'], entries['t_end'], entries['n_t'] = t[0], t[-1], len(t)
+    entries['chunk'], entries['row'] = chunk, np.arange(n_entries)
+    entries['version'] = code_version()
+    entries['series'] = names
+
+    members = {'t' : np.asarray(t, dtype=float), 'block' : np.array(block)}
+    for name, x in series.items() :
+        for j, start in enumerate(range(0, len(t), block)) :
+            members[name + '.' + str(j)] = x[..., start:start + block]
+
+    # the chunk is written before the index, an interrupted append leaves an unreferenced chunk and no entry
+    save_atomic(chunk_file(path, chunk), lambda f : np.savez_compressed(f, **members))
+    start = index_append(path, entries)
+
+    return np.arange(start, start + n_entries)
+
+
+def catalog_add_orbit(path, O, Theta=None, Phi=0., GW_order=4, orbit=True, b=np.nan, et0=np.nan, dtype=None) : # add an orbit of PN_tools.orbit_solution, with its waveform seen from Theta if given
+
+    # b and et0 are not part of the orbit and are only recorded if given
+
+    p = O['params']
+
+    series = {name : O[name][None] for name, _ in orbit_fields} if orbit else {}
+    if Theta is not None :
+        h_plus, h_cross = orbit_waveform(O, Theta, Phi, GW_order)
+        series.update({'h_plus' : h_plus[None], 'h_cross' : h_cross[None]})
+
+    params = {'m1' : p['m1'], 'm2' : p['m2'], 'chi1' : p['chi1'], 'chi2' : p['chi2'], 'b' : b, 'et0' : et0, 'PN' : p['PN'], 'radiation_reaction' : p['radiation_reaction'],
+              'GW_order' : np.nan if Theta is None else GW_order, 'Theta' : np.nan if Theta is None else Theta, 'Phi' : np.nan if Theta is None else Phi}
+
+    return catalog_append(path, params, series, O['t'], dtype=dtype)
+
+
+# Queries and reads =====================================================================================================
+
+def stores_series(entries, name) : # mask of the entries storing the series name
+
+    return np.array([name in series.split() for series in entries['series']], dtype=bool)
+
+
+def catalog_select(index, **conditions) : # rows of the index matching every condition, name=value (to rounding) or name=(low, high) inclusive
+
+    # series=name selects the entries that store the series name
+
+    mask = np.ones(len(index), dtype=bool)
+
+    for name, condition in conditions.items() :
+        values = index[name]
+        if name == 'series' :
+            mask &= stores_series(index, condition)
+        elif isinstance(condition, tuple) :
+            mask &= (values >= condition[0]) & (values <= condition[1])
+        elif isinstance(condition, str) :
+            mask &= values == condition
+        else :
+            mask &= np.isclose(values, condition, rtol=1e-12, atol=0)
+
+    return np.flatnonzero(mask)
+
+
+def catalog_time(path, row) : # time grid of the entry row
+
+    entry = load_index(path)[row]
+
+    with np.load(chunk_file(path, entry['chunk'])) as data :
+        return data['t']
+
+
+def catalog_blocks(path, rows, name, start=0, stop=None) : # yields (start, values) of the series name of the entries rows, one block of samples at a time
+
+    # all entries must have the same number of samples, values has shape (len(rows), ..., samples of the block),
+    # only one block of every chunk involved is in memory at a time
+
+    index = load_index(path)
+    rows = np.atleast_1d(rows)
+    entries = index[rows]
+
+    lacking = rows[~stores_series(entries, name)]
+    if len(lacking) :
+        raise ValueError('the entries ' + str(lacking.tolist()) + ' do not store the series ' + name + ', see catalog_select(index, series=' + repr(name) + ')')
+
+    if len(np.unique(entries['n_t'])) > 1 :
+        raise ValueError('the entries have different numbers of samples, read them separately')
+    stop = int(entries['n_t'][0]) if stop is None else stop
+
+    chunks = {chunk : np.load(chunk_file(path, chunk)) for chunk in np.unique(entries['chunk'])}
+
+    try :
+        blocks = {chunk : int(data['block']) for chunk, data in chunks.items()}
+        loaded = {} # last decompressed block of every chunk, (j, values)
+        position = start
+
+        while position < stop :
+
+            # the next boundary of a block in any of the chunks, so that every piece lies in a single block of each chunk
+            end = min([stop] + [(position//block + 1)*block for block in blocks.values()])
+
+            pieces = {}
+            for chunk, data in chunks.items() :
+                block = blocks[chunk]
+                j = position//block
+                if chunk not in loaded or loaded[chunk][0] != j :
+                    loaded[chunk] = (j, data[name + '.' + str(j)])
+                pieces[chunk] = loaded[chunk][1][..., position - j*block:end - j*block]
+
+            values = np.stack([pieces[entry['chunk']][entry['row']] for entry in entries])
+            yield position, values
+
+            position = end
+
+    finally :
+        for data in chunks.values() :
+            data.close()
+
+
+def catalog_read(path, rows, name, start=0, stop=None) : # series name of the entries rows between the samples start and stop, shape (len(rows), ..., stop - start)
+
+    return np.concatenate([values for _, values in catalog_blocks(path, rows, name, start, stop)], axis=-1)
@@ -0,0 +1,362 @@
+import os
+import hashlib
+import importlib.util
+import numpy as np
+import sympy as sy
+
+from sympy.printing.numpy import NumPyPrinter
+from latex2sympy2 import latex2sympy
+
+from PN_tools import orbit_tex, orbit_tex_NLOSO, orbit_tex_hash, PN_param, PN_coefficients, spinning_orbit_2_5PN_et, spinning_orbit_2_5PN_e2, orbital_param_from_coeffs, coefficient_keys
+
+
+# Generated kernels are cached on disk, keyed by a hash of their source expressions ======================================
+
+codegen_version = 1
+kernel_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kernels')
+
+kernel_cache = {}
+
+
+def kernel_source(name, exprs, args) : # source code of a NumPy function name(*args) returning the tuple of the sympy expressions exprs, after common subexpression elimination
+
+    printer = NumPyPrinter({'fully_qualified_modules' : True, 'inline' : True})
+    temps, reduced = sy.cse(list(exprs), symbols=sy.numbered_symbols('_x'), optimizations='basic')
+
+    lines = ['import numpy', '', '', 'def ' + name + '(' + ', '.join(str(a) for a in args) + ') :', '']
+    lines += ['    ' + str(x) + ' = ' + printer.doprint(e) for x, e in temps]
+    lines += ['', '    return (' + ', '.join(printer.doprint(e) for e in reduced) + ',)', '']
+
+    return '\n'.join(lines)
+
+
+def load_kernel(file, name) : # import the function name from the generated file
+
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(file))[0], file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return getattr(module, name)
+
+
+def tex_kernel(name, tex, args, subs=None, build=None, directory=None) : # vectorized kernel name(*args) returning the expressions of the dict tex (output name : LaTeX), built once and cached on disk
+
+    # subs maps symbols of the LaTeX to expressions in args, build(outputs, exprs) can post-process the parsed expressions (e.g. PN truncation)
+    # the key hashes everything the generated source depends on, editing one LaTeX string or subs regenerates the kernel
+
+    directory = kernel_dir if directory is None else directory
+    subs = {} if subs is None else subs
+
+    key_src = repr((codegen_version, sy.__version__, name, sorted(tex.items()), [str(a) for a in args], sorted((str(k), str(v)) for k, v in subs.items()), None if build is None else build.__name__))
+    key = hashlib.sha256(key_src.encode()).hexdigest()[:16]
+
+    if key in kernel_cache :
+        return kernel_cache[key]
+
+    file = os.path.join(directory, name + '_' + key + '.py')
+
+    if not os.path.exists(file) :
+
+        outputs = list(tex)
+        exprs = [latex2sympy(tex[k]).doit().subs(subs) for k in outputs]
+        if build is not None :
+            exprs = build(outputs, exprs)
+
+        source = '# generated by codegen_tools.tex_kernel from the LaTeX of ' + ', '.join(outputs) + ', do not edit\n' + kernel_source(name, exprs, args)
+
+        # written to a temporary file first, concurrent builds then never leave a truncated kernel
+        os.makedirs(directory, exist_ok=True)
+        tmp = file + '.' + str(os.getpid()) + '.tmp'
+        with open(tmp, 'w') as f :
+            f.write(source)
+        os.replace(tmp, file)
+
+    kernel = load_kernel(file, name)
+    kernel.outputs = tuple(tex)
+    kernel_cache[key] = kernel
+
+    return kernel
+
+
+def clear_kernels(directory=None) : # remove the generated kernels from memory and disk
+
+    directory = kernel_dir if directory is None else directory
+
+    kernel_cache.clear()
+    if os.path.isdir(directory) :
+        for file in os.listdir(directory) :
+            if file.endswith('.py') :
+                os.remove(os.path.join(directory, file))
+
+
+# PN truncation ==========================================================================================================
+
+h = sy.Symbol('h') # 1/c
+
+def PN_truncate(expr, switches, order=None) : # expand expr in 1/c and weight the c**-k term by switches[k] (0 above 2.5PN), order forces the switch of expressions without explicit c
+
+    expr = sy.expand(expr.subs(sy.Symbol('c'), 1/h))
+    terms = sy.collect(expr, h, evaluate=False)
+
+    out = 0
+    for power, coeff in terms.items() :
+        k = sy.degree(power, h) if power != 1 else (0 if order is None else order)
+        out += switches.get(k, 0)*coeff
+
+    return out
+
+
+def PN_switches(PN) : # switch of each order in 1/c as used by PN_param
+
+    PN2, PN3, PN4, PN5 = PN_param(PN)
+
+    return {0 : 1, 2 : PN2, 3 : PN3, 4 : PN4, 5 : PN5}
+
+
+# Orbital parameters at 2.5PN with NLO spin-orbit terms ==================================================================
+
+E, L, kds1, kds2, eta, S1, S2, r = sy.symbols('E L kds1 kds2 eta S1 S2 r')
+
+orbital_param_args = (E, L, kds1, kds2, eta, S1, S2, r)
+orbital_param_subs = {sy.Symbol('epsilon') : E, sy.Symbol('S_1') : S1*kds1, sy.Symbol('S_2') : S2*kds2}
+
+# the Kepler and precession expressions carry no explicit c, their order is read from their name
+orbital_param_orders = {'f_4t' : 4, 'f_5t' : 5, 'g_4t' : 4, 'g_5t' : 5, 'f_3L' : 3, 'f_5L' : 5, 'g_3L' : 3, 'g_5L' : 5}
+
+
+def orbital_param_kernel(PN=5, directory=None) : # kernel(E, L, kds1, kds2, eta, S1, S2, r) returning, in the order of kernel.outputs, et2, er2, ar, n, ephi2, f_4t, f_5t, g_4t, g_5t, d2, d3, d4, d5, f_3L, f_5L, g_3L, g_5L
+
+    tex = {}
+    for section in ('orbital', 'Kepler', 'angular', 'precession') :
+        tex.update(orbit_tex_NLOSO[section])
+
+    switches = PN_switches(PN)
+
+    def PN_truncation(outputs, exprs) :
+        return [PN_truncate(e, switches, orbital_param_orders.get(k)) for k, e in zip(outputs, exprs)]
+    PN_truncation.__name__ = 'PN_truncation_' + str(PN)
+
+    return tex_kernel('orbital_param_PN' + str(PN), tex, orbital_param_args, orbital_param_subs, PN_truncation, directory)
+
+
+def compare_orbital_param_kernel(PN=5, n_points=64, seed=0, directory=None) : # relative difference between the generated kernel and spinning_orbit_2_5PN_param_from_E_L on random hyperbolic binaries
+
+    # the hand-written coefficients are the validated ones, a large difference points to a convention change or a typo in the LaTeX source,
+    # every output agrees to rounding (about 1e-13) at all orders
+
+    rng = np.random.default_rng(seed)
+    E_ = rng.uniform(0.05, 1., n_points)
+    L_ = rng.uniform(2., 20., n_points)
+    kds1_, kds2_ = rng.uniform(-1., 1., (2, n_points))
+    eta_ = rng.uniform(0.05, 0.25, n_points)
+    S1_, S2_ = rng.uniform(0., 1., (2, n_points))
+    r_ = rng.uniform(5., 50., n_points)
+
+    kernel = orbital_param_kernel(PN, directory)
+    generated = dict(zip(kernel.outputs, kernel(E_, L_, kds1_, kds2_, eta_, S1_, S2_, r_)))
+
+    C = PN_coefficients(eta_, S1_, S2_, PN)
+
+    # the squared eccentricities are compared directly, their square root can be undefined at truncated orders
+    n0, n1, n2 = C['n']
+    with np.errstate(invalid='ignore') :
+        ar, er, ephi, d2, d3, d4, d5, f_4t, f_5t, g_4t, g_5t = orbital_param_from_coeffs(C, E_, L_, kds1_, kds2_)
+    f3, f5a, f5b, f5c = C['f_L']
+    g3, g5a, g5b, g5c = C['g_L']
+
+    reference = {'n' : E_*np.sqrt(E_)*(n0 + E_*(n1 + E_*n2)), 'et2' : spinning_orbit_2_5PN_et(C, E_, L_, kds1_, kds2_), 'er2' : spinning_orbit_2_5PN_e2(C['er2'], E_, L_, kds1_, kds2_), 'ephi2' : spinning_orbit_2_5PN_e2(C['ephi2'], E_, L_, kds1_, kds2_), 'ar' : ar, 'd2' : d2, 'd3' : d3, 'd4' : d4, 'd5' : d5, 'f_4t' : f_4t, 'f_5t' : f_5t, 'g_4t' : g_4t, 'g_5t' : g_5t,
+                 'f_3L' : f3/r_**3, 'f_5L' : (f5a*L_**2 + f5b*E_*r_**2 + f5c*r_)/r_**5, 'g_3L' : g3/r_**3, 'g_5L' : (g5a*L_**2 + g5b*E_*r_**2 + g5c*r_)/r_**5}
+
+    return {k : np.max(np.abs(generated[k] - reference[k])/np.maximum(np.abs(reference[k]), 1e-300)) for k in kernel.outputs}
+
+
+# Coefficient tables of PN_coefficients =================================================================================
+
+# the tables of PN_coefficients are read off the LaTeX of orbit_tex_NLOSO : every expression, with the PN switches kept as symbols
+# and eta = (1 - s**2)/4 (s = sqrt(1-4eta)), is multiplied by the factor that makes it a polynomial in the variables of its
+# evaluation function (e.g. spinning_orbit_2_5PN_e2), and every entry of a table is the coefficient of one monomial.
+# A term that has no entry in the table, or two monomials of one entry with different coefficients, stop the generation
+
+s, x, w = sy.symbols('s x w', positive=True) # sqrt(1-4eta), n**(1/3) and et**2
+PN2_, PN3_, PN4_, PN5_ = sy.symbols('PN2 PN3 PN4 PN5')
+
+coefficient_args = (eta, s, S1, S2, PN2_, PN3_, PN4_, PN5_)
+
+E_pos, L_pos, r_pos = sy.symbols('E L r', positive=True)
+
+
+def monomial(**powers) : # monomial of the variables E, L, r, x, w, kds1 and kds2
+
+    return sy.Mul(*[sy.Symbol(name, positive=True)**k if name in ('E', 'L', 'r', 'x', 'w') else sy.Symbol(name)**k for name, k in powers.items()])
+
+
+def spin(m) : # the pair of monomials (kds1*m, kds2*m) of an entry (S1 coeff, S2 coeff)
+
+    return (kds1*m, kds2*m)
+
+
+# key : list of (source expression, part, factor, {entry index : monomial or spin pair}, {monomial : fixed coefficient}), the part
+# is 'all', 'spin', 'nonspin' or a PN order, the entries of a key are numbered in the order of its tuple in PN_coefficients
+q = sy.sqrt(w - 1)
+g_t = E_pos**sy.Rational(3, 2)*sy.sqrt(4*L_pos**2*E_pos + 2)
+M = monomial
+
+coefficient_layout = {
+    'E' : [('E', 'all', 1, {0 : M(x=4), 1 : M(x=6)}, {M(x=2) : sy.Rational(1, 2)})],
+    'L' : [('L', 0, x/q, {}, {1 : 1}),
+           ('L', 2, q/x, {0 : 1, 1 : M(w=1)}, {}),
+           ('L', 4, q*(w - 1)/x**3, {2 : 1, 3 : M(w=1), 4 : M(w=2)}, {}),
+           ('L', 3, (w - 1)/x**2, {5 : spin(1)}, {}),
+           ('L', 5, (w - 1)**2/x**4, {6 : spin(M(w=1)), 7 : spin(1)}, {})],
+    'n' : [('n', 'all', E_pos**sy.Rational(-3, 2), {0 : 1, 1 : M(E=1), 2 : M(E=2)}, {})],
+    'et2' : [('et2', 'nonspin', L_pos**2, {0 : M(E=1, L=2), 1 : M(E=2, L=2), 2 : M(E=1), 3 : M(E=2, L=4), 4 : M(E=3, L=4)}, {M(L=2) : 1, M(E=1, L=4) : 2}),
+             ('et2', 3, L_pos, {5 : spin(M(E=1))}, {}),
+             ('et2', 5, 2*L_pos**3*(2*E_pos*L_pos**2 + 1), {6 : spin(M(E=1)), 7 : spin(M(E=3, L=4)), 8 : spin(M(E=2, L=2))}, {})],
+    'ar' : [('ar', 'nonspin', E_pos*L_pos**2, {0 : M(E=1, L=2), 1 : M(E=2, L=2), 2 : M(E=1)}, {M(L=2) : sy.Rational(1, 2)}),
+            ('ar', 'spin', L_pos**3, {3 : spin(M(L=2)), 4 : spin(1), 5 : spin(M(E=1, L=2))}, {})],
+    't' : [('f_4t', 'all', L_pos/E_pos**sy.Rational(3, 2), {0 : 1}, {}),
+           ('f_5t', 'all', L_pos**2/E_pos**sy.Rational(3, 2), {1 : spin(1)}, {}),
+           ('g_4t', 'all', L_pos/g_t, {2 : 1}, {}),
+           ('g_5t', 'all', L_pos**2/g_t, {3 : spin(1)}, {})],
+    'd' : [('d2', 'all', 1/L_pos, {0 : M(E=1), 1 : M(E=2)}, {1 : 1}),
+           ('d3', 'nonspin', 1/L_pos, {2 : 1, 3 : M(E=1)}, {}),
+           ('d3', 'spin', 1, {4 : spin(1), 5 : spin(M(E=1))}, {}),
+           ('d4', 'nonspin', 1/L_pos, {6 : 1}, {}),
+           ('d4', 'spin', 1, {7 : spin(1)}, {}),
+           ('d5', 'nonspin', 1/L_pos**3, {8 : 1}, {}),
+           ('d5', 'spin', 1/L_pos**2, {9 : spin(1)}, {})],
+    'f_L' : [('f_3L', 'all', r_pos**3, {0 : 1}, {}),
+             ('f_5L', 'all', r_pos**5, {1 : M(L=2), 2 : M(E=1, r=2), 3 : M(r=1)}, {})],
+    'g_L' : [('g_3L', 'all', r_pos**3, {0 : 1}, {}),
+             ('g_5L', 'all', r_pos**5, {1 : M(L=2), 2 : M(E=1, r=2), 3 : M(r=1)}, {})],
+}
+
+for c in ('er2', 'ephi2') : # er**2 and ephi**2 share their monomials, the spin entry sC multiplies both 1/L and E*L
+    coefficient_layout[c] = [(c, 'nonspin', L_pos**2, {0 : M(E=1, L=2), 1 : M(E=2, L=2), 2 : M(E=1), 3 : M(E=2, L=4), 4 : M(E=3, L=4)}, {M(L=2) : 1, M(E=1, L=4) : 2}),
+                             (c, 'spin', L_pos**3, {5 : spin(M(E=3, L=4)), 6 : spin(M(E=2, L=2)), 7 : [spin(M(E=1, L=2)), spin(M(E=2, L=4))], 8 : spin(M(E=1))}, {})]
+
+del M
+
+
+def coefficient_sources() : # the expressions of orbit_tex_NLOSO in the variables of coefficient_layout, PN switches as symbols
+
+    switches = {0 : 1, 2 : PN2_, 3 : PN3_, 4 : PN4_, 5 : PN5_}
+
+    variables = {sy.Symbol('epsilon') : E_pos, sy.Symbol('L') : L_pos, sy.Symbol('r') : r_pos, sy.Symbol('S_1') : S1*kds1, sy.Symbol('S_2') : S2*kds2,
+                 sy.Symbol('n') : x**3, sy.Symbol(r'\text{et}') : sy.sqrt(w), sy.Symbol('s_1') : S1, sy.Symbol('s_2') : S2,
+                 sy.Symbol(r'\text{kds1}') : kds1, sy.Symbol(r'\text{kds2}') : kds2}
+
+    sources = {}
+    for section in ('orbital', 'Kepler', 'angular', 'precession', 'iterative') :
+        for name, tex in orbit_tex_NLOSO[section].items() :
+            expr = PN_truncate(latex2sympy(tex).doit(), switches, orbital_param_orders.get(name))
+            sources[name] = sy.expand(expr.subs(variables).subs(eta, (1 - s**2)/4))
+
+    return sources
+
+
+def coefficient_part(expr, part) : # the spin or non-spin terms of expr, or its terms of one PN order
+
+    nonspin = expr.subs({kds1 : 0, kds2 : 0})
+
+    if part == 'all' :
+        return expr
+    if part == 'nonspin' :
+        return nonspin
+    if part == 'spin' :
+        return expr - nonspin
+    if part == 0 :
+        return expr.subs({PN2_ : 0, PN3_ : 0, PN4_ : 0, PN5_ : 0})
+
+    switch = {2 : PN2_, 3 : PN3_, 4 : PN4_, 5 : PN5_}[part]
+    return switch*sy.diff(expr, switch)
+
+
+def coefficient_tables(sources=None) : # the tables of PN_coefficients as sympy expressions of coefficient_args, {key : tuple of entries or (S1, S2) pairs}
+
+    sources = coefficient_sources() if sources is None else sources
+    variables = [sy.Symbol(name, positive=True) for name in ('E', 'L', 'r', 'x', 'w')] + [kds1, kds2]
+
+    # polynomial reduction with s**2 = 1 - 4eta, the entries are then linear in s like the hand-written tables
+    reduce = lambda c : sy.expand(sy.rem(sy.expand(c), s**2 - (1 - 4*eta), s)) if c != 0 else sy.Integer(0)
+
+    tables = {}
+    for key, groups in coefficient_layout.items() :
+
+        entries = {}
+        for source, part, factor, layout, fixed in groups :
+
+            try :
+                poly = sy.Poly(sy.cancel(sy.expand(coefficient_part(sources[source], part)*factor)), *variables)
+            except sy.PolynomialError :
+                raise ValueError(key + ' : ' + source + ' times ' + str(factor) + ' is not a polynomial in ' + str(variables))
+
+            claimed = {}
+            for index, monomials in layout.items() :
+                for m in (monomials if isinstance(monomials, list) else [monomials]) :
+                    pair = m if isinstance(m, tuple) else (m,)
+                    values = tuple(poly.coeff_monomial(mi) for mi in pair)
+                    if index in entries and any(sy.simplify(a - b) != 0 for a, b in zip(entries[index], values)) :
+                        raise ValueError(key + ' : the entry ' + str(index) + ' has different coefficients for ' + str(monomials))
+                    entries[index] = values
+                    claimed.update({sy.Poly(mi, *variables).monoms()[0] : None for mi in pair})
+
+            for m, value in fixed.items() :
+                monom = sy.Poly(m, *variables).monoms()[0]
+                if sy.simplify(poly.coeff_monomial(m) - value) != 0 :
+                    raise ValueError(key + ' : the coefficient of ' + str(m) + ' in ' + source + ' is ' + str(poly.coeff_monomial(m)) + ', not ' + str(value))
+                claimed[monom] = None
+
+            extra = [sy.Mul(*[v**k for v, k in zip(variables, monom)]) for monom, c in poly.terms() if monom not in claimed and sy.simplify(c) != 0]
+            if extra :
+                raise ValueError(key + ' : the terms ' + str(extra) + ' of ' + source + ' have no entry in the table')
+
+        tables[key] = tuple(tuple(reduce(c) for c in entries[i]) if len(entries[i]) == 2 else reduce(entries[i][0]) for i in range(len(entries)))
+
+    return tables
+
+
+generated_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'PN_generated.py')
+
+
+def coefficient_module_source(tables=None) : # source of PN_generated.py, the kernel of PN_coefficients and the shapes of its tables
+
+    tables = coefficient_tables() if tables is None else tables
+
+    exprs = [e for key in coefficient_keys for entry in tables[key] for e in (entry if isinstance(entry, tuple) else (entry,))]
+    shapes = {key : tuple(len(entry) if isinstance(entry, tuple) else 1 for entry in tables[key]) for key in coefficient_keys}
+
+    lines = ['# generated by codegen_tools.write_coefficient_module from the LaTeX of PN_tools.orbit_tex_NLOSO, do not edit', '',
+             '# hash of the LaTeX source, see PN_tools.orbit_tex_hash', 'source_hash = ' + repr(orbit_tex_hash()), '',
+             '# number of values of every entry of the tables, 2 for the (S1 coeff, S2 coeff) pairs of the spin terms', 'coefficient_shapes = ' + repr(shapes), '']
+
+    return '\n'.join(lines) + '\n' + kernel_source('coefficient_kernel', exprs, coefficient_args)
+
+
+def write_coefficient_module(file=generated_file) : # regenerate PN_generated.py after an edit of orbit_tex_NLOSO
+
+    source = coefficient_module_source()
+
+    tmp = file + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp, 'w') as f :
+        f.write(source)
+    os.replace(tmp, file)
+
+    return file
+
+
+# 3PN quasi-Keplerian coordinates ========================================================================================
+
+a_t, u, xi, nu = sy.symbols('a_t u xi nu')
+
+coordinate_args = (u, nu, a_t, xi, eta)
+
+
+def coordinate_kernel(directory=None) : # kernel(u, nu, a_t, xi, eta) returning the radial and angular PN corrections r_N, ..., r_3PN, phi_1PN, ..., phi_3PN
+
+    return tex_kernel('coordinates_3PN', orbit_tex['coord'], coordinate_args, directory=directory)
+
+
+def impact_parameter_kernel(directory=None) : # kernel(a_t, eta) returning c0, c1, c2, c3 of b = c0*xi**(-2/3) + c1 + c2*xi**(2/3) + c3*xi**(4/3)
+
+    return tex_kernel('impact_parameter_3PN', orbit_tex['b'], (a_t, eta), directory=directory)
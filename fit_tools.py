@@ -0,0 +1,212 @@
+import numpy as np
+
+from time import perf_counter
+from scipy.optimize import least_squares
+from scipy.stats import qmc
+
+from PN_tools import spinning_initial_conditions, spinning_orbit_2_5PN_batch, ADM2harmonic, GW_sky_map
+from cache_tools import cache_key, cached_batch
+
+
+# Fitted parameters =====================================================================================================
+
+# binaries of total mass 1 (the waveforms are in units of G m/c^2), eta sets the mass ratio, Theta is the inclination of the observer
+fit_params = ('b', 'et0', 'eta', 'chi1', 'chi2', 'Theta')
+
+# a parameter given as a single value instead of a range is held fixed
+fit_space = {'b' : (30., 100.), 'et0' : (1.1, 1.5), 'eta' : (0.1, 0.25), 'chi1' : (0., 0.9), 'chi2' : (0., 0.9), 'Theta' : (0., np.pi)}
+
+# the orbit is the costly part of a waveform, the parameters which change it
+orbit_params = ('b', 'et0', 'eta', 'chi1', 'chi2')
+
+
+def binary_masses(eta) : # m1, m2 of the binary of total mass 1 and symmetric mass ratio eta, m1 >= m2
+
+    dm = np.sqrt(1 - 4*np.minimum(eta, 0.25))
+
+    return (1 + dm)/2, (1 - dm)/2
+
+
+# Waveform model ========================================================================================================
+
+def fit_model(t, t0=0., Phi=0., theta1=np.pi/3, phi1=0., theta2=np.pi/3, phi2=np.pi/2, PN=5, GW_order=4, radiation_reaction=True) : # waveform model of the fits on the time grid t, as a dict
+
+    # the spin angles are held fixed, spins along k make the orbital angles singular (k = z exactly) and are avoided by the defaults,
+    # the model counts its evaluations in 'stats', the orbits go through the cache of cache_tools (see cache_tools.set_cache)
+
+    return {'t' : np.asarray(t, dtype=float),
+            'settings' : {'t0' : t0, 'Phi' : Phi, 'theta1' : theta1, 'phi1' : phi1, 'theta2' : theta2, 'phi2' : phi2, 'PN' : PN, 'GW_order' : GW_order, 'radiation_reaction' : radiation_reaction},
+            'stats' : {'waveforms' : 0, 'orbits' : 0, 'ensemble_calls' : 0, 'orbit_s' : 0., 'waveform_s' : 0.}}
+
+
+def model_orbits(M, params) : # ADM2harmonic orbits r_harm, dr_harm, n_harm, v_harm and s1, s2 of the parameters (N, len(fit_params))
+
+    # orbits already in the cache are reused, the missing ones are integrated together by spinning_orbit_2_5PN_batch,
+    # one ensemble for the spinning binaries and one for the non-spinning ones (chi1 = chi2 = 0)
+
+    t, s = M['t'], M['settings']
+    p = dict(zip(fit_params, np.asarray(params, dtype=float).T))
+
+    keys = [cache_key('fit_orbit', t, s['t0'], tuple(x), s['theta1'], s['phi1'], s['theta2'], s['phi2'], s['PN'], s['radiation_reaction'])
+            for x in zip(*[p[name] for name in orbit_params])]
+    binaries = dict(zip(keys, zip(*[p[name] for name in orbit_params])))
+
+    def compute(missing) :
+
+        start = perf_counter()
+        orbits = {}
+
+        b, et0, eta, chi1, chi2 = np.array([binaries[key] for key in missing]).T
+        m1, m2 = binary_masses(eta)
+        S1, S2 = m1*chi1/m2, m2*chi2/m1
+        spinning = (chi1 != 0) | (chi2 != 0)
+
+        for spin in (True, False) :
+
+            group = np.flatnonzero(spinning == spin)
+            if len(group) == 0 :
+                continue
+
+            if spin :
+                y0 = [spinning_initial_conditions(b[i], et0[i], eta[i], S1[i], S2[i], s['theta1'], s['phi1'], s['theta2'], s['phi2']) for i in group]
+            else :
+                y0 = [(b[i], et0[i], 0.) for i in group]
+
+            r, phi, n_vec, k, xi_vec, s1, s2, dr, v = spinning_orbit_2_5PN_batch(t, s['t0'], eta[group], S1[group], S2[group], y0, PN=s['PN'], radiation_reaction=s['radiation_reaction'], spinning=spin, verbose=False)
+            M['stats']['ensemble_calls'] += 1
+
+            for j, i in enumerate(group) :
+                spins = (s1[j], s2[j]) if spin else (np.zeros((3, len(t))), np.zeros((3, len(t))))
+                orbits[i] = ADM2harmonic(r[j], dr[j], n_vec[j], v[j], spins[0], spins[1], S1[i], S2[i], eta[i], PN=s['PN']) + spins
+
+        M['stats']['orbits'] += len(missing)
+        M['stats']['orbit_s'] += perf_counter() - start
+
+        return [orbits[i] for i in range(len(missing))]
+
+    return cached_batch(keys, compute)
+
+
+def model_waveforms(M, params) : # h_plus, h_cross of the parameters (N, len(fit_params)), shape (N, len(t))
+
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    s = M['settings']
+
+    orbits = model_orbits(M, params)
+
+    start = perf_counter()
+
+    h_plus = np.zeros((len(params), len(M['t'])))
+    h_cross = np.zeros((len(params), len(M['t'])))
+
+    for i, ((b, et0, eta, chi1, chi2, Theta), (r_harm, dr_harm, n_harm, v_harm, s1, s2)) in enumerate(zip(params, orbits)) :
+        m1, m2 = binary_masses(eta)
+        h = GW_sky_map(np.array([Theta]), np.array([s['Phi']]), n_harm, v_harm, r_harm, dr_harm, s1, s2, m1, m2, chi1, chi2, s['GW_order'])
+        h_plus[i], h_cross[i] = h[0][0], h[1][0]
+
+    M['stats']['waveforms'] += len(params)
+    M['stats']['waveform_s'] += perf_counter() - start
+
+    return h_plus, h_cross
+
+
+# Warm start table ======================================================================================================
+
+def fit_table(M, n_points=256, space=fit_space, seed=0, batch_size=32) : # waveforms of the model on n_points quasi-random (scrambled Sobol) parameters of space, for warm starts
+
+    lower, upper = np.array([np.broadcast_to(space[name], 2) for name in fit_params], dtype=float).T
+
+    unit = qmc.Sobol(len(fit_params), seed=seed).random_base2(int(np.ceil(np.log2(max(n_points, 1)))))[:n_points]
+    params = lower + unit*(upper - lower)
+
+    h_plus = np.zeros((n_points, len(M['t'])))
+    h_cross = np.zeros((n_points, len(M['t'])))
+
+    for start in range(0, n_points, batch_size) :
+        h_plus[start:start + batch_size], h_cross[start:start + batch_size] = model_waveforms(M, params[start:start + batch_size])
+
+    return {'t' : M['t'], 'params' : params, 'h_plus' : h_plus, 'h_cross' : h_cross}
+
+
+def save_fit_table(table, file) :
+
+    np.savez_compressed(file, **table)
+
+
+def load_fit_table(file) :
+
+    with np.load(file) as data :
+        return {name : data[name] for name in ('t', 'params', 'h_plus', 'h_cross')}
+
+
+def warm_start(table, h_plus, h_cross) : # parameters of the table entry nearest to the waveform h_plus, h_cross (least squares distance), and that distance
+
+    if not np.array_equal(np.shape(table['h_plus'])[1:], np.shape(h_plus)) :
+        raise ValueError('the table waveforms have ' + str(np.shape(table['h_plus'])[1]) + ' samples, the fitted one ' + str(np.shape(h_plus)[-1]))
+
+    # the rows are invalid (NaN) for unphysical parameters of the table
+    distance = np.sum((table['h_plus'] - h_plus)**2 + (table['h_cross'] - h_cross)**2, axis=1)
+    nearest = np.nanargmin(distance)
+
+    return table['params'][nearest], np.sqrt(distance[nearest])
+
+
+# Least squares fit =====================================================================================================
+
+def fit_waveform(M, h_plus, h_cross, x0=None, table=None, space=fit_space, diff_step=1e-5, **kwargs) : # least squares fit of the model M to the waveform h_plus, h_cross, returns a report dict
+
+    # x0 (len(fit_params)) is the initial guess, else the nearest entry of table, else the centre of space,
+    # the parameters fixed in space keep their value of x0, kwargs are passed on to scipy.optimize.least_squares
+    # the Jacobian is a forward difference of relative step diff_step, all its columns are one call of model_waveforms, the
+    # orbit of the point itself comes from the cache and the Theta column reuses it. The integration error (about 1e-8)
+    # sets the smallest usable step
+
+    start = perf_counter()
+    stats = dict(M['stats'])
+
+    lower, upper = np.array([np.broadcast_to(space[name], 2) for name in fit_params], dtype=float).T
+    free = upper > lower
+
+    if x0 is not None :
+        x0 = np.array(x0, dtype=float)
+    elif table is not None :
+        x0 = np.array(warm_start(table, h_plus, h_cross)[0])
+    else :
+        x0 = (lower + upper)/2
+    x0[~free] = lower[~free]
+
+    data = np.concatenate([h_plus, h_cross])
+    scale = 1/np.sqrt(np.sum(data**2))
+
+    def full(x) :
+        params = np.array(x0)
+        params[free] = x
+        return params
+
+    def residuals(x) :
+        h = model_waveforms(M, full(x))
+        return (np.concatenate([h[0][0], h[1][0]]) - data)*scale
+
+    def jacobian(x) :
+
+        # steps towards the inside of the bounds
+        h = diff_step*np.maximum(np.abs(x), 1)
+        h = np.where(x + h > upper[free], -h, h)
+
+        params = np.array([full(x)] + [full(x + h[j]*np.eye(len(x))[j]) for j in range(len(x))])
+        h_p, h_c = model_waveforms(M, params)
+
+        r = (np.concatenate([h_p, h_c], axis=1) - data)*scale
+
+        return ((r[1:] - r[0])/h[:, None]).T
+
+    result = least_squares(residuals, x0[free], jac=jacobian, bounds=(lower[free], upper[free]), x_scale='jac', **kwargs)
+
+    params = full(result.x)
+
+    report = {'params' : dict(zip(fit_params, params.tolist())), 'x0' : dict(zip(fit_params, x0.tolist())),
+              'cost' : float(result.cost), 'success' : bool(result.success), 'message' : result.message,
+              'residual_evaluations' : int(result.nfev), 'jacobian_evaluations' : int(result.njev), 'time_s' : perf_counter() - start}
+    report.update({'model_' + name : M['stats'][name] - stats[name] for name in M['stats']})
+
+    return report
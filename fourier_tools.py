@@ -0,0 +1,108 @@
+import numpy as np
+
+from scipy import fft
+from scipy.signal.windows import tukey
+
+
+# Physical units ========================================================================================================
+
+# astropy is only imported by the unit conversions, the spectra themselves need numpy and scipy
+
+def GW_prefactor(m1, m2, R=20.) : # G mu M_sun/(c^2 R), the dimensionless amplitude of h_plus and h_cross, masses in solar masses, R a length (astropy quantity, or a float in Mpc)
+
+    import astropy.units as u
+    import astropy.constants as cst
+
+    R = R if isinstance(R, u.Quantity) else R*u.Mpc
+    mu = m1*m2/(m1 + m2)
+
+    return (cst.G*mu*u.M_sun/(cst.c**2*R)).to(u.dimensionless_unscaled).value
+
+
+def time_unit(m1, m2) : # G m M_sun/c^3 in seconds, the unit of the time grids of PN_tools
+
+    import astropy.units as u
+    import astropy.constants as cst
+
+    return (cst.G*(m1 + m2)*u.M_sun/cst.c**3).to(u.s).value
+
+
+# Windows, cached per length ==============================================================================================
+
+window_cache = {}
+
+
+def taper_window(T, alpha=0.1) : # Tukey window of T samples (alpha is the tapered fraction), cached and read-only
+
+    key = (T, alpha)
+
+    if key not in window_cache :
+        if len(window_cache) >= 64 :
+            del window_cache[next(iter(window_cache))]
+        window = tukey(T, alpha)
+        window.flags.writeable = False
+        window_cache[key] = window
+
+    return window_cache[key]
+
+
+def fft_length(T, pad=2) : # FFT friendly length of at least pad*T samples
+
+    return fft.next_fast_len(int(np.ceil(pad*T)), real=True)
+
+
+# Spectra ===============================================================================================================
+
+def GW_spectrum(h, dt, alpha=0.1, pad=2, scale=1., workers=-1) : # frequencies and Fourier transforms of the waveforms h (..., T) sampled every dt, batched over the leading axes
+
+    # the burst is tapered by a Tukey window, zero padded to fft_length(T, pad) and transformed with one batched rfft,
+    # h_tilde = scale*dt*rfft approximates the continuous Fourier transform, f is in units of 1/dt
+
+    h = np.asarray(h)
+    T = h.shape[-1]
+    n_fft = fft_length(T, pad)
+
+    tapered = h*taper_window(T, alpha)
+    h_tilde = fft.rfft(tapered, n=n_fft, axis=-1, workers=workers)
+    h_tilde *= scale*dt
+
+    return fft.rfftfreq(n_fft, dt), h_tilde
+
+
+def sweep_spectra(path, R=20., alpha=0.1, pad=2, rows=256, workers=-1, partial=False) : # physical spectra of all waveforms of a sweep stored by sweep_tools.run_sweep, read rows waveforms at a time
+
+    # returns f (n_freq) in units of c^3/(G m M_sun), i.e. to be multiplied by f_unit, f_unit (n_points) in Hz per unit of f,
+    # and h_plus, h_cross (n_points, n_freq) in seconds (amplitude prefactor and time unit of every binary applied).
+    # An unfinished sweep raises, unless partial is True : the spectra of the points not run yet are then NaN
+
+    from sweep_tools import load_sweep
+
+    grid, t, store = load_sweep(path)
+    done = store['point_done']
+
+    if not (partial or np.all(done)) :
+        raise ValueError('the sweep stored in ' + path + ' is unfinished (' + str(np.count_nonzero(~done)) + ' of ' + str(len(done)) + ' points not run), resume it with sweep_tools.run_sweep or pass partial=True')
+
+    dt = t[1] - t[0]
+
+    n_fft = fft_length(len(t), pad)
+    f = fft.rfftfreq(n_fft, dt)
+
+    prefactor = GW_prefactor(grid['m1'], grid['m2'], R)
+    unit = time_unit(grid['m1'], grid['m2'])
+
+    h_plus = np.empty((len(grid), len(f)), dtype=complex)
+    h_cross = np.empty((len(grid), len(f)), dtype=complex)
+
+    for start in range(0, len(grid), rows) :
+
+        b = slice(start, min(start + rows, len(grid)))
+        scale = (prefactor[b]*unit[b])[:, None]
+
+        h_plus[b] = GW_spectrum(store['h_plus'][b], dt, alpha, pad, scale, workers)[1]
+        h_cross[b] = GW_spectrum(store['h_cross'][b], dt, alpha, pad, scale, workers)[1]
+
+    h_plus[~done] = np.nan
+    h_cross[~done] = np.nan
+
+    return f, 1/unit, h_plus, h_cross
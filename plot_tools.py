@@ -2,7 +2,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import quad
 from scipy.special import gamma as Gamma
-from tqdm.notebook import tqdm
+from tqdm.auto import tqdm
 
 
 
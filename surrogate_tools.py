@@ -0,0 +1,185 @@
+import json
+import numpy as np
+
+from time import perf_counter
+from scipy.stats import qmc
+from scipy.interpolate import RBFInterpolator
+
+from sweep_tools import sweep_fields, sweep_chunk, run_sweep
+
+
+# Parameter space =======================================================================================================
+
+# binaries of total mass 1 (the waveforms are in units of G m/c^2), eta sets the mass ratio
+surrogate_params = ('b', 'et0', 'eta', 'chi1', 'chi2', 'theta1', 'phi1', 'theta2', 'phi2')
+
+surrogate_space = {'b' : (30., 100.), 'et0' : (1.1, 1.5), 'eta' : (0.1, 0.25), 'chi1' : (0., 0.9), 'chi2' : (0., 0.9),
+                   'theta1' : (0., np.pi), 'phi1' : (0., 2*np.pi), 'theta2' : (0., np.pi), 'phi2' : (0., 2*np.pi)}
+
+
+def sample_space(space, n_points, seed=0) : # n_points quasi-random (scrambled Sobol) parameters of space, returns an array (n_points, len(surrogate_params))
+
+    # a parameter given as a single value instead of a range is held fixed
+
+    ranges = [np.broadcast_to(space[name], 2) for name in surrogate_params]
+    lower, upper = np.array(ranges, dtype=float).T
+
+    # drawn as the next power of 2 to keep the balance of the Sobol sequence, then truncated
+    unit = qmc.Sobol(len(surrogate_params), seed=seed).random_base2(int(np.ceil(np.log2(max(n_points, 1)))))[:n_points]
+
+    return lower + unit*(upper - lower)
+
+
+def params_to_grid(params, PN=5) : # structured sweep grid (see sweep_tools.sweep_grid) of the parameters (n_points, len(surrogate_params))
+
+    params = np.atleast_2d(params)
+    p = dict(zip(surrogate_params, params.T))
+
+    grid = np.zeros(len(params), dtype=[(name, float) for name in sweep_fields])
+    for name in ('b', 'et0', 'chi1', 'chi2', 'theta1', 'phi1', 'theta2', 'phi2') :
+        grid[name] = p[name]
+
+    dm = np.sqrt(1 - 4*np.minimum(p['eta'], 0.25))
+    grid['m1'], grid['m2'] = (1 + dm)/2, (1 - dm)/2
+    grid['PN'] = PN
+
+    return grid
+
+
+def full_model(params, t, t0=0., Theta=np.pi/4, GW_order=4, radiation_reaction=True, PN=5, path=None, max_workers=None) : # h_plus, h_cross (n_points, len(t)) of the full PN model, through a resumable sweep in path if given
+
+    grid = params_to_grid(params, PN)
+
+    if path is None :
+        h_plus, h_cross = sweep_chunk(grid, t, t0, Theta, GW_order, radiation_reaction)[:2]
+    else :
+        store = run_sweep(path, grid, t, t0, Theta, GW_order, radiation_reaction, max_workers=max_workers, progress=None)[2]
+        h_plus, h_cross = np.array(store['h_plus']), np.array(store['h_cross'])
+
+    return h_plus, h_cross
+
+
+# Reduced basis and empirical interpolation =============================================================================
+
+def reduced_basis(waveforms, tol=1e-6) : # orthonormal rows spanning the training waveforms (n_train, D), truncated at singular values below tol*largest
+
+    s, V = np.linalg.svd(waveforms, full_matrices=False)[1:]
+
+    return V[:np.sum(s > tol*s[0])]
+
+
+def eim_nodes(V) : # empirical interpolation nodes of the basis V (k, D), returns the nodes and the interpolant B, h ~ h[nodes] @ B
+
+    nodes = [np.argmax(np.abs(V[0]))]
+
+    for j in range(1, len(V)) :
+        c = np.linalg.solve(V[:j, nodes].T, V[j, nodes])
+        residual = V[j] - c @ V[:j]
+        nodes.append(np.argmax(np.abs(residual)))
+
+    nodes = np.array(nodes)
+
+    return nodes, np.linalg.solve(V[:, nodes], V)
+
+
+# Surrogate =============================================================================================================
+
+def build_surrogate(t, space=surrogate_space, n_train=256, tol=1e-6, t0=0., Theta=np.pi/4, GW_order=4, radiation_reaction=True, PN=5, seed=0, path=None, max_workers=None, smoothing=0.) :
+
+    # waveforms of n_train quasi-random binaries of space (run as a sweep in path if given), compressed on a reduced basis,
+    # the values at the empirical interpolation nodes are fitted as functions of the parameters by radial basis functions
+    # returns the surrogate as a dict, see evaluate_surrogate and save_surrogate
+
+    params = sample_space(space, n_train, seed)
+    h_plus, h_cross = full_model(params, t, t0, Theta, GW_order, radiation_reaction, PN, path, max_workers)
+
+    waveforms = np.concatenate([h_plus, h_cross], axis=1)
+
+    V = reduced_basis(waveforms, tol)
+    nodes, B = eim_nodes(V)
+
+    S = {'t' : np.asarray(t, dtype=float), 'space' : {name : np.broadcast_to(space[name], 2).tolist() for name in surrogate_params},
+         'settings' : {'t0' : t0, 'Theta' : Theta, 'GW_order' : GW_order, 'radiation_reaction' : radiation_reaction, 'PN' : PN, 'tol' : tol, 'smoothing' : smoothing},
+         'params' : params, 'node_values' : waveforms[:, nodes], 'nodes' : nodes, 'B' : B}
+
+    return fit_surrogate(S)
+
+
+def fit_surrogate(S) : # fit the node values of S as functions of the normalized parameters
+
+    lower, upper = np.array([S['space'][name] for name in surrogate_params], dtype=float).T
+    S['shift'], S['width'] = lower, np.where(upper > lower, upper - lower, 1.)
+
+    x = (S['params'] - S['shift'])/S['width']
+    varying = upper > lower # fixed parameters carry no information and would make the fit singular
+
+    S['varying'] = varying
+    S['fit'] = RBFInterpolator(x[:, varying], S['node_values'], kernel='thin_plate_spline', degree=1, smoothing=S['settings']['smoothing'])
+
+    return S
+
+
+def evaluate_surrogate(S, params) : # h_plus, h_cross (..., len(t)) of the surrogate for params (..., len(surrogate_params))
+
+    params = np.asarray(params, dtype=float)
+    x = ((params.reshape(-1, len(surrogate_params)) - S['shift'])/S['width'])[:, S['varying']]
+
+    h = S['fit'](x) @ S['B']
+    h = h.reshape(params.shape[:-1] + (2, len(S['t'])))
+
+    return h[..., 0, :], h[..., 1, :]
+
+
+def save_surrogate(S, file) : # compact npz file of the surrogate, the fit is rebuilt from the node values on loading
+
+    np.savez_compressed(file, t=S['t'], params=S['params'], node_values=S['node_values'], nodes=S['nodes'], B=S['B'],
+                        meta=json.dumps({'space' : S['space'], 'settings' : S['settings']}))
+
+
+def load_surrogate(file) : # surrogate saved by save_surrogate
+
+    with np.load(file) as data :
+        meta = json.loads(str(data['meta']))
+        S = {'t' : data['t'], 'params' : data['params'], 'node_values' : data['node_values'], 'nodes' : data['nodes'], 'B' : data['B'],
+             'space' : meta['space'], 'settings' : meta['settings']}
+
+    return fit_surrogate(S)
+
+
+# Validation ============================================================================================================
+
+def mismatch(h1_plus, h1_cross, h2_plus, h2_cross) : # 1 - overlap of two waveforms with a flat noise, summed over both polarisations, along the last axis
+
+    inner = lambda a_plus, a_cross, b_plus, b_cross : np.sum(a_plus*b_plus + a_cross*b_cross, axis=-1)
+
+    overlap = inner(h1_plus, h1_cross, h2_plus, h2_cross)/np.sqrt(inner(h1_plus, h1_cross, h1_plus, h1_cross)*inner(h2_plus, h2_cross, h2_plus, h2_cross))
+
+    return 1 - overlap
+
+
+def validate_surrogate(S, n_test=64, seed=1, path=None, max_workers=None) : # mismatch report of the surrogate against the full model on n_test new points of its space
+
+    # the test points come from a Sobol sequence with another seed than the training set, no time or phase maximisation is done
+
+    params = sample_space(S['space'], n_test, seed)
+    settings = S['settings']
+
+    start = perf_counter()
+    h_plus, h_cross = full_model(params, S['t'], settings['t0'], settings['Theta'], settings['GW_order'], settings['radiation_reaction'], settings['PN'], path, max_workers)
+    full_time = (perf_counter() - start)/n_test
+
+    evaluate_surrogate(S, params[0])
+    start = perf_counter()
+    for p in params :
+        evaluate_surrogate(S, p)
+    surrogate_time = (perf_counter() - start)/n_test
+
+    s_plus, s_cross = evaluate_surrogate(S, params)
+    mm = mismatch(h_plus, h_cross, s_plus, s_cross)
+    worst = np.argmax(mm)
+
+    return {'n_train' : len(S['params']), 'n_basis' : len(S['nodes']), 'n_test' : n_test,
+            'mismatch_median' : float(np.median(mm)), 'mismatch_90' : float(np.percentile(mm, 90)), 'mismatch_max' : float(mm[worst]),
+            'worst_params' : dict(zip(surrogate_params, params[worst].tolist())),
+            'full_model_s' : full_time, 'surrogate_s' : surrogate_time, 'speedup' : full_time/surrogate_time,
+            'mismatches' : mm}
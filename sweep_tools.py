@@ -0,0 +1,311 @@
+import os
+import sys
+import json
+import numpy as np
+
+from time import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from scipy.interpolate import CubicSpline
+
+from PN_tools import dot, spinning_initial_conditions, spinning_orbit_2_5PN, ADM2harmonic, GW_emission_from_orbit
+
+
+# Parameter grids =======================================================================================================
+
+sweep_fields = ('b', 'et0', 'm1', 'm2', 'chi1', 'chi2', 'theta1', 'phi1', 'theta2', 'phi2', 'PN')
+
+
+def sweep_grid(b, et0, m1, m2, chi1=0., chi2=0., theta1=0., phi1=0., theta2=0., phi2=0., PN=5) : # cartesian product of the parameters, returns a structured array of shape (n_points)
+
+    axes = [np.atleast_1d(np.asarray(x, dtype=float)) for x in (b, et0, m1, m2, chi1, chi2, theta1, phi1, theta2, phi2, PN)]
+    mesh = np.meshgrid(*axes, indexing='ij')
+
+    grid = np.zeros(mesh[0].size, dtype=[(name, float) for name in sweep_fields])
+    for name, x in zip(sweep_fields, mesh) :
+        grid[name] = x.ravel()
+
+    return grid
+
+
+# Single point and chunk of a sweep ======================================================================================
+
+def sweep_point(p, t, t0=0., Theta=np.pi/4, GW_order=4, radiation_reaction=True, profile=None) : # waveform of one grid point p, returns h_plus, h_cross and the maximal velocity v/c, profile as in spinning_orbit_2_5PN
+
+    m1, m2, chi1, chi2 = p['m1'], p['m2'], p['chi1'], p['chi2']
+    PN = int(p['PN'])
+
+    eta = m1*m2/(m1 + m2)**2
+    S1, S2 = m1*chi1/m2, m2*chi2/m1
+
+    spinning = chi1 != 0 or chi2 != 0
+
+    if spinning :
+        y0 = spinning_initial_conditions(p['b'], p['et0'], eta, S1, S2, p['theta1'], p['phi1'], p['theta2'], p['phi2'])
+    else :
+        y0 = p['b'], p['et0'], 0.
+
+    r, phi, n_vec, k, xi_vec, s1, s2, dr, v = spinning_orbit_2_5PN(t, t0, eta, S1, S2, y0, PN=PN, spinning=spinning, radiation_reaction=radiation_reaction, verbose=False, profile=profile)
+    r_harm, dr_harm, n_harm, v_harm = ADM2harmonic(r, dr, n_vec, v, s1, s2, S1, S2, eta, PN=PN)
+    h_plus, h_cross = GW_emission_from_orbit(Theta, None, t, n_harm, v_harm, r_harm, dr_harm, s1, s2, m1, m2, chi1, chi2, GW_order=GW_order)
+
+    return h_plus, h_cross, np.sqrt(np.max(dot(v, v)))
+
+
+def sweep_chunk(points, t, t0=0., Theta=np.pi/4, GW_order=4, radiation_reaction=True, profile=False) : # run sweep_point on every point of a chunk, executed by the pool workers
+
+    # with profile, the orbit profile of every point (see profile_row) is returned as a fourth output
+
+    h_plus = np.zeros((len(points), len(t)))
+    h_cross = np.zeros((len(points), len(t)))
+    v_max = np.zeros(len(points))
+    profiles = np.zeros(len(points), dtype=profile_dtype)
+
+    for i, p in enumerate(points) :
+        report = {} if profile else None
+        h_plus[i], h_cross[i], v_max[i] = sweep_point(p, t, t0, Theta, GW_order, radiation_reaction, report)
+        if profile :
+            profiles[i] = profile_row(report)
+
+    return (h_plus, h_cross, v_max, profiles) if profile else (h_plus, h_cross, v_max)
+
+
+# Orbit profiles of a sweep =============================================================================================
+
+# one row per grid point, to locate the costly or stiff corners of the parameter space, e.g. grid[np.argsort(store['profile']['rhs_calls'])]
+profile_fields = ('total', 'integration', 'orbit_from_state', 'rhs_calls', 'kepler_calls', 'steps', 'method_switches', 'stiff_fraction', 'peak_rss_bytes')
+profile_dtype = [(name, float) for name in profile_fields]
+
+
+def profile_row(report) : # row of profile_dtype from the report of spinning_orbit_2_5PN
+
+    values = dict(report['stages'], **report['solver'])
+    values.update({key : report[key] for key in ('total', 'rhs_calls', 'kepler_calls', 'peak_rss_bytes')})
+
+    return tuple(values.get(name, np.nan) for name in profile_fields)
+
+
+# Memory-mapped result store ============================================================================================
+
+def open_sweep_store(path, grid, t, chunk_size, profile=False, settings=None) : # create the result store of a sweep in the directory path, or reopen it if it already holds the same sweep
+
+    # settings (a dict of JSON values, e.g. those of sweep_settings) are the other inputs of the waveforms, a store is only reopened with the same ones
+
+    n_chunks = -(-len(grid)//chunk_size)
+    meta_file = os.path.join(path, 'meta.json')
+
+    if os.path.exists(meta_file) :
+
+        with open(meta_file) as f :
+            meta = json.load(f)
+
+        if meta['n_points'] != len(grid) or meta['chunk_size'] != chunk_size or meta['n_t'] != len(t) :
+            raise ValueError('the sweep stored in ' + path + ' does not match the requested one (' + str(meta) + ')')
+        if meta.get('settings') != settings :
+            raise ValueError('the sweep stored in ' + path + ' was run with the settings ' + str(meta.get('settings')) + ', not ' + str(settings))
+        if not (np.array_equal(np.load(os.path.join(path, 'grid.npy')), grid) and np.array_equal(np.load(os.path.join(path, 't.npy')), t)) :
+            raise ValueError('the sweep stored in ' + path + ' was run on another parameter grid or time grid')
+
+        mode = 'r+'
+
+    else :
+
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'grid.npy'), grid)
+        np.save(os.path.join(path, 't.npy'), t)
+
+        mode = 'w+'
+
+    store = {
+        'h_plus' : np.lib.format.open_memmap(os.path.join(path, 'h_plus.npy'), mode=mode, dtype=float, shape=(len(grid), len(t))),
+        'h_cross' : np.lib.format.open_memmap(os.path.join(path, 'h_cross.npy'), mode=mode, dtype=float, shape=(len(grid), len(t))),
+        'v_max' : np.lib.format.open_memmap(os.path.join(path, 'v_max.npy'), mode=mode, dtype=float, shape=(len(grid),)),
+        'done' : np.lib.format.open_memmap(os.path.join(path, 'done.npy'), mode=mode, dtype=bool, shape=(n_chunks,)),
+    }
+
+    if profile : # also added to an existing store, the points run before are then left at zero
+        profile_file = os.path.join(path, 'profile.npy')
+        store['profile'] = np.lib.format.open_memmap(profile_file, mode='r+' if os.path.exists(profile_file) else 'w+', dtype=profile_dtype, shape=(len(grid),))
+
+    if mode == 'w+' :
+        # the metadata is written last, an interrupted creation is then simply restarted
+        with open(meta_file, 'w') as f :
+            json.dump({'n_points' : len(grid), 'n_t' : len(t), 'chunk_size' : chunk_size, 'settings' : settings}, f)
+
+    return store
+
+
+def sweep_settings(t0, Theta, GW_order, radiation_reaction) : # the arguments of sweep_point shared by all the points of a sweep, as stored in meta.json
+
+    return {'t0' : float(t0), 'Theta' : float(Theta), 'GW_order' : int(GW_order), 'radiation_reaction' : bool(radiation_reaction)}
+
+
+def load_sweep(path) : # read-only memory maps of a sweep, returns the grid, the time grid and the store
+
+    # store['point_done'] flags the points whose chunk is finished, the rows of the other points are zeros or partial writes
+
+    grid = np.load(os.path.join(path, 'grid.npy'))
+    t = np.load(os.path.join(path, 't.npy'))
+
+    store = {name : np.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name in ('h_plus', 'h_cross', 'v_max', 'done', 'profile')
+             if os.path.exists(os.path.join(path, name + '.npy'))}
+
+    with open(os.path.join(path, 'meta.json')) as f :
+        store['point_done'] = np.repeat(np.asarray(store['done']), json.load(f)['chunk_size'])[:len(grid)]
+
+    return grid, t, store
+
+
+# Progress report =======================================================================================================
+
+def format_duration(seconds) : # h:mm:ss
+
+    seconds = int(round(seconds))
+
+    return '%d:%02d:%02d' % (seconds//3600, seconds//60 % 60, seconds % 60)
+
+
+def print_progress(done, total, elapsed, remaining) : # default progress callback, one line on stderr per finished chunk, works without Jupyter
+
+    eta = '?' if remaining is None else format_duration(remaining)
+    print('%d/%d points (%.1f%%), elapsed %s, ETA %s' % (done, total, 100*done/total, format_duration(elapsed), eta), file=sys.stderr, flush=True)
+
+
+# Sweep driver ==========================================================================================================
+
+def run_sweep(path, grid, t, t0=0., Theta=np.pi/4, GW_order=4, radiation_reaction=True, chunk_size=16, max_workers=None, progress=print_progress, profile=False) : # run the sweep on a process pool, resuming from the chunks already stored in path
+
+    # progress(done, total, elapsed, remaining) is called after every chunk, remaining is the ETA in seconds
+    # max_workers=0 runs the chunks in the current process
+    # profile stores the orbit profile of every point in store['profile'] (see profile_fields)
+
+    store = open_sweep_store(path, grid, t, chunk_size, profile, sweep_settings(t0, Theta, GW_order, radiation_reaction))
+
+    todo = [i for i in range(len(store['done'])) if not store['done'][i]]
+    chunk = lambda i : slice(i*chunk_size, min((i + 1)*chunk_size, len(grid)))
+
+    total = len(grid)
+    done = total - sum(chunk(i).stop - chunk(i).start for i in todo)
+    done_at_start = done
+    start = time()
+
+    def store_chunk(i, result) :
+
+        nonlocal done
+
+        names = ('h_plus', 'h_cross', 'v_max', 'profile')[:len(result)]
+        for name, values in zip(names, result) :
+            store[name][chunk(i)] = values
+            store[name].flush()
+
+        # a chunk is flagged as done only once its results are on disk
+        store['done'][i] = True
+        store['done'].flush()
+
+        done += chunk(i).stop - chunk(i).start
+
+        if progress is not None :
+            elapsed = time() - start
+            remaining = elapsed/(done - done_at_start)*(total - done)
+            progress(done, total, elapsed, remaining)
+
+    if progress is not None :
+        progress(done, total, 0., None)
+
+    args = (t, t0, Theta, GW_order, radiation_reaction, profile)
+
+    if max_workers == 0 :
+
+        for i in todo :
+            store_chunk(i, sweep_chunk(grid[chunk(i)], *args))
+
+    else :
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool :
+
+            futures = {pool.submit(sweep_chunk, grid[chunk(i)], *args) : i for i in todo}
+
+            try :
+                for future in as_completed(futures) :
+                    store_chunk(futures[future], future.result())
+            except BaseException :
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    return load_sweep(path)
+
+
+# Mass-scale invariance =================================================================================================
+
+# in the units G m/c^3 of the time grids, an orbit and its waveform depend on the masses only through m1/m and m2/m, the total
+# mass m only scales the physical time (fourier_tools.time_unit) and amplitude (fourier_tools.GW_prefactor). Grid points with
+# the same invariants share one orbit, non-spinning binaries only depend on eta (the waveform uses |m1 - m2|)
+
+invariant_fields = ('b', 'et0', 'X1', 'X2', 'chi1', 'chi2', 'theta1', 'phi1', 'theta2', 'phi2', 'PN')
+
+
+def sweep_invariants(grid, decimals=12) : # dimensionless invariants of the grid points, array (n_points, len(invariant_fields)) rounded to decimals
+
+    X1 = grid['m1']/(grid['m1'] + grid['m2'])
+    X2 = grid['m2']/(grid['m1'] + grid['m2'])
+    spinning = (grid['chi1'] != 0) | (grid['chi2'] != 0)
+
+    columns = {name : grid[name] for name in invariant_fields if name in sweep_fields}
+    columns['X1'], columns['X2'] = np.where(spinning, X1, np.maximum(X1, X2)), np.where(spinning, X2, np.minimum(X1, X2))
+    invariants = np.column_stack([columns[name] for name in invariant_fields])
+
+    # the spin angles are not used by the non-spinning binaries
+    invariants[~spinning, invariant_fields.index('theta1'):invariant_fields.index('PN')] = 0
+
+    return np.round(invariants, decimals)
+
+
+def plan_sweep(grid, decimals=12) : # the distinct orbits of the grid, returns a grid of binaries of total mass 1 and the index of the orbit of every grid point
+
+    # decimals sets the tolerance under which two grid points share an orbit, the default only merges rounding errors
+
+    invariants, first, members = np.unique(sweep_invariants(grid, decimals), axis=0, return_index=True, return_inverse=True)
+
+    orbits = np.array(grid[first])
+    orbits['m1'], orbits['m2'] = invariants[:, 2], invariants[:, 3]
+
+    return orbits, members.ravel()
+
+
+def run_planned_sweep(grid, t, t0=0., Theta=np.pi/4, GW_order=4, radiation_reaction=True, R=20., t_phys=None, path=None, chunk_size=16, max_workers=None, progress=print_progress) : # physical waveforms of the grid from one orbit per set of invariants
+
+    # the distinct orbits (see plan_sweep) are run on the dimensionless grid t, by run_sweep in path if given (resumable, on a
+    # process pool), else in the current process, then every grid point is rescaled, masses in solar masses and R in Mpc :
+    #   t_phys None  h_plus, h_cross (n_points, len(t)) on the dimensionless grid t, i.e. on t*unit seconds for every point
+    #   t_phys       h_plus, h_cross (n_points, len(t_phys)) resampled by cubic splines on the common times t_phys in seconds,
+    #                zero outside of the integrated window of each point
+    # returns h_plus, h_cross, v_max (n_points), unit (n_points, seconds per unit of t) and the plan {'orbits', 'members'}
+
+    from fourier_tools import GW_prefactor, time_unit
+
+    orbits, members = plan_sweep(grid)
+
+    if path is None :
+        h_plus, h_cross, v_max = sweep_chunk(orbits, t, t0, Theta, GW_order, radiation_reaction)
+    else :
+        store = run_sweep(path, orbits, t, t0, Theta, GW_order, radiation_reaction, chunk_size, max_workers, progress)[2]
+        h_plus, h_cross, v_max = store['h_plus'], store['h_cross'], store['v_max']
+
+    prefactor = GW_prefactor(grid['m1'], grid['m2'], R)
+    unit = time_unit(grid['m1'], grid['m2'])
+
+    if t_phys is None :
+        return prefactor[:, None]*h_plus[members], prefactor[:, None]*h_cross[members], v_max[members], unit, {'orbits' : orbits, 'members' : members}
+
+    h_plus_phys = np.zeros((len(grid), len(t_phys)))
+    h_cross_phys = np.zeros((len(grid), len(t_phys)))
+
+    for i in range(len(orbits)) :
+
+        # one spline per orbit for both polarisations, evaluated on the dimensionless times of all its members
+        spline = CubicSpline(t, np.stack([h_plus[i], h_cross[i]]), axis=-1, extrapolate=False)
+
+        for j in np.flatnonzero(members == i) :
+            h = np.nan_to_num(spline(t_phys/unit[j]))
+            h_plus_phys[j], h_cross_phys[j] = prefactor[j]*h[0], prefactor[j]*h[1]
+
+    return h_plus_phys, h_cross_phys, v_max[members], unit, {'orbits' : orbits, 'members' : members}
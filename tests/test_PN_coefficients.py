@@ -0,0 +1,214 @@
+import numpy as np
+import pytest
+
+from PN_tools import PN_param, PN_coefficients, spinning_orbit_2_5PN_param, spinning_orbit_2_5PN_param_from_E_L
+
+
+# Reference expressions =================================================================================================
+
+# the orbital parameters as written out before PN_coefficients, kept verbatim as the reference of the coefficient tables
+
+def reference_param(n, et, kds1, kds2, eta, S1, S2, PN=5) :
+
+    PN2, PN3, PN4, PN5 = PN_param(PN)
+    c = 1
+
+    E =  n**(2/3)/2 - PN4*n**2*(eta**2 + 15*eta - 15)/(48*c**4) + PN2*(n**(4/3)*(eta - 15))/((24*c**2))
+    L =  (kds1*n*S1*(-et**2*(n**(1/3)*(2*eta**2 - 1*64*np.sqrt(-1*4*eta + 1)*eta - 1*169*eta + 168) + 3*np.sqrt(n**(2/3)*(-1*4*eta + 1))*(11*eta + 56)) + (n**(1/3)*(-1*94*eta**2 + 38*eta*np.sqrt(-1*4*eta + 1) + 443*eta - 1*42*np.sqrt(-1*4*eta + 1) - 312) + 135*np.sqrt(n**(2/3)*(-1*4*eta + 1))*(eta - 2))*(et**2)**2 + 6*(eta + 9)*(-n**(1/3)*np.sqrt(-1*4*eta + 1) + np.sqrt(n**(2/3)*(-1*4*eta + 1)))) - kds2*n*S2*(et**2*n**(1/3)*(2*eta**2 + eta*(64*np.sqrt(-1*4*eta + 1) - 169) + 168) - 1*3*et**2*(11*eta + 56)*np.sqrt(n**(2/3)*(-1*4*eta + 1)) + (n**(1/3)*(94*eta**2 + 38*eta*np.sqrt(-1*4*eta + 1) - 1*443*eta - 1*42*np.sqrt(-1*4*eta + 1) + 312) + 135*np.sqrt(n**(2/3)*(-1*4*eta + 1))*(eta - 2))*(et**2)**2 + 6*(eta + 9)*(-n**(1/3)*np.sqrt(-1*4*eta + 1) + np.sqrt(n**(2/3)*(-1*4*eta + 1)))))/((48*et**2*c**5*(et**2 - 1)**2))*PN5 + (n*(-1*2*et**2*(9*eta**2 - 1*26*eta + 6) + (5*eta**2 - 1*73*eta + 33)*(et**2)**2 + eta**2 - 1*21*eta + 69))/((24*c**4*(et**2 - 1)**(3/2)))*PN4 + (n**(2/3)*(kds1*S1*(eta - 1*2*(np.sqrt(-1*4*eta + 1) + 1)) + kds2*S2*(eta + 2*np.sqrt(-1*4*eta + 1) - 2)))/((2*c**3*(et**2 - 1)))*PN3 + (n**(1/3)*(et**2*(5*eta - 9) + eta + 3))/((6*c**2*np.sqrt(et**2 - 1)))*PN2 + np.sqrt(et**2 - 1)/(n**(1/3))
+
+
+    # orbital param
+    er2 =  (2*L**2*E + 1) + 1*((L*S1)*kds1*E*(L**4*E**2*(-1*6*eta**2 + eta*(19*np.sqrt(-1*4*eta + 1) + 49) - 1*80*(np.sqrt(-1*4*eta + 1) + 1)) + 2*L**2*E*(5*eta**2 - 1*8*np.sqrt(-1*4*eta + 1)*eta - 1*35*eta + 2*np.sqrt(-1*4*eta + 1) + 2) + 8*eta**2 - 1*6*(3*np.sqrt(-1*4*eta + 1) + 13)*eta + 64*(np.sqrt(-1*4*eta + 1) + 1))/(L**4) + (L*S2)*kds2*E*(L**4*E**2*(-1*6*eta**2 + eta*(-1*19*np.sqrt(-1*4*eta + 1) + 49) + 80*(np.sqrt(-1*4*eta + 1) - 1)) + 2*L**2*E*(5*eta**2 + eta*(8*np.sqrt(-1*4*eta + 1) - 35) - 1*2*np.sqrt(-1*4*eta + 1) + 2) + 8*eta**2 + 18*eta*np.sqrt(-1*4*eta + 1) - 1*78*eta - 1*64*np.sqrt(-1*4*eta + 1) + 64)/(L**4))/c**5*PN5 + 1*(4*L**2*E**3*eta**2 - 1*55*E**3*eta*L**2 + 80*L**2*E**3 + E**2*eta**2 + E**2*eta + 26*E**2 - 34*E/(L**2) + (22*E*eta)/(L**2))/c**4*PN4 + 1*((L*S1)*kds1*(-1*4*E**2*eta + 8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) + (8*E*np.sqrt(-1*4*eta + 1))/(L**2)) + (L*S2)*kds2*(-1*4*E**2*eta - 1*8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) - 8*E*np.sqrt(-1*4*eta + 1)/(L**2)))/c**3*PN3 + 1*(5*L**2*E**2*eta - 1*15*E**2*L**2 + 2*E*eta - 1*12*E)/c**2*PN2
+    ar =  1*((L*S1)*kds1*(L**2*E*(-1*6*eta**2 + eta*(5*np.sqrt(-1*4*eta + 1) + 19) - 1*8*(np.sqrt(-1*4*eta + 1) + 1)) - 1*8*eta**2 + 6*eta*(3*np.sqrt(-1*4*eta + 1) + 13) - 1*64*(np.sqrt(-1*4*eta + 1) + 1)) - (L*S2)*kds2*(L**2*E*(6*eta**2 + eta*(5*np.sqrt(-1*4*eta + 1) - 19) - 1*8*np.sqrt(-1*4*eta + 1) + 8) + 8*eta**2 + 18*eta*np.sqrt(-1*4*eta + 1) - 1*78*eta - 1*64*np.sqrt(-1*4*eta + 1) + 64))/(8*L**4*c**5)*PN5 + 1*(L**2*E*(eta**2 + 10*eta + 1) - 1*22*eta + 34)/(8*L**2*c**4)*PN4 + 1*((L*S1)*kds1*(eta - 1*2*np.sqrt(-1*4*eta + 1) - 2) + (L*S2)*kds2*(eta + 2*np.sqrt(-1*4*eta + 1) - 2))/(2*L**2*c**3)*PN3 + 1/(2*E) + (7 - eta)/((4*c**2))*PN2
+    ephi2 =  (2*L**2*E + 1) + 1*((L*S1)*kds1*(E**3*eta*np.sqrt(-1*4*eta + 1) + 31*E**3*eta - 1*80*E**3*np.sqrt(-1*4*eta + 1) - 1*80*E**3 - 213*E*eta/(2*L**4) + (3*E*eta**2)/((2*L**4)) - 33*E*eta*np.sqrt(-1*4*eta + 1)/(2*L**4) + (96*E)/(L**4) + (96*E*np.sqrt(-1*4*eta + 1))/(L**4) + (68*E**2)/(L**2) - 144*E**2*eta/(L**2) + (4*E**2*eta**2)/(L**2) + (68*E**2*np.sqrt(-1*4*eta + 1))/(L**2) - 30*E**2*eta*np.sqrt(-1*4*eta + 1)/(L**2)) + (L*S2)*kds2*(E**3*(-1)*np.sqrt(-1*4*eta + 1)*eta + 31*E**3*eta + 80*E**3*np.sqrt(-1*4*eta + 1) - 1*80*E**3 - 213*E*eta/(2*L**4) + (3*E*eta**2)/((2*L**4)) + (33*E*eta*np.sqrt(-1*4*eta + 1))/((2*L**4)) + (96*E)/(L**4) - 96*E*np.sqrt(-1*4*eta + 1)/(L**4) + (68*E**2)/(L**2) - 144*E**2*eta/(L**2) + (4*E**2*eta**2)/(L**2) - 68*E**2*np.sqrt(-1*4*eta + 1)/(L**2) + (30*E**2*eta*np.sqrt(-1*4*eta + 1))/(L**2)))/c**5*PN5 + 1*(3*E**3*eta**2*L**2/2 - 1*15*E**3*eta*L**2 + 80*L**2*E**3 + 44*E**2*eta - 1*8*E**2 + (9*E**2*eta**2)/2 + (15*E*eta**2)/((8*L**2)) - 51*E/(L**2) + (29*E*eta)/(L**2))/c**4*PN4 + 1*((L*S1)*kds1*(-1*4*E**2*eta + 8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) + (8*E*np.sqrt(-1*4*eta + 1))/(L**2)) + (L*S2)*kds2*(-1*4*E**2*eta - 1*8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) - 8*E*np.sqrt(-1*4*eta + 1)/(L**2)))/c**3*PN3 + 1*(L**2*E**2*eta - 1*15*E**2*L**2 - 1*12*E)/c**2*PN2
+    
+    # Kepler's equation:
+    f_4t =  PN4*(3*np.sqrt(2)*E**(3/2)*(-1*2*eta + 5))/L
+    f_5t =  PN5*E**(3/2)*((L*S1)*kds1*(-1*14*eta**2 + eta*(35*np.sqrt(-1*4*eta + 1) + 73) - 1*48*(np.sqrt(-1*4*eta + 1) + 1)) + (L*S2)*kds2*(-1*14*eta**2 + eta*(-1*35*np.sqrt(-1*4*eta + 1) + 73) + 48*(np.sqrt(-1*4*eta + 1) - 1)))/((2*np.sqrt(2)*L**3))
+    g_4t =  -E**(3/2)*PN4*eta*(eta + 4)*np.sqrt(4*L**2*E + 2)/(4*L)
+    g_5t =  PN5*E**(3/2)*np.sqrt(4*L**2*E + 2)*((L*S1)*kds1*(-1*3*eta**2 + eta*(9*np.sqrt(-1*4*eta + 1) + 11) - 1*4*(np.sqrt(-1*4*eta + 1) + 1)) + (L*S2)*kds2*(-1*3*eta**2 - 1*9*np.sqrt(-1*4*eta + 1)*eta + 11*eta + 4*np.sqrt(-1*4*eta + 1) - 4))/((2*L**3))
+
+    # angular equation
+    d2 =  L + 1*(3*L*E**2*eta**2 - 1*9*E**2*eta*L/2 + L*E**2)/c**4*PN4 + 1*(3*L*E*eta - L*E)/c**2*PN2
+    d3 =  (E*eta)*((L*S1)*kds1*(-1*18*eta + 31*np.sqrt(-1*4*eta + 1) + 21) + (L*S2)*kds2*(-1*18*eta - 1*31*np.sqrt(-1*4*eta + 1) + 21))/((8*L*c**5))*PN5 + 1*((L*S1)*kds1*(-eta + 2*np.sqrt(-1*4*eta + 1) + 2) + (L*S2)*kds2*(-eta - 2*np.sqrt(-1*4*eta + 1) + 2))/(2*L*c**3)*PN3 + 1*(8*L*E*eta**2 - 1*22*E*eta*L + 4*L*E)/c**4*PN4 + 1*(2*L*eta - 1*4*L)/c**2*PN2
+    d4 =  1*((L*S1)*kds1*(-1*18*eta**2 + 23*eta*np.sqrt(-1*4*eta + 1) + 21*eta - 1*24*np.sqrt(-1*4*eta + 1) - 24) + (L*S2)*kds2*(-1*18*eta**2 - 1*23*np.sqrt(-1*4*eta + 1)*eta + 21*eta + 24*np.sqrt(-1*4*eta + 1) - 24))/(8*L*c**5)*PN5 + 1*(5*L*eta**2 - 1*11*eta*L + (17*L)/2)/c**4*PN4
+    d5 =  1*((L*S1)*kds1*(-1*15*np.sqrt(-1*4*eta + 1)*eta*L/4 + L*np.sqrt(-1*4*eta + 1) + L - 1*17*L*eta/4 + (9*L*eta**2)/4) + (L*S2)*kds2*(15*np.sqrt(-1*4*eta + 1)*eta*L/4 - L*np.sqrt(-1*4*eta + 1) + L - 1*17*L*eta/4 + (9*L*eta**2)/4))/c**5*PN5 + 1*(-L**3*eta**2 + (L**3*eta)/2)/c**4*PN4
+
+    return E, L, ar, np.sqrt(er2), np.sqrt(ephi2), d2, d3, d4, d5, f_4t, f_5t, g_4t, g_5t
+
+
+def reference_param_from_E_L(E, L, kds1, kds2, eta, S1, S2, PN=5) :
+
+    PN2, PN3, PN4, PN5 = PN_param(PN)
+    PN0 = 1
+    c = 1
+    
+    # orbital param
+    n = PN0*(2*E)**(3/2) - PN2*E**(5/2)*(eta - 15)/np.sqrt(2) + PN4*E**(7/2)*(11*eta**2 + 30*eta + 555)/(8*np.sqrt(2))
+    et2 = PN0*(2*L**2*E + 1) + 1*(16*L**4*E**3*eta**2 - 1*47*E**3*eta*L**4 + 112*L**4*E**3 + 10*L**2*E**2*eta**2 + 2*L**2*E**2*eta + 4*L**2*E**2 + 11*E*eta - 1*17*E)/(L**2*c**4)*PN4 + 2*E*((L*S1)*kds1*(-eta + 2*np.sqrt(-1*4*eta + 1) + 2) - (L*S2)*kds2*(eta + 2*np.sqrt(-1*4*eta + 1) - 2))/(L**2*c**3)*PN3 + 1*1*((L*S1)*kds1*(2*L**4*E**3*(32*eta**2 - 1*14*np.sqrt(-1*4*eta + 1)*eta - 1*159*eta + 34*np.sqrt(-1*4*eta + 1) + 124) - 1*90*E**(5/2)*(eta - 2)*L**4*np.sqrt(-1*4*E*eta + E) + L**2*E**2*(48*eta**2 - 1*16*np.sqrt(-1*4*eta + 1)*eta - 1*315*eta + 16*np.sqrt(-1*4*eta + 1) + 252) + L**2*E**(3/2)*(-1*79*eta + 236)*np.sqrt(-1*4*E*eta + E) + 2*np.sqrt(E)*(-1*9*eta + 32)*np.sqrt(-1*4*E*eta + E) + E*(8*eta**2 - 1*78*eta + 64)) + (L*S2)*kds2*(2*L**4*E**3*(32*eta**2 + eta*(14*np.sqrt(-1*4*eta + 1) - 159) - 1*34*np.sqrt(-1*4*eta + 1) + 124) + 90*L**4*E**(5/2)*(eta - 2)*np.sqrt(-1*4*E*eta + E) + L**2*E**2*(48*eta**2 + eta*(16*np.sqrt(-1*4*eta + 1) - 315) - 1*16*np.sqrt(-1*4*eta + 1) + 252) + L**2*E**(3/2)*(79*eta - 236)*np.sqrt(-1*4*E*eta + E) + 2*np.sqrt(E)*(9*eta - 32)*np.sqrt(-1*4*E*eta + E) + E*(8*eta**2 - 1*78*eta + 64)))/(c**5*(2*(2*L**6*E + L**4)))*PN5 + 1*(-1*7*E**2*eta*L**2 + 17*L**2*E**2 - 1*4*E*eta + 4*E)/c**2*PN2
+    er2 =  PN0*(2*L**2*E + 1) + 1*((L*S1)*kds1*E*(L**4*E**2*(-1*6*eta**2 + eta*(19*np.sqrt(-1*4*eta + 1) + 49) - 1*80*(np.sqrt(-1*4*eta + 1) + 1)) + 2*L**2*E*(5*eta**2 - 1*8*np.sqrt(-1*4*eta + 1)*eta - 1*35*eta + 2*np.sqrt(-1*4*eta + 1) + 2) + 8*eta**2 - 1*6*(3*np.sqrt(-1*4*eta + 1) + 13)*eta + 64*(np.sqrt(-1*4*eta + 1) + 1))/(L**4) + (L*S2)*kds2*E*(L**4*E**2*(-1*6*eta**2 + eta*(-1*19*np.sqrt(-1*4*eta + 1) + 49) + 80*(np.sqrt(-1*4*eta + 1) - 1)) + 2*L**2*E*(5*eta**2 + eta*(8*np.sqrt(-1*4*eta + 1) - 35) - 1*2*np.sqrt(-1*4*eta + 1) + 2) + 8*eta**2 + 18*eta*np.sqrt(-1*4*eta + 1) - 1*78*eta - 1*64*np.sqrt(-1*4*eta + 1) + 64)/(L**4))/c**5*PN5 + 1*(4*L**2*E**3*eta**2 - 1*55*E**3*eta*L**2 + 80*L**2*E**3 + E**2*eta**2 + E**2*eta + 26*E**2 - 34*E/(L**2) + (22*E*eta)/(L**2))/c**4*PN4 + 1*((L*S1)*kds1*(-1*4*E**2*eta + 8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) + (8*E*np.sqrt(-1*4*eta + 1))/(L**2)) + (L*S2)*kds2*(-1*4*E**2*eta - 1*8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) - 8*E*np.sqrt(-1*4*eta + 1)/(L**2)))/c**3*PN3 + 1*(5*L**2*E**2*eta - 1*15*E**2*L**2 + 2*E*eta - 1*12*E)/c**2*PN2
+    ar =  1*((L*S1)*kds1*(L**2*E*(-1*6*eta**2 + eta*(5*np.sqrt(-1*4*eta + 1) + 19) - 1*8*(np.sqrt(-1*4*eta + 1) + 1)) - 1*8*eta**2 + 6*eta*(3*np.sqrt(-1*4*eta + 1) + 13) - 1*64*(np.sqrt(-1*4*eta + 1) + 1)) - (L*S2)*kds2*(L**2*E*(6*eta**2 + eta*(5*np.sqrt(-1*4*eta + 1) - 19) - 1*8*np.sqrt(-1*4*eta + 1) + 8) + 8*eta**2 + 18*eta*np.sqrt(-1*4*eta + 1) - 1*78*eta - 1*64*np.sqrt(-1*4*eta + 1) + 64))/(8*L**4*c**5)*PN5 + 1*(L**2*E*(eta**2 + 10*eta + 1) - 1*22*eta + 34)/(8*L**2*c**4)*PN4 + 1*((L*S1)*kds1*(eta - 1*2*np.sqrt(-1*4*eta + 1) - 2) + (L*S2)*kds2*(eta + 2*np.sqrt(-1*4*eta + 1) - 2))/(2*L**2*c**3)*PN3 + PN0/(2*E) + (7 - eta)/((4*c**2))*PN2
+    ephi2 =  PN0*(2*L**2*E + 1) + 1*((L*S1)*kds1*(E**3*eta*np.sqrt(-1*4*eta + 1) + 31*E**3*eta - 1*80*E**3*np.sqrt(-1*4*eta + 1) - 1*80*E**3 - 213*E*eta/(2*L**4) + (3*E*eta**2)/((2*L**4)) - 33*E*eta*np.sqrt(-1*4*eta + 1)/(2*L**4) + (96*E)/(L**4) + (96*E*np.sqrt(-1*4*eta + 1))/(L**4) + (68*E**2)/(L**2) - 144*E**2*eta/(L**2) + (4*E**2*eta**2)/(L**2) + (68*E**2*np.sqrt(-1*4*eta + 1))/(L**2) - 30*E**2*eta*np.sqrt(-1*4*eta + 1)/(L**2)) + (L*S2)*kds2*(E**3*(-1)*np.sqrt(-1*4*eta + 1)*eta + 31*E**3*eta + 80*E**3*np.sqrt(-1*4*eta + 1) - 1*80*E**3 - 213*E*eta/(2*L**4) + (3*E*eta**2)/((2*L**4)) + (33*E*eta*np.sqrt(-1*4*eta + 1))/((2*L**4)) + (96*E)/(L**4) - 96*E*np.sqrt(-1*4*eta + 1)/(L**4) + (68*E**2)/(L**2) - 144*E**2*eta/(L**2) + (4*E**2*eta**2)/(L**2) - 68*E**2*np.sqrt(-1*4*eta + 1)/(L**2) + (30*E**2*eta*np.sqrt(-1*4*eta + 1))/(L**2)))/c**5*PN5 + 1*(3*E**3*eta**2*L**2/2 - 1*15*E**3*eta*L**2 + 80*L**2*E**3 + 44*E**2*eta - 1*8*E**2 + (9*E**2*eta**2)/2 + (15*E*eta**2)/((8*L**2)) - 51*E/(L**2) + (29*E*eta)/(L**2))/c**4*PN4 + 1*((L*S1)*kds1*(-1*4*E**2*eta + 8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) + (8*E*np.sqrt(-1*4*eta + 1))/(L**2)) + (L*S2)*kds2*(-1*4*E**2*eta - 1*8*E**2*np.sqrt(-1*4*eta + 1) + 8*E**2 + (8*E)/(L**2) - 4*E*eta/(L**2) - 8*E*np.sqrt(-1*4*eta + 1)/(L**2)))/c**3*PN3 + 1*(L**2*E**2*eta - 1*15*E**2*L**2 - 1*12*E)/c**2*PN2
+    
+    # Kepler's equation:
+    f_4t =  PN4*(3*np.sqrt(2)*E**(3/2)*(-1*2*eta + 5))/L
+    f_5t =  PN5*E**(3/2)*((L*S1)*kds1*(-1*14*eta**2 + eta*(35*np.sqrt(-1*4*eta + 1) + 73) - 1*48*(np.sqrt(-1*4*eta + 1) + 1)) + (L*S2)*kds2*(-1*14*eta**2 + eta*(-1*35*np.sqrt(-1*4*eta + 1) + 73) + 48*(np.sqrt(-1*4*eta + 1) - 1)))/((2*np.sqrt(2)*L**3))
+    g_4t =  -E**(3/2)*PN4*eta*(eta + 4)*np.sqrt(4*L**2*E + 2)/(4*L)
+    g_5t =  PN5*E**(3/2)*np.sqrt(4*L**2*E + 2)*((L*S1)*kds1*(-1*3*eta**2 + eta*(9*np.sqrt(-1*4*eta + 1) + 11) - 1*4*(np.sqrt(-1*4*eta + 1) + 1)) + (L*S2)*kds2*(-1*3*eta**2 - 1*9*np.sqrt(-1*4*eta + 1)*eta + 11*eta + 4*np.sqrt(-1*4*eta + 1) - 4))/((2*L**3))
+
+    # angular equation
+    d2 =  PN0*L + 1*(3*L*E**2*eta**2 - 1*9*E**2*eta*L/2 + L*E**2)/c**4*PN4 + 1*(3*L*E*eta - L*E)/c**2*PN2
+    d3 =  (E*eta)*((L*S1)*kds1*(-1*18*eta + 31*np.sqrt(-1*4*eta + 1) + 21) + (L*S2)*kds2*(-1*18*eta - 1*31*np.sqrt(-1*4*eta + 1) + 21))/((8*L*c**5))*PN5 + 1*((L*S1)*kds1*(-eta + 2*np.sqrt(-1*4*eta + 1) + 2) + (L*S2)*kds2*(-eta - 2*np.sqrt(-1*4*eta + 1) + 2))/(2*L*c**3)*PN3 + 1*(8*L*E*eta**2 - 1*22*E*eta*L + 4*L*E)/c**4*PN4 + 1*(2*L*eta - 1*4*L)/c**2*PN2
+    d4 =  1*((L*S1)*kds1*(-1*18*eta**2 + 23*eta*np.sqrt(-1*4*eta + 1) + 21*eta - 1*24*np.sqrt(-1*4*eta + 1) - 24) + (L*S2)*kds2*(-1*18*eta**2 - 1*23*np.sqrt(-1*4*eta + 1)*eta + 21*eta + 24*np.sqrt(-1*4*eta + 1) - 24))/(8*L*c**5)*PN5 + 1*(5*L*eta**2 - 1*11*eta*L + (17*L)/2)/c**4*PN4
+    d5 =  1*((L*S1)*kds1*(-1*15*np.sqrt(-1*4*eta + 1)*eta*L/4 + L*np.sqrt(-1*4*eta + 1) + L - 1*17*L*eta/4 + (9*L*eta**2)/4) + (L*S2)*kds2*(15*np.sqrt(-1*4*eta + 1)*eta*L/4 - L*np.sqrt(-1*4*eta + 1) + L - 1*17*L*eta/4 + (9*L*eta**2)/4))/c**5*PN5 + 1*(-L**3*eta**2 + (L**3*eta)/2)/c**4*PN4
+
+    return n, np.sqrt(et2), ar, np.sqrt(er2), np.sqrt(ephi2), d2, d3, d4, d5, f_4t, f_5t, g_4t, g_5t
+
+
+def reference_precession(r, E, L, eta, PN=5) : # f_3L + f_5L and g_3L + g_5L of the spin precession
+
+    PN2, PN3, PN4, PN5 = PN_param(PN)
+
+    f_3L =  PN3*(-1*eta/2 + np.sqrt(-1*4*eta + 1) + 1)*1/r**3
+    f_5L =  PN5*(6*L**2*eta*(eta - np.sqrt(-1*4*eta + 1) - 1) + E*eta*r**2*(-1*18*eta + 31*np.sqrt(-1*4*eta + 1) + 21) + r*(-1*18*eta**2 + 23*eta*np.sqrt(-1*4*eta + 1) + 21*eta - 1*24*np.sqrt(-1*4*eta + 1) - 24))*1/(8*r**5)
+    g_3L =  PN3*(-1*eta/2 - np.sqrt(-1*4*eta + 1) + 1)*1/r**3
+    g_5L =  PN5*(6*L**2*eta*(eta + np.sqrt(-1*4*eta + 1) - 1) + E*eta*r**2*(-1*18*eta - 1*31*np.sqrt(-1*4*eta + 1) + 21) + r*(-1*18*eta**2 - 1*23*eta*np.sqrt(-1*4*eta + 1) + 21*eta + 24*np.sqrt(-1*4*eta + 1) - 24))*1/(8*r**5)
+
+    return f_3L + f_5L, g_3L + g_5L
+
+
+def reference_coefficients(eta, S1, S2, PN=5) : # the coefficient tables of PN_coefficients as written out by hand before PN_generated.py
+
+    PN2, PN3, PN4, PN5 = PN_param(PN)
+    sq = np.sqrt(1 - 4*eta)
+
+    # the S2 coefficient of each spin term is the S1 one with sqrt(1-4eta) -> -sqrt(1-4eta), stored as the pair (S1 coeff, S2 coeff)
+    spin = lambda f : (S1*f(sq), S2*f(-sq))
+
+    C = {}
+
+    # E = x**2*(1/2 + E1*x**2 + E2*x**4) with x = n**(1/3)
+    C['E'] = (PN2*(eta - 15)/24, -PN4*(eta**2 + 15*eta - 15)/48)
+
+    # L in terms of x and w = et**2, see spinning_orbit_2_5PN_L
+    C['L'] = (PN2*(eta + 3)/6, PN2*(5*eta - 9)/6, PN4*(eta**2 - 21*eta + 69)/24, -PN4*(9*eta**2 - 26*eta + 6)/12, PN4*(5*eta**2 - 73*eta + 33)/24,
+              spin(lambda s : PN3*(eta - 2*s - 2)/2), spin(lambda s : -PN5*(94*eta**2 - 173*eta*s - 443*eta + 312*s + 312)/48), spin(lambda s : -PN5*(2*eta**2 - 31*eta*s - 169*eta + 168*s + 168)/48))
+
+    # n = E**(3/2)*(n0 + n1*E + n2*E**2)
+    C['n'] = (2*np.sqrt(2), -np.sqrt(2)*PN2*(eta - 15)/2, np.sqrt(2)*PN4*(11*eta**2 + 30*eta + 555)/16)
+
+    # et**2, see spinning_orbit_2_5PN_et
+    C['et2'] = (-4*PN2*(eta - 1), 2*PN4*(5*eta**2 + eta + 2), PN4*(11*eta - 17), -PN2*(7*eta - 17), PN4*(16*eta**2 - 47*eta + 112),
+                spin(lambda s : -2*PN3*(eta - 2*s - 2)), spin(lambda s : 2*PN5*(4*eta**2 - 9*eta*s - 39*eta + 32*s + 32)),
+                spin(lambda s : 2*PN5*(32*eta**2 - 59*eta*s - 159*eta + 124*s + 124)), spin(lambda s : PN5*(48*eta**2 - 95*eta*s - 315*eta + 252*s + 252)))
+
+    # er**2 and ephi**2 share the same monomials, see spinning_orbit_2_5PN_e2
+    C['er2'] = (2*PN2*(eta - 6), PN4*(eta**2 + eta + 26), 2*PN4*(11*eta - 17), 5*PN2*(eta - 3), PN4*(4*eta**2 - 55*eta + 80),
+                spin(lambda s : -PN5*(6*eta**2 - 19*eta*s - 49*eta + 80*s + 80)), spin(lambda s : 2*PN5*(5*eta**2 - 8*eta*s - 35*eta + 2*s + 2)),
+                spin(lambda s : -4*PN3*(eta - 2*s - 2)), spin(lambda s : 2*PN5*(4*eta**2 - 9*eta*s - 39*eta + 32*s + 32)))
+    C['ephi2'] = (-12*PN2, PN4*(9*eta**2 + 88*eta - 16)/2, PN4*(15*eta**2 + 232*eta - 408)/8, PN2*(eta - 15), PN4*(3*eta**2 - 30*eta + 160)/2,
+                  spin(lambda s : PN5*(eta*s + 31*eta - 80*s - 80)), spin(lambda s : 2*PN5*(2*eta**2 - 15*eta*s - 72*eta + 34*s + 34)),
+                  spin(lambda s : -4*PN3*(eta - 2*s - 2)), spin(lambda s : 3*PN5*(eta**2 - 11*eta*s - 71*eta + 64*s + 64)/2))
+
+    # ar = 1/(2E) + a0 + a1*E + a2/L**2 + spin terms
+    C['ar'] = (-PN2*(eta - 7)/4, PN4*(eta**2 + 10*eta + 1)/8, -PN4*(11*eta - 17)/4,
+               spin(lambda s : PN3*(eta - 2*s - 2)/2), spin(lambda s : -PN5*(4*eta**2 - 9*eta*s - 39*eta + 32*s + 32)/4), spin(lambda s : -PN5*(6*eta**2 - 5*eta*s - 19*eta + 8*s + 8)/8))
+
+    # Kepler's equation
+    C['t'] = (-3*np.sqrt(2)*PN4*(2*eta - 5), spin(lambda s : -np.sqrt(2)*PN5*(14*eta**2 - 35*eta*s - 73*eta + 48*s + 48)/4),
+              -PN4*eta*(eta + 4)/4, spin(lambda s : -PN5*(3*eta**2 - 9*eta*s - 11*eta + 4*s + 4)/2))
+
+    # angular equation
+    C['d'] = (PN2*(3*eta - 1), PN4*(6*eta**2 - 9*eta + 2)/2,
+              2*PN2*(eta - 2), 2*PN4*(4*eta**2 - 11*eta + 2), spin(lambda s : -PN3*(eta - 2*s - 2)/2), spin(lambda s : -PN5*eta*(18*eta - 31*s - 21)/8),
+              PN4*(10*eta**2 - 22*eta + 17)/2, spin(lambda s : -PN5*(18*eta**2 - 23*eta*s - 21*eta + 24*s + 24)/8),
+              -PN4*eta*(2*eta - 1)/2, spin(lambda s : PN5*(9*eta**2 - 15*eta*s - 17*eta + 4*s + 4)/4))
+
+    # precession, f_L = f3/r**3 + (f5a*L**2 + f5b*E*r**2 + f5c*r)/r**5 and g_L the same with sqrt(1-4eta) -> -sqrt(1-4eta)
+    precession = lambda s : (PN3*(1 + s - eta/2), PN5*3*eta*(eta - s - 1)/4, PN5*eta*(-18*eta + 31*s + 21)/8, PN5*(-18*eta**2 + 23*eta*s + 21*eta - 24*s - 24)/8)
+    C['f_L'], C['g_L'] = precession(sq), precession(-sq)
+
+
+    return C
+
+
+# Coefficient tables ====================================================================================================
+
+rtol = 1e-9
+
+PN_orders = (0, 2, 3, 4, 5)
+
+
+def random_binaries(seed, N=2000) : # n, et, kds1, kds2, eta, S1, S2 of N random hyperbolic binaries (impact parameters of about 20 to 1000)
+
+    rng = np.random.default_rng(seed)
+
+    n = 10**rng.uniform(-4.5, -2., N)
+    et = rng.uniform(1.01, 3., N)
+    kds1, kds2 = rng.uniform(-1, 1, (2, N))
+    eta = rng.uniform(0.05, 0.25, N)
+    S1, S2 = rng.uniform(0, 1, (2, N))
+
+    return n, et, kds1, kds2, eta, S1, S2
+
+
+def assert_close(values, reference) : # every parameter to rtol, relative to its largest magnitude over the binaries where it vanishes (e.g. PN=0 terms)
+
+    for name, (x, y) in enumerate(zip(values, reference)) :
+        x, y = np.broadcast_arrays(x, y)
+        np.testing.assert_allclose(x, y, rtol=rtol, atol=rtol*np.max(np.abs(y)), err_msg='parameter ' + str(name))
+
+
+@pytest.mark.parametrize('PN', PN_orders)
+def test_param(PN) :
+
+    n, et, kds1, kds2, eta, S1, S2 = random_binaries(PN)
+
+    # one binary at a time, as in the right-hand side, and the whole ensemble as arrays
+    for i in range(0, len(n), 97) :
+        assert_close(spinning_orbit_2_5PN_param(n[i], et[i], kds1[i], kds2[i], eta[i], S1[i], S2[i], 0., PN), reference_param(n[i], et[i], kds1[i], kds2[i], eta[i], S1[i], S2[i], PN))
+
+    assert_close(spinning_orbit_2_5PN_param(n, et, kds1, kds2, eta, S1, S2, 0., PN), reference_param(n, et, kds1, kds2, eta, S1, S2, PN))
+
+
+@pytest.mark.parametrize('PN', PN_orders)
+def test_param_from_E_L(PN) :
+
+    n, et, kds1, kds2, eta, S1, S2 = random_binaries(10 + PN)
+    E, L = reference_param(n, et, kds1, kds2, eta, S1, S2, PN)[:2]
+
+    assert_close(spinning_orbit_2_5PN_param_from_E_L(E, L, kds1, kds2, eta, S1, S2, PN), reference_param_from_E_L(E, L, kds1, kds2, eta, S1, S2, PN))
+
+
+@pytest.mark.parametrize('PN', PN_orders)
+def test_precession(PN) :
+
+    n, et, kds1, kds2, eta, S1, S2 = random_binaries(20 + PN)
+    E, L = reference_param(n, et, kds1, kds2, eta, S1, S2, PN)[:2]
+    r = np.random.default_rng(PN).uniform(5., 500., len(n))
+
+    C = PN_coefficients(eta, S1, S2, PN)
+    f3, f5a, f5b, f5c = C['f_L']
+    g3, g5a, g5b, g5c = C['g_L']
+
+    f_L = (f3 + f5b*E + (f5c + f5a*L**2/r)/r)/r**3
+    g_L = (g3 + g5b*E + (g5c + g5a*L**2/r)/r)/r**3
+
+    assert_close((f_L, g_L), reference_precession(r, E, L, eta, PN))
+
+
+@pytest.mark.parametrize('PN', PN_orders)
+def test_coefficient_tables(PN) : # the generated tables entry by entry against the hand-written ones
+
+    eta = np.random.default_rng(30 + PN).uniform(0.05, 0.25, 100)
+    S1, S2 = np.random.default_rng(40 + PN).uniform(0, 1, (2, 100))
+
+    C, C_ref = PN_coefficients(eta, S1, S2, PN), reference_coefficients(eta, S1, S2, PN)
+
+    assert C.keys() == C_ref.keys()
+    for key in C_ref :
+        assert len(C[key]) == len(C_ref[key]), key
+        for i, (x, y) in enumerate(zip(C[key], C_ref[key])) :
+            assert isinstance(x, tuple) == isinstance(y, tuple), (key, i)
+            x, y = np.broadcast_arrays(x, y)
+            np.testing.assert_allclose(x, y, rtol=1e-13, atol=1e-13, err_msg=key + ' ' + str(i))
@@ -0,0 +1,29 @@
+import numpy as np
+
+from cache_tools import cache_config, set_cache, clear_cache, cached, cached_batch
+
+
+# Batched cache reads ===================================================================================================
+
+def test_cached_batch_full_memory() : # storing the missing values evicts the cached one from memory, it must still be returned
+
+    max_memory_bytes, directory = cache_config['max_memory_bytes'], cache_config['directory']
+    set_cache(max_memory_bytes=600, directory='')
+    clear_cache()
+
+    try :
+        cached('cached', lambda : (np.zeros(50),))
+
+        computed = []
+        def compute(missing) :
+            computed.extend(missing)
+            return [(np.ones(50),) for _ in missing]
+
+        values = cached_batch(['cached', 'missing', 'cached'], compute)
+
+        assert computed == ['missing']
+        assert [value[0][0] for value in values] == [0., 1., 0.]
+
+    finally :
+        clear_cache()
+        set_cache(max_memory_bytes=max_memory_bytes, directory=directory or '')
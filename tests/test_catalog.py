@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from catalog_tools import catalog_dtype, catalog_append, catalog_select, catalog_read, load_index, index_file
+
+
+# Series of the entries =================================================================================================
+
+def test_series(tmp_path) : # entries are selected by the series they store, reading a series some entries lack names them
+
+    path = str(tmp_path)
+    t = np.linspace(0., 1., 50)
+    x = np.random.default_rng(0).normal(size=(2, 50))
+
+    catalog_append(path, {'m1' : 1.}, {'h_plus' : x, 'h_cross' : -x}, t, block=16)
+    catalog_append(path, {'m1' : 2.}, {'r' : x[:1]}, t, block=16)
+
+    index = load_index(path)
+    np.testing.assert_array_equal(catalog_select(index, series='h_plus'), [0, 1])
+    np.testing.assert_array_equal(catalog_select(index, series='r'), [2])
+    np.testing.assert_array_equal(catalog_read(path, [1, 0], 'h_cross'), -x[::-1])
+
+    with pytest.raises(ValueError, match=r'\[2\] do not store the series h_plus') :
+        catalog_read(path, [0, 2], 'h_plus')
+
+
+# Index =================================================================================================================
+
+def test_index_append(tmp_path) : # the index grows in place, the rows written by an interrupted append are not counted and then overwritten
+
+    path = str(tmp_path)
+    t = np.linspace(0., 1., 10)
+
+    for i in range(5) :
+        np.testing.assert_array_equal(catalog_append(path, {'m1' : i}, {'r' : np.full((2, 10), i)}, t), [2*i, 2*i + 1])
+
+    with open(index_file(path), 'ab') as f : # rows written without their header update
+        f.write(np.zeros(3, dtype=catalog_dtype).tobytes())
+
+    index = load_index(path)
+    np.testing.assert_array_equal(index['m1'], np.repeat(np.arange(5), 2))
+    np.testing.assert_array_equal(index['chunk'], np.repeat(np.arange(5), 2))
+    del index
+
+    np.testing.assert_array_equal(catalog_append(path, {'m1' : 5}, {'r' : np.full((1, 10), 5)}, t), [10])
+    np.testing.assert_array_equal(np.load(index_file(path))['m1'], [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5])
+    np.testing.assert_array_equal(catalog_read(path, np.arange(11), 'r')[:, 0], [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5])
@@ -0,0 +1,22 @@
+import pytest
+
+pytest.importorskip('sympy')
+pytest.importorskip('latex2sympy2')
+
+from codegen_tools import compare_orbital_param_kernel, coefficient_module_source, generated_file
+
+
+# Generated kernels =====================================================================================================
+
+@pytest.mark.parametrize('PN', (0, 2, 3, 4, 5))
+def test_orbital_param_kernel(PN, tmp_path) : # the kernel generated from the LaTeX source against the coefficient tables of PN_coefficients
+
+    difference = compare_orbital_param_kernel(PN, directory=str(tmp_path))
+
+    assert max(difference.values()) < 1e-10, {k : v for k, v in difference.items() if v >= 1e-10}
+
+
+def test_coefficient_module() : # PN_generated.py is up to date with the LaTeX of orbit_tex_NLOSO
+
+    with open(generated_file) as f :
+        assert f.read() == coefficient_module_source(), 'PN_generated.py is stale, run codegen_tools.write_coefficient_module()'
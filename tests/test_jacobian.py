@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from PN_tools import dy_dt_2_5PN, dy_dt_2_5PN_jacobian, spinning_initial_conditions, initial_mean_motion
+
+
+# Jacobian of the right-hand side =======================================================================================
+
+def central_differences(y, t, eta, S1, S2, radiation_reaction, rel_step=1e-6) : # central differences estimate of dy_dt_2_5PN_jacobian at t0 = 0
+
+    J = np.zeros((len(y), len(y)))
+
+    for j in range(len(y)) :
+        h = rel_step*max(abs(y[j]), 1e-3)
+        step = h*np.eye(len(y))[j]
+        J[:, j] = (dy_dt_2_5PN(y + step, t, 0., eta, S1, S2, radiation_reaction) - dy_dt_2_5PN(y - step, t, 0., eta, S1, S2, radiation_reaction))/(2*h)
+
+    return J
+
+
+@pytest.mark.parametrize('radiation_reaction', (False, True))
+@pytest.mark.parametrize('b, et0, chi', ((20., 1.2, 0.9), (40., 1.6, 0.5), (100., 1.05, 0.9)))
+def test_jacobian(b, et0, chi, radiation_reaction) : # physical spinning encounters, eta = 0.2, before, around and after the periastron
+
+    eta = 0.2
+    m1 = (1 + np.sqrt(1 - 4*eta))/2
+    m2 = 1 - m1
+    S1, S2 = m1*chi/m2, m2*chi/m1
+
+    y = np.array(spinning_initial_conditions(b, et0, eta, S1, S2, 0.7, 0.2, 1.9, 2.), dtype=float)
+    y[0] = initial_mean_motion(b, et0, eta)
+
+    for t in (-2000., -100., 0., 10., 500.) :
+
+        J = dy_dt_2_5PN_jacobian(y, t, 0., eta, S1, S2, radiation_reaction)
+        J_fd = central_differences(y, t, eta, S1, S2, radiation_reaction)
+
+        assert np.all(np.isfinite(J)) and np.all(np.isfinite(J_fd))
+        assert np.max(np.abs(J_fd)) > 0
+
+        # relative to the largest entry of each row, the difference is the truncation and rounding error of the central differences
+        scale = np.max(np.abs(J_fd), axis=1, keepdims=True)
+        assert np.all(np.abs(J - J_fd) <= 1e-6*scale), 't = ' + str(t) + ', largest relative deviation ' + str(np.max(np.abs(J - J_fd)/(scale + 1e-300)))
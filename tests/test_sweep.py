@@ -0,0 +1,45 @@
+import os
+import numpy as np
+import pytest
+
+from sweep_tools import sweep_grid, run_sweep
+from fourier_tools import sweep_spectra
+
+
+# Resumable store =======================================================================================================
+
+def test_resume_settings(tmp_path) : # a sweep is only resumed with the waveform settings it was started with
+
+    grid = sweep_grid([50.], [1.3], [1.], [0.5])
+    t = np.linspace(-500., 500., 200)
+    path = str(tmp_path)
+
+    h_plus = np.array(run_sweep(path, grid, t, max_workers=0, progress=None)[2]['h_plus'])
+    np.testing.assert_array_equal(run_sweep(path, grid, t, max_workers=0, progress=None)[2]['h_plus'], h_plus)
+
+    for settings in ({'t0' : 10.}, {'Theta' : 1.}, {'GW_order' : 2}, {'radiation_reaction' : False}) :
+        with pytest.raises(ValueError, match='settings') :
+            run_sweep(path, grid, t, max_workers=0, progress=None, **settings)
+
+
+def test_spectra_unfinished(tmp_path) : # the spectra of an unfinished sweep raise, or are NaN for the points not run with partial=True
+
+    grid = sweep_grid([50., 60.], [1.3], [1.], [0.5])
+    t = np.linspace(-500., 500., 200)
+    path = str(tmp_path)
+
+    run_sweep(path, grid, t, chunk_size=1, max_workers=0, progress=None)
+    f, f_unit, h_plus, h_cross = sweep_spectra(path)
+    assert np.all(np.isfinite(h_plus)) and np.all(np.isfinite(h_cross))
+
+    done = np.load(os.path.join(path, 'done.npy'), mmap_mode='r+')
+    done[1] = False
+    done.flush()
+    del done
+
+    with pytest.raises(ValueError, match='unfinished') :
+        sweep_spectra(path)
+
+    h_plus_partial, h_cross_partial = sweep_spectra(path, partial=True)[2:]
+    np.testing.assert_array_equal(h_plus_partial[0], h_plus[0])
+    assert np.all(np.isnan(h_plus_partial[1])) and np.all(np.isnan(h_cross_partial[1]))
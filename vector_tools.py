@@ -0,0 +1,57 @@
+import numpy as np
+
+
+# Vector algebra on time series ==========================================================================================
+
+# vectors are arrays of shape (3, len(t)) or batches of shape (N, 3, len(t)), the component axis is axis=-2 by default
+# (the state of the integrator uses (3, ..., len(t)), pass axis=0), inputs broadcast against each other like numpy arrays
+# out, when given, receives the result and must not share memory with the inputs of cross
+
+
+def components(a, axis=-2) : # views on the x, y and z components of a, 0-d arrays for a single vector so that they can be written into
+
+    a = np.moveaxis(np.asarray(a), axis, 0)
+
+    return a[0, ...], a[1, ...], a[2, ...]
+
+
+def dot(a, b, axis=-2, out=None) : # a.b, returns the shape of a and b without the component axis
+
+    a0, a1, a2 = components(a, axis)
+    b0, b1, b2 = components(b, axis)
+
+    out = np.multiply(a0, b0, out=out)
+    out += a1*b1
+    out += a2*b2
+
+    return out
+
+
+def cross(a, b, axis=-2, out=None) : # a x b, returns the broadcast shape of a and b
+
+    a0, a1, a2 = components(a, axis)
+    b0, b1, b2 = components(b, axis)
+
+    if out is None :
+        shape = np.broadcast_shapes(np.shape(a), np.shape(b))
+        out = np.empty(shape, dtype=np.result_type(a, b))
+    o0, o1, o2 = components(out, axis)
+
+    np.multiply(a1, b2, out=o0)
+    o0 -= a2*b1
+    np.multiply(a2, b0, out=o1)
+    o1 -= a0*b2
+    np.multiply(a0, b1, out=o2)
+    o2 -= a1*b0
+
+    return out
+
+
+def norm(a, axis=-2, out=None) : # |a|, returns the shape of a without the component axis
+
+    return np.sqrt(dot(a, a, axis, out), out=out)
+
+
+def normalize(a, axis=-2, out=None) : # a/|a|, returns the shape of a
+
+    return np.divide(a, np.expand_dims(norm(a, axis), axis), out=out)